@@ -1,9 +1,12 @@
+import gc
 import json
 import sys
 import os
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
 import logging
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 
 # Configure logging
@@ -13,36 +16,98 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def load_model():
-    """Load the AI model and tokenizer."""
+# Default model used for analysis
+DEFAULT_MODEL = "microsoft/phi-2"  # Smaller, faster model
+
+# Maximum number of models kept resident; least recently used are evicted first
+MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', '1'))
+
+# Process-wide cache: model name -> (model, tokenizer), ordered from least to most recently used
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+# Model name -> event set once the thread loading it has finished (loads run outside the lock)
+_model_loading = {}
+
+def _load_tokenizer(model_name):
+    """Load a tokenizer from the Hugging Face hub or local cache.
+
+    Loaded before the weights, so a bad name or credentials fail before anything is evicted.
+    """
+    logger.info(f"Loading model: {model_name}")
+    
+    # Get Hugging Face token
+    hf_token = os.getenv('HUGGINGFACE_API_KEY')
+    if not hf_token:
+        raise ValueError("Hugging Face API key not found in environment variables")
+    
+    return AutoTokenizer.from_pretrained(
+        model_name,
+        token=hf_token,
+        trust_remote_code=True
+    )
+
+def _load_weights(model_name):
+    """Load model weights from the Hugging Face hub or local cache."""
+    return AutoModelForCausalLM.from_pretrained(
+        model_name,
+        token=os.getenv('HUGGINGFACE_API_KEY'),
+        torch_dtype=torch.float32,
+        device_map="auto",
+        trust_remote_code=True
+    )
+
+def _evict(keep):
+    """Drop least recently used models until at most keep remain. Call with the lock held."""
+    if len(_model_cache) <= keep:
+        return
+    while len(_model_cache) > keep:
+        evicted = _model_cache.popitem(last=False)[0]
+        logger.info(f"Evicted model from cache: {evicted}")
+    gc.collect()
+
+def load_model(model_name=DEFAULT_MODEL):
+    """Load the AI model and tokenizer, reusing an already-resident copy when cached.
+
+    Loads run outside the cache lock, so cache hits never wait behind them; concurrent
+    requests for the same model wait for the one load. Least recently used models are
+    evicted before the weights load so at most MODEL_CACHE_SIZE stay resident.
+    """
     try:
-        # Using a more reliable model for text analysis
-        model_name = "microsoft/phi-2"  # Smaller, faster model
-        logger.info(f"Loading model: {model_name}")
-        
-        # Get Hugging Face token
-        hf_token = os.getenv('HUGGINGFACE_API_KEY')
-        if not hf_token:
-            raise ValueError("Hugging Face API key not found in environment variables")
-        
-        # Load model with authentication
-        tokenizer = AutoTokenizer.from_pretrained(
-            model_name,
-            token=hf_token,
-            trust_remote_code=True
-        )
-        model = AutoModelForCausalLM.from_pretrained(
-            model_name,
-            token=hf_token,
-            torch_dtype=torch.float32,
-            device_map="auto",
-            trust_remote_code=True
-        )
-        return model, tokenizer
+        while True:
+            with _model_cache_lock:
+                if model_name in _model_cache:
+                    _model_cache.move_to_end(model_name)
+                    return _model_cache[model_name]
+                loading = _model_loading.get(model_name)
+                if loading is None:
+                    loading = _model_loading[model_name] = threading.Event()
+                    break
+            # Another thread is loading this model; use its result (or retry if it failed)
+            loading.wait()
+        
+        try:
+            tokenizer = _load_tokenizer(model_name)
+            with _model_cache_lock:
+                _evict(max(1, MODEL_CACHE_SIZE) - 1)
+            model = _load_weights(model_name)
+            with _model_cache_lock:
+                # Other models may have loaded meanwhile
+                _evict(max(1, MODEL_CACHE_SIZE) - 1)
+                _model_cache[model_name] = (model, tokenizer)
+            return model, tokenizer
+        finally:
+            with _model_cache_lock:
+                del _model_loading[model_name]
+            loading.set()
     except Exception as e:
         logger.error(f"Error loading model: {str(e)}")
         raise
 
+def clear_model_cache():
+    """Drop all cached models."""
+    with _model_cache_lock:
+        _model_cache.clear()
+
 def analyze_resume(text):
     """Analyze resume text using the AI model."""
     try:
@@ -1,13 +1,17 @@
 import json
 import os
 import sys
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import AutoConfig, AutoTokenizer, AutoModelForCausalLM
 import torch
 import logging
 from dotenv import load_dotenv
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from model_registry import ModelRegistry, registry as default_registry
+from quantization import load_quantized, quantization_mode
+from structured_generation import PromptPrefix, encode_prefix, generate_json
+from tracing import span, start_trace
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,112 +20,277 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Default checkpoint for each generation role; roles sharing a checkpoint share one loaded copy
+DEFAULT_ROLE_MODELS = {
+    'skills': "microsoft/phi-2",
+    'experience': "microsoft/phi-2",
+    'recommendations': "microsoft/phi-2"
+}
+
+# Upper bound on generated tokens per role; generation normally stops earlier, once the JSON closes
+DEFAULT_MAX_NEW_TOKENS = {
+    'skills': 160,
+    'experience': 320,
+    'recommendations': 900
+}
+
+# Context window of the generation models; a shared resume prefix leaves room for the
+# longest task prompt (RESUME_TASK_PROMPT_TOKENS) plus that task's generated tokens
+MAX_CONTEXT_TOKENS = 2048
+RESUME_TASK_PROMPT_TOKENS = 256
+
+EMPTY_EXPERIENCE = {"years_of_experience": 0, "industries": [], "roles": [], "achievements": []}
+
+
+def _empty_experience() -> Dict[str, Any]:
+    return {key: list(value) if isinstance(value, list) else value for key, value in EMPTY_EXPERIENCE.items()}
+
+def _match_score(recommendation: Dict[str, Any]) -> float:
+    try:
+        return float(recommendation.get('match_score', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
 class JobRecommender:
-    def __init__(self):
+    def __init__(self, role_models: Optional[Dict[str, str]] = None,
+                 torch_dtype: torch.dtype = torch.float32,
+                 registry: Optional[ModelRegistry] = None,
+                 quantization: Optional[str] = None,
+                 max_new_tokens: Optional[Dict[str, int]] = None,
+                 constrained_decoding: Optional[bool] = None,
+                 prefix_caching: Optional[bool] = None):
+        """Initialize the recommender.
+
+        Args:
+            role_models: Per-role checkpoint overrides, e.g. {'recommendations': 'org/model'}.
+                Roles not listed use DEFAULT_ROLE_MODELS.
+            torch_dtype: dtype the causal LMs are loaded in.
+            registry: Model registry to load from; defaults to the process-wide one.
+            quantization: 'int8' loads the causal LMs in float32 on CPU and applies dynamic
+                int8 quantization to their Linear layers (torch_dtype is then ignored).
+                Defaults to the MODEL_QUANTIZATION environment variable, else 'none'.
+            max_new_tokens: Per-role overrides of DEFAULT_MAX_NEW_TOKENS.
+            constrained_decoding: Decode greedily with tokens that would break the JSON
+                masked out, instead of sampling. Defaults to the CONSTRAINED_DECODING
+                environment variable ('1' to enable).
+            prefix_caching: In analyze_resume, encode the resume once and reuse its KV cache
+                for the skills and experience prompts when both roles share a model.
+                Defaults to the PROMPT_PREFIX_CACHE environment variable ('0' to disable).
+        """
         self.hf_token = os.getenv('HUGGINGFACE_API_KEY')
         self.google_api_key = os.getenv('GOOGLE_CLOUD_API_KEY')
+        self.torch_dtype = torch_dtype
+        self.registry = registry or default_registry
+        self.quantization = quantization_mode(quantization)
+        self.max_new_tokens = {**DEFAULT_MAX_NEW_TOKENS, **(max_new_tokens or {})}
+        if constrained_decoding is None:
+            constrained_decoding = os.getenv('CONSTRAINED_DECODING', '0') == '1'
+        self.constrained_decoding = constrained_decoding
+        if prefix_caching is None:
+            prefix_caching = os.getenv('PROMPT_PREFIX_CACHE', '1') != '0'
+        self.prefix_caching = prefix_caching
         
         # Using more specialized models for better analysis
-        self.models = {
-            'skills': "microsoft/phi-2",
-            'experience': "microsoft/phi-2",
-            'recommendations': "microsoft/phi-2"
-        }
-        self.tokenizers = {}
-        self.models_loaded = {}
+        self.models = {**DEFAULT_ROLE_MODELS, **(role_models or {})}
         
         # Initialize models
         self.load_models()
 
-    def load_models(self):
-        """Load all required models."""
-        try:
-            for name, model_name in self.models.items():
-                logger.info(f"Loading {name} model: {model_name}")
-                self.tokenizers[name] = AutoTokenizer.from_pretrained(
+    def _checkpoint_key(self, model_name: str) -> str:
+        """Registry key identifying one loaded copy of a checkpoint in a given dtype."""
+        if self.quantization != 'none':
+            return f"causal_lm:{model_name}:{self.quantization}"
+        return f"causal_lm:{model_name}:{str(self.torch_dtype).replace('torch.', '')}"
+
+    def _load_checkpoint(self, model_name: str) -> Tuple[Any, Any]:
+        """Load a tokenizer/model pair for a checkpoint."""
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_name,
+            token=self.hf_token,
+            trust_remote_code=True
+        )
+        if self.quantization == 'int8':
+            model = load_quantized(
+                model_name,
+                lambda: AutoModelForCausalLM.from_pretrained(
                     model_name,
                     token=self.hf_token,
+                    torch_dtype=torch.float32,
                     trust_remote_code=True
-                )
-                self.models_loaded[name] = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    token=self.hf_token,
+                ),
+                build_float=lambda: AutoModelForCausalLM.from_config(
+                    AutoConfig.from_pretrained(model_name, token=self.hf_token, trust_remote_code=True),
                     torch_dtype=torch.float32,
-                    device_map="auto",
                     trust_remote_code=True
                 )
+            )
+            return tokenizer, model
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            token=self.hf_token,
+            torch_dtype=self.torch_dtype,
+            device_map="auto",
+            trust_remote_code=True
+        )
+        return tokenizer, model
+
+    def load_models(self):
+        """Load all required models, sharing one copy per checkpoint and dtype."""
+        try:
+            for name, model_name in self.models.items():
+                key = self._checkpoint_key(model_name)
+                if not self.registry.is_loaded(key):
+                    logger.info(f"Loading {name} model: {model_name}")
+                self.registry.register(key, lambda model_name=model_name: self._load_checkpoint(model_name))
+                self.registry.get(key)
         except Exception as e:
             logger.error(f"Error loading models: {str(e)}")
             raise
 
-    def analyze_skills(self, resume_text: str) -> List[str]:
-        """Analyze and extract skills from resume text."""
+    def _role_pair(self, role: str) -> Tuple[Any, Any]:
+        """(tokenizer, model) of a role, looked up in the registry on every use.
+
+        Nothing keeps its own reference, so a model the idle reaper unloads is freed
+        and reloaded on the next use instead of lingering alongside a second copy.
+        """
+        return self.registry.get(self._checkpoint_key(self.models[role]))
+
+    @property
+    def tokenizers(self) -> Dict[str, Any]:
+        return {role: self._role_pair(role)[0] for role in self.models}
+
+    @property
+    def models_loaded(self) -> Dict[str, Any]:
+        return {role: self._role_pair(role)[1] for role in self.models}
+
+    def resident_models(self) -> Dict[str, Dict[str, float]]:
+        """Report which models are loaded and their estimated memory use."""
+        return self.registry.resident()
+
+    def _generate_json(self, role: str, prompt: str, opener: str,
+                       prefix: Optional[PromptPrefix] = None) -> Any:
+        """Generate and parse the JSON value a role's prompt asks for (None if unparseable)."""
+        tokenizer, model = self._role_pair(role)
+        with span(f"generate.{role}", batch_size=1, cached_prefix=prefix is not None) as stage:
+            value, stats = generate_json(
+                model,
+                tokenizer,
+                prompt,
+                opener,
+                max_new_tokens=self.max_new_tokens[role],
+                max_input_tokens=MAX_CONTEXT_TOKENS - self.max_new_tokens[role],
+                constrained=self.constrained_decoding,
+                prefix=prefix
+            )
+            # With a cached prefix only the tokens after it are actually run through the model
+            stage.set(tokens=stats['input_tokens'] - (prefix.input_ids.shape[1] if prefix is not None else 0),
+                      new_tokens=stats['new_tokens'], parsed=stats['parsed'])
+        logger.info(
+            f"Generated {role} JSON: {stats['new_tokens']} tokens in {stats['seconds']:.1f}s"
+            f" (closed={stats['stopped_early']}, parsed={stats['parsed']})"
+        )
+        return value
+
+    @staticmethod
+    def _resume_prefix(resume_text: str) -> str:
+        """Leading part shared by the resume-reading prompts."""
+        return f"""Resume Text:
+            {resume_text}
+            
+            """
+
+    def _resume_prefix_tokens(self) -> int:
+        """Token budget of the resume prefix, leaving room for any task prompt and its output."""
+        return MAX_CONTEXT_TOKENS - RESUME_TASK_PROMPT_TOKENS - max(
+            self.max_new_tokens['skills'], self.max_new_tokens['experience']
+        )
+
+    def _fit_resume_prefix(self, resume_text: str, role: str) -> str:
+        """The resume prefix as text, cut to the same budget encode_resume_prefix uses.
+
+        Without a cached prefix the task instructions follow the resume in one prompt;
+        cutting the whole prompt instead would drop the instructions for a long resume.
+        """
+        tokenizer = self._role_pair(role)[0]
+        text = self._resume_prefix(resume_text)
+        max_tokens = self._resume_prefix_tokens()
+        input_ids = tokenizer(text, max_length=max_tokens, truncation=True).input_ids
+        if len(input_ids) < max_tokens:
+            return text
+        return tokenizer.decode(input_ids, skip_special_tokens=True) + "\n\n"
+
+    def encode_resume_prefix(self, resume_text: str, role: str = 'skills') -> PromptPrefix:
+        """Encode the shared resume prefix once with a role's model, for reuse across prompts."""
+        tokenizer, model = self._role_pair(role)
+        with span('generate.prefix', batch_size=1) as stage:
+            prefix = encode_prefix(model, tokenizer,
+                                   self._resume_prefix(resume_text), self._resume_prefix_tokens())
+            stage.set(tokens=prefix.input_ids.shape[1])
+        return prefix
+
+    def analyze_skills(self, resume_text: str, prefix: Optional[PromptPrefix] = None) -> List[str]:
+        """Analyze and extract skills from resume text.
+
+        prefix is the encoded resume from encode_resume_prefix; when given, only the task
+        instructions are processed before generating.
+        """
         try:
-            prompt = f"""Extract technical and soft skills from the following resume text. Focus on:
+            prompt = """Extract technical and soft skills from the resume text above. Focus on:
             1. Programming languages
             2. Frameworks and tools
             3. Soft skills
             4. Domain knowledge
             
-            Resume Text:
-            {resume_text}
-            
             Provide a JSON array of skills in the following format:
             ["skill1", "skill2", ...]
             """
+            if prefix is None:
+                prompt = self._fit_resume_prefix(resume_text, 'skills') + prompt
             
-            inputs = self.tokenizers['skills'](prompt, return_tensors="pt", max_length=2048, truncation=True)
-            outputs = self.models_loaded['skills'].generate(
-                inputs.input_ids,
-                max_length=2048,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True
-            )
-            
-            response = self.tokenizers['skills'].decode(outputs[0], skip_special_tokens=True)
-            skills = json.loads(response[response.find('['):response.rfind(']')+1])
-            return skills
+            skills = self._generate_json('skills', prompt, '[', prefix)
+            if not isinstance(skills, list):
+                return []
+            return [str(skill) for skill in skills if isinstance(skill, (str, int, float)) and str(skill).strip()]
         except Exception as e:
             logger.error(f"Error analyzing skills: {str(e)}")
             return []
 
-    def analyze_experience(self, resume_text: str) -> Dict[str, Any]:
-        """Analyze work experience from resume text."""
+    def analyze_experience(self, resume_text: str, prefix: Optional[PromptPrefix] = None) -> Dict[str, Any]:
+        """Analyze work experience from resume text (prefix as in analyze_skills)."""
         try:
-            prompt = f"""Extract work experience details from the following resume text. Focus on:
+            prompt = """Extract work experience details from the resume text above. Focus on:
             1. Total years of experience
             2. Industries worked in
             3. Previous roles and responsibilities
             4. Notable achievements
             
-            Resume Text:
-            {resume_text}
-            
             Provide a JSON object with the following structure:
-            {{
+            {
                 "years_of_experience": number,
                 "industries": ["industry1", "industry2", ...],
                 "roles": ["role1", "role2", ...],
                 "achievements": ["achievement1", "achievement2", ...]
-            }}
+            }
             """
+            if prefix is None:
+                prompt = self._fit_resume_prefix(resume_text, 'experience') + prompt
             
-            inputs = self.tokenizers['experience'](prompt, return_tensors="pt", max_length=2048, truncation=True)
-            outputs = self.models_loaded['experience'].generate(
-                inputs.input_ids,
-                max_length=2048,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True
-            )
-            
-            response = self.tokenizers['experience'].decode(outputs[0], skip_special_tokens=True)
-            experience = json.loads(response[response.find('{'):response.rfind('}')+1])
+            experience = self._generate_json('experience', prompt, '{', prefix)
+            if not isinstance(experience, dict):
+                return _empty_experience()
+            # Fill in missing or mistyped fields so downstream code can rely on the shape
+            for key, default in EMPTY_EXPERIENCE.items():
+                if isinstance(default, list):
+                    value = experience.get(key)
+                    experience[key] = [str(item) for item in value] if isinstance(value, list) else []
+            try:
+                experience['years_of_experience'] = float(experience.get('years_of_experience') or 0)
+            except (TypeError, ValueError):
+                experience['years_of_experience'] = 0
             return experience
         except Exception as e:
             logger.error(f"Error analyzing experience: {str(e)}")
-            return {"years_of_experience": 0, "industries": [], "roles": [], "achievements": []}
+            return _empty_experience()
 
     def get_job_recommendations(self, skills: List[str], experience: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate job recommendations based on skills and experience."""
@@ -158,20 +327,14 @@ class JobRecommender:
             ]
             """
             
-            inputs = self.tokenizers['recommendations'](prompt, return_tensors="pt", max_length=2048, truncation=True)
-            outputs = self.models_loaded['recommendations'].generate(
-                inputs.input_ids,
-                max_length=2048,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True
-            )
-            
-            response = self.tokenizers['recommendations'].decode(outputs[0], skip_special_tokens=True)
-            recommendations = json.loads(response[response.find('['):response.rfind(']')+1])
+            recommendations = self._generate_json('recommendations', prompt, '[')
+            if not isinstance(recommendations, list):
+                return []
             
             # Filter and sort recommendations by match score
-            recommendations = [r for r in recommendations if r['match_score'] > 50]
+            recommendations = [r for r in recommendations if isinstance(r, dict) and _match_score(r) > 50]
+            for recommendation in recommendations:
+                recommendation['match_score'] = _match_score(recommendation)
             recommendations.sort(key=lambda x: x['match_score'], reverse=True)
             
             return recommendations[:5]  # Return top 5 recommendations
@@ -179,17 +342,37 @@ class JobRecommender:
             logger.error(f"Error generating job recommendations: {str(e)}")
             return []
 
-    def analyze_resume(self, resume_text: str) -> Dict[str, Any]:
-        """Main function to analyze resume and generate recommendations."""
+    def analyze_resume(self, resume_text: str, trace: bool = False) -> Dict[str, Any]:
+        """Main function to analyze resume and generate recommendations.
+
+        With trace set, the result carries a '_trace' of per-stage and per-generation
+        timings (wall, CPU, prompt and generated tokens, RSS change).
+        """
+        if trace:
+            with start_trace() as recorded:
+                result = self.analyze_resume(resume_text)
+            return {**result, '_trace': recorded.export()}
+        with span('recommender.analyze_resume', chars=len(resume_text)):
+            return self._analyze_resume(resume_text)
+
+    def _analyze_resume(self, resume_text: str) -> Dict[str, Any]:
         try:
+            # Encode the resume once when the skills and experience prompts run on one model
+            prefix = None
+            if self.prefix_caching and self._role_pair('skills') is self._role_pair('experience'):
+                prefix = self.encode_resume_prefix(resume_text)
+            
             # Analyze skills
-            skills = self.analyze_skills(resume_text)
+            with span('recommender.skills'):
+                skills = self.analyze_skills(resume_text, prefix)
             
             # Analyze experience
-            experience = self.analyze_experience(resume_text)
+            with span('recommender.experience'):
+                experience = self.analyze_experience(resume_text, prefix)
             
             # Generate job recommendations
-            recommendations = self.get_job_recommendations(skills, experience)
+            with span('recommender.job_recommendations'):
+                recommendations = self.get_job_recommendations(skills, experience)
             
             return {
                 "skills": skills,
@@ -202,7 +385,7 @@ class JobRecommender:
             return {
                 "error": str(e),
                 "skills": [],
-                "experience": {"years_of_experience": 0, "industries": [], "roles": [], "achievements": []},
+                "experience": _empty_experience(),
                 "job_recommendations": []
             }
 
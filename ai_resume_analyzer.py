@@ -1,12 +1,29 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification, AutoModelForSequenceClassification
+from transformers import (pipeline, AutoConfig, AutoTokenizer, AutoModelForTokenClassification,
+                          AutoModelForSequenceClassification)
 from sentence_transformers import SentenceTransformer, util
 import torch
 import logging
 import json
-from typing import Dict, List, Tuple
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 import re
+import numpy as np
+from bisect import bisect_left
+from contextvars import ContextVar
+from model_registry import ModelRegistry, registry as default_registry
+from skill_matcher import KeywordMatcher, SkillTaxonomy, load_taxonomy
+from resume_sections import ResumeIndex
+from analysis_cache import AnalysisCache, section_cache_key
+from job_matcher import JobMatcher
+from job_templates import JOB_TEMPLATES
+from job_index import JobIndex
+from embedding_store import open_store
+from quantization import load_quantized, quantization_mode
+from inference_scheduler import InferenceScheduler, QueueFullError
+from tracing import span, start_trace
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,51 +32,325 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Hypothesis template used by the zero-shot pipeline; kept identical so batched scores match it
+NLI_HYPOTHESIS_TEMPLATE = "This example is {}."
+
+def _device() -> int:
+    return 0 if torch.cuda.is_available() else -1
+
+
+# Stages of the analysis running in this context that fell back to an empty result
+_failed_stages: ContextVar[Optional[List[str]]] = ContextVar('failed_stages', default=None)
+
+
+def _stage_failed(stage: str) -> None:
+    """Record that a stage degraded, so the analysis it belongs to isn't cached."""
+    failed = _failed_stages.get()
+    if failed is not None:
+        failed.append(stage)
+
+
+# Bump when analysis logic changes in a way that invalidates cached results
+ANALYSIS_VERSION = "2"
+
+# Checkpoint behind each model; part of the analysis cache key
+MODEL_CHECKPOINTS = {
+    'ner': "dslim/bert-base-NER",
+    'section_classifier': "microsoft/deberta-v3-base",
+    'sentence_transformer': "all-MiniLM-L6-v2",
+    'text_generator': "gpt2",
+    'zero_shot': "facebook/bart-large-mnli"
+}
+
+# Model name -> factory; nothing is loaded until a stage first asks for it
+MODEL_FACTORIES = {
+    # NER pipeline for entity extraction
+    'ner': lambda: pipeline("ner", model=MODEL_CHECKPOINTS['ner'], device=_device()),
+    # Text classification for section identification
+    'section_classifier': lambda: pipeline("text-classification", model=MODEL_CHECKPOINTS['section_classifier'], device=_device()),
+    # Sentence transformer for semantic matching
+    'sentence_transformer': lambda: SentenceTransformer(MODEL_CHECKPOINTS['sentence_transformer']),
+    # Text generation pipeline
+    'text_generator': lambda: pipeline("text-generation", model=MODEL_CHECKPOINTS['text_generator'], device=_device()),
+    # Zero-shot classification for skill identification
+    'zero_shot': lambda: pipeline("zero-shot-classification", model=MODEL_CHECKPOINTS['zero_shot'], device=_device())
+}
+
+# CPU int8 variants, used instead of the float32 factories when quantization is enabled
+QUANTIZED_MODEL_FACTORIES = {
+    'ner': lambda: pipeline(
+        "ner",
+        model=load_quantized(
+            MODEL_CHECKPOINTS['ner'],
+            lambda: AutoModelForTokenClassification.from_pretrained(MODEL_CHECKPOINTS['ner']),
+            build_float=lambda: AutoModelForTokenClassification.from_config(
+                AutoConfig.from_pretrained(MODEL_CHECKPOINTS['ner']))
+        ),
+        tokenizer=MODEL_CHECKPOINTS['ner'],
+        device=-1
+    ),
+    'sentence_transformer': lambda: load_quantized(
+        MODEL_CHECKPOINTS['sentence_transformer'],
+        lambda: SentenceTransformer(MODEL_CHECKPOINTS['sentence_transformer'], device='cpu')
+    ),
+    'zero_shot': lambda: pipeline(
+        "zero-shot-classification",
+        model=load_quantized(
+            MODEL_CHECKPOINTS['zero_shot'],
+            lambda: AutoModelForSequenceClassification.from_pretrained(MODEL_CHECKPOINTS['zero_shot']),
+            build_float=lambda: AutoModelForSequenceClassification.from_config(
+                AutoConfig.from_pretrained(MODEL_CHECKPOINTS['zero_shot']))
+        ),
+        tokenizer=MODEL_CHECKPOINTS['zero_shot'],
+        device=-1
+    )
+}
+
+# Proficiency indicators and their scores
+PROFICIENCY_INDICATORS = {
+    'expert': 1.0,
+    'advanced': 0.8,
+    'proficient': 0.6,
+    'intermediate': 0.4,
+    'basic': 0.2
+}
+PROFICIENCY_MATCHER = KeywordMatcher(list(PROFICIENCY_INDICATORS), whole_words=False)
+
+# Minimum cosine similarity between profile and job embeddings to recommend a job
+JOB_MATCH_THRESHOLD = 0.3
+
+# Weight of the experience summary relative to a fully proficient, verified skill
+EXPERIENCE_PROFILE_WEIGHT = 0.5
+
+# Analysis stage -> models it needs, so workers can preload only what they serve
+STAGE_MODELS = {
+    'entities': ['ner'],
+    'education': [],
+    'experience': [],
+    'skills': ['zero_shot'],
+    'job_recommendations': ['sentence_transformer'],
+    'resume_improvements': []
+}
+
+class _ScheduledEncoder:
+    """SentenceTransformer-style encode() that goes through the analyzer's batching scheduler."""
+
+    def __init__(self, analyzer: 'AIResumeAnalyzer'):
+        self.analyzer = analyzer
+
+    def encode(self, texts: List[str], **kwargs):
+        # The batch function always returns normalized numpy embeddings, as JobMatcher asks
+        return np.stack(self.analyzer.scheduler.run('sentence_transformer', list(texts)))
+
+
+class _RegistryEncoder:
+    """SentenceTransformer-style encode() that looks the encoder up in the registry on each call.
+
+    Holding the model itself would keep its weights alive after the idle reaper unloads
+    it, and the next registry lookup would then load a second copy.
+    """
+
+    def __init__(self, analyzer: 'AIResumeAnalyzer'):
+        self.analyzer = analyzer
+
+    def encode(self, texts: List[str], **kwargs):
+        return self.analyzer.sentence_transformer.encode(texts, **kwargs)
+
 class AIResumeAnalyzer:
-    def __init__(self):
-        """Initialize the AI Resume Analyzer with necessary models."""
+    def __init__(self, nli_batch_size: int = 16, multi_label_skills: bool = False,
+                 registry: Optional[ModelRegistry] = None, idle_timeout: Optional[float] = None,
+                 taxonomy: Optional[SkillTaxonomy] = None,
+                 ner_batch_size: int = 8, ner_stride: int = 128,
+                 cache: Optional[AnalysisCache] = None, quantization: Optional[str] = None,
+                 incremental: Optional[bool] = None):
+        """Initialize the AI Resume Analyzer; models are loaded lazily on first use.
+
+        Args:
+            nli_batch_size: Number of premise/hypothesis pairs per zero-shot forward pass.
+            multi_label_skills: Score each skill independently (entailment vs. contradiction
+                of "has X experience") instead of against its "does not have" counterpart.
+                Halves the NLI work but may shift confidences slightly.
+            registry: Model registry to load from; defaults to the process-wide one.
+            idle_timeout: Unload models unused for this many seconds. Defaults to the
+                MODEL_IDLE_TIMEOUT environment variable; unset keeps models resident.
+            taxonomy: Skill taxonomy to match against; defaults to the one loaded from
+                SKILL_TAXONOMY_PATH or the bundled skill_taxonomy.json.
+            ner_batch_size: Number of NER windows per forward pass.
+            ner_stride: Tokens of overlap between consecutive NER windows on long resumes.
+            cache: Analysis result cache. Defaults to the SQLite cache at ANALYSIS_CACHE_PATH;
+                set ANALYSIS_CACHE=0 to disable caching.
+            quantization: 'int8' runs the NER, zero-shot and sentence models with dynamic
+                int8 Linear layers on CPU; 'none' keeps float32. Defaults to the
+                MODEL_QUANTIZATION environment variable, else 'none'.
+            incremental: Run NER and skill verification per blank-line separated section
+                and cache their outputs by section content (see analyze_sections), so an
+                edited resume only re-runs the models on changed sections. Defaults to the
+                INCREMENTAL_ANALYSIS environment variable ('1' to enable).
+        """
+        self.nli_batch_size = nli_batch_size
+        self.ner_batch_size = ner_batch_size
+        self.ner_stride = ner_stride
+        self.multi_label_skills = multi_label_skills
+        self.registry = registry or default_registry
+        self.quantization = quantization_mode(quantization)
+        if incremental is None:
+            incremental = os.getenv('INCREMENTAL_ANALYSIS', '0') == '1'
+        self.incremental = incremental
+        self._job_matcher = None
+        self._job_index = None
+        # Set by enable_batching(); forward passes then share batches across requests
+        self.scheduler: Optional[InferenceScheduler] = None
+        # Fast tokenizers raise "Already borrowed" when used from two threads at once;
+        # with batching, request threads tokenize while the scheduler thread pads
+        self._tokenizer_locks = {'ner': threading.Lock(), 'zero_shot': threading.Lock()}
         try:
-            # Initialize NER pipeline for entity extraction
-            self.ner_pipeline = pipeline(
-                "ner",
-                model="dslim/bert-base-NER",
-                device=0 if torch.cuda.is_available() else -1
-            )
-            
-            # Initialize text classification for section identification
-            self.section_classifier = pipeline(
-                "text-classification",
-                model="microsoft/deberta-v3-base",
-                device=0 if torch.cuda.is_available() else -1
-            )
+            self.taxonomy = taxonomy or load_taxonomy()
             
-            # Initialize sentence transformer for semantic matching
-            self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
+            if cache is None and os.getenv('ANALYSIS_CACHE', '1') != '0':
+                cache = AnalysisCache()
+            self.cache = cache
             
-            # Initialize text generation pipeline
-            self.text_generator = pipeline(
-                "text-generation",
-                model="gpt2",
-                device=0 if torch.cuda.is_available() else -1
-            )
+            for name, factory in MODEL_FACTORIES.items():
+                self.registry.register(name, factory)
+            if self.quantization == 'int8':
+                for name, factory in QUANTIZED_MODEL_FACTORIES.items():
+                    self.registry.register(self._model_key(name), factory)
             
-            # Initialize zero-shot classification for skill identification
-            self.zero_shot = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
-                device=0 if torch.cuda.is_available() else -1
-            )
+            if idle_timeout is None and os.getenv('MODEL_IDLE_TIMEOUT'):
+                idle_timeout = float(os.getenv('MODEL_IDLE_TIMEOUT'))
+            if idle_timeout:
+                self.registry.start_reaper(idle_timeout)
             
             logger.info("AI Resume Analyzer initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing AI Resume Analyzer: {str(e)}")
             raise
 
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
-        """Extract named entities from resume text."""
+    def _model_key(self, name: str) -> str:
+        """Registry key of a model in this analyzer's quantization mode."""
+        if self.quantization != 'none' and name in QUANTIZED_MODEL_FACTORIES:
+            return f"{name}:{self.quantization}"
+        return name
+
+    @property
+    def ner_pipeline(self):
+        return self.registry.get(self._model_key('ner'))
+
+    @property
+    def section_classifier(self):
+        return self.registry.get('section_classifier')
+
+    @property
+    def sentence_transformer(self):
+        return self.registry.get(self._model_key('sentence_transformer'))
+
+    @property
+    def text_generator(self):
+        return self.registry.get('text_generator')
+
+    @property
+    def zero_shot(self):
+        return self.registry.get(self._model_key('zero_shot'))
+
+    def warm_up(self, stages: Optional[List[str]] = None) -> None:
+        """Load the models needed by the given analysis stages (all stages by default)."""
+        stages = stages or list(STAGE_MODELS)
+        unknown = [stage for stage in stages if stage not in STAGE_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown analysis stages: {', '.join(unknown)}")
+        self.registry.preload({self._model_key(name) for stage in stages for name in STAGE_MODELS[stage]})
+
+    def resident_models(self) -> Dict[str, Dict[str, float]]:
+        """Report which models are loaded and their estimated memory use."""
+        return self.registry.resident()
+
+    def version_info(self) -> Dict[str, str]:
+        """Versions of everything that determines an analysis result, used as cache key."""
+        versions = {
+            'analysis': ANALYSIS_VERSION,
+            'ner': MODEL_CHECKPOINTS['ner'],
+            'zero_shot': MODEL_CHECKPOINTS['zero_shot'],
+            'sentence_transformer': MODEL_CHECKPOINTS['sentence_transformer'],
+            'taxonomy': self.taxonomy.version,
+            'quantization': self.quantization,
+            'skill_scoring': 'multi_label' if self.multi_label_skills else 'paired'
+        }
+        if self.incremental:
+            # Per-section model outputs differ slightly from whole-document ones
+            versions['granularity'] = 'section'
+        return versions
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the analysis cache, or an empty dict when disabled."""
+        return self.cache.stats() if self.cache else {}
+
+    def enable_batching(self, **limits) -> InferenceScheduler:
+        """Route NER, NLI and embedding forward passes through a micro-batching scheduler.
+
+        Concurrent analyze_resume calls (from different threads) then share forward
+        passes. limits are passed to InferenceScheduler (max_batch_size, max_wait_ms,
+        max_queue, batch_sizes).
+        """
+        if self.scheduler is None:
+            self.scheduler = InferenceScheduler({
+                'ner': self._ner_batch,
+                'zero_shot': self._nli_batch,
+                'sentence_transformer': self._embed_batch
+            }, **limits)
+            self._job_matcher = None  # Rebuild it on the batched encoder
+        return self.scheduler
+
+    def _run_batched(self, model: str, items: List, batch_fn, batch_size: int) -> List:
+        """Run items through a batch function, via the scheduler when batching is enabled."""
+        with span(f"model.{model}", items=len(items), batched=self.scheduler is not None):
+            if self.scheduler is not None:
+                return self.scheduler.run(model, items)
+            results = []
+            for start in range(0, len(items), batch_size):
+                results.extend(batch_fn(items[start:start + batch_size]))
+            return results
+
+    def _ner_batch(self, windows: List[Dict[str, List[int]]]) -> List[torch.Tensor]:
+        """One NER forward pass over unpadded token windows; returns per-token label probabilities."""
+        ner = self.ner_pipeline
+        tokens = sum(len(window["input_ids"]) for window in windows)
+        with span('forward.ner', batch_size=len(windows), tokens=tokens):
+            with self._tokenizer_locks['ner']:
+                batch = ner.tokenizer.pad(windows, return_tensors="pt")
+            batch = {key: value.to(ner.model.device) for key, value in batch.items()}
+            with torch.no_grad():
+                probabilities = ner.model(**batch).logits.softmax(dim=-1).cpu()
+        return [probabilities[i, :len(window["input_ids"])] for i, window in enumerate(windows)]
+
+    def _nli_batch(self, pairs: List[Tuple[str, str]]) -> List[torch.Tensor]:
+        """One NLI forward pass over (premise, hypothesis) pairs; returns each pair's logits."""
+        model = self.zero_shot.model
+        with span('forward.zero_shot', batch_size=len(pairs)) as stage:
+            with self._tokenizer_locks['zero_shot']:
+                inputs = self.zero_shot.tokenizer(
+                    [premise for premise, _ in pairs],
+                    [hypothesis for _, hypothesis in pairs],
+                    return_tensors="pt",
+                    padding=True,
+                    truncation="only_first"
+                ).to(model.device)
+            stage.set(tokens=int(inputs['attention_mask'].sum()))
+            with torch.no_grad():
+                return list(model(**inputs).logits.cpu())
+
+    def _embed_batch(self, texts: List[str]) -> List:
+        """Normalized sentence embeddings for texts in one encode call."""
+        with span('forward.sentence_transformer', batch_size=len(texts)):
+            return list(self.sentence_transformer.encode(
+                texts,
+                batch_size=len(texts),
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            ))
+
+    def extract_entities(self, text: str, spans: Optional[List[Dict]] = None) -> Dict[str, List[str]]:
+        """Extract named entities from resume text (or group already extracted spans)."""
         try:
-            entities = self.ner_pipeline(text)
-            
             # Organize entities by type
             entity_dict = {
                 'PER': [],  # Person names
@@ -68,255 +359,466 @@ class AIResumeAnalyzer:
                 'MISC': []  # Other entities
             }
             
-            for entity in entities:
-                entity_type = entity['entity'][2:]  # Remove B- or I- prefix
-                if entity_type in entity_dict:
-                    entity_dict[entity_type].append(entity['word'])
+            for entity in spans if spans is not None else self.extract_entity_spans(text):
+                if entity['type'] in entity_dict:
+                    entity_dict[entity['type']].append(entity['text'])
             
             return entity_dict
+        except QueueFullError:
+            raise  # Back-pressure: the whole request is retried, not served degraded
         except Exception as e:
             logger.error(f"Error in entity extraction: {str(e)}")
+            _stage_failed('entities')
             return {}
 
-    def extract_education(self, text: str) -> List[Dict[str, str]]:
+    def extract_entity_spans(self, text: str) -> List[Dict]:
+        """Run NER over overlapping windows covering the whole text and merge whole entities.
+
+        The text is tokenized into max-length windows overlapping by ner_stride tokens and
+        the windows are run in batches of ner_batch_size. A token seen by several windows
+        keeps the prediction from the window where it sits furthest from an edge, then
+        consecutive B-/I- tokens of one type are merged into entities with character offsets.
+        """
+        return self.extract_entity_spans_many([text])[0]
+
+    def extract_entity_spans_many(self, texts: List[str]) -> List[List[Dict]]:
+        """extract_entity_spans for several texts, with all their windows sharing batches."""
+        if not any(text.strip() for text in texts):
+            return [[] for _ in texts]
+        
+        ner = self.ner_pipeline
+        model, tokenizer = ner.model, ner.tokenizer
+        max_length = min(tokenizer.model_max_length, 512)
+        documents = []
+        windows = []
+        for text in texts:
+            if not text.strip():
+                documents.append(None)
+                continue
+            with self._tokenizer_locks['ner']:
+                encoding = tokenizer(
+                    text,
+                    max_length=max_length,
+                    stride=min(self.ner_stride, max_length // 2),
+                    truncation=True,
+                    return_overflowing_tokens=True,
+                    return_offsets_mapping=True,
+                    return_special_tokens_mask=True
+                )
+            offsets = encoding.pop("offset_mapping")
+            special = encoding.pop("special_tokens_mask")
+            encoding.pop("overflow_to_sample_mapping", None)
+            documents.append((len(windows), offsets, special))
+            windows.extend(
+                {key: values[window] for key, values in encoding.items()}
+                for window in range(len(encoding["input_ids"]))
+            )
+        
+        # Batched forward passes over all windows
+        probabilities = self._run_batched('ner', windows, self._ner_batch, self.ner_batch_size)
+        predictions = [window_probabilities.max(dim=-1) for window_probabilities in probabilities]
+        
+        results = []
+        for text, document in zip(texts, documents):
+            if document is None:
+                results.append([])
+                continue
+            first, offsets, special = document
+            results.append(self._merge_entity_tokens(
+                text, offsets, special, predictions[first:first + len(offsets)], model.config.id2label
+            ))
+        return results
+
+    @staticmethod
+    def _merge_entity_tokens(text: str, offsets: List, special: List, predictions: List,
+                             id2label: Dict[int, str]) -> List[Dict]:
+        """Merge one text's per-window token predictions into entities with character offsets."""
+        # De-duplicate overlapping windows: keep each token's most central prediction
+        tokens = {}
+        for window, window_offsets in enumerate(offsets):
+            scores, label_ids = predictions[window]
+            content = [i for i, is_special in enumerate(special[window]) if not is_special]
+            if not content:
+                continue
+            first, last = content[0], content[-1]
+            for i in content:
+                token_start, token_end = window_offsets[i]
+                if token_start == token_end:
+                    continue
+                centrality = min(i - first, last - i)
+                key = (token_start, token_end)
+                if key not in tokens or centrality > tokens[key][0]:
+                    label = id2label[label_ids[i].item()]
+                    tokens[key] = (centrality, label, scores[i].item())
+        
+        # Merge B-/I- tokens into whole entities
+        entities = []
+        current = None
+        for (token_start, token_end), (_, label, score) in sorted(tokens.items()):
+            prefix, _, entity_type = label.partition('-')
+            if label == 'O' or not entity_type:
+                current = None
+                continue
+            continues = (
+                current is not None
+                and current['type'] == entity_type
+                and (prefix == 'I' or token_start == current['end'])  # I- tag or same-word subword
+            )
+            if continues:
+                current['end'] = token_end
+                current['scores'].append(score)
+            else:
+                current = {'type': entity_type, 'start': token_start, 'end': token_end, 'scores': [score]}
+                entities.append(current)
+        
+        return [
+            {
+                'type': entity['type'],
+                'text': text[entity['start']:entity['end']],
+                'start': entity['start'],
+                'end': entity['end'],
+                'score': sum(entity['scores']) / len(entity['scores'])
+            }
+            for entity in entities
+        ]
+
+    def analyze_sections(self, index: ResumeIndex) -> Tuple[List[Dict], Dict[str, float]]:
+        """Entity spans and skill confidences computed section by section, reusing cached sections.
+
+        Each blank-line separated section is analyzed on its own: NER runs over the
+        section text, and every taxonomy skill it mentions is verified with the section
+        as the NLI premise. Outputs are cached by section content, so re-uploading an
+        edited resume only sends its new or changed sections through the models; all of
+        them share batched forward passes. A skill's confidence is its best score across
+        the sections mentioning it. Returns (entity spans with document offsets,
+        {skill: confidence}).
+        """
+        versions = self.version_info()
+        keys = [section_cache_key(section.text, versions) for section in index.sections]
+        cached = {}
+        if self.cache:
+            try:
+                cached = self.cache.get_sections(keys)
+            except Exception as e:
+                logger.warning(f"Section cache lookup failed: {str(e)}")
+        changed = {
+            key: section for key, section in zip(keys, index.sections)
+            if key not in cached and section.text.strip()
+        }
+        
+        with span('analyzer.section_models', sections=len(keys), reanalyzed=len(changed)):
+            fresh = {}
+            if changed:
+                sections = list(changed.values())
+                spans = self.extract_entity_spans_many([section.text for section in sections])
+                keywords = [[keyword for _, keyword, _ in self.taxonomy.find_skills(section.lower)] for section in sections]
+                scores = iter(self._score_skill_claims([
+                    (section.lower, keyword)
+                    for section, section_keywords in zip(sections, keywords)
+                    for keyword in section_keywords
+                ]))
+                for key, section_spans, section_keywords in zip(changed, spans, keywords):
+                    fresh[key] = {
+                        'entities': section_spans,
+                        'skills': {keyword: next(scores) for keyword in section_keywords}
+                    }
+                if self.cache:
+                    try:
+                        self.cache.put_sections(versions, fresh)
+                    except Exception as e:
+                        logger.warning(f"Could not cache section results: {str(e)}")
+        
+        # Merge the sections back in document order
+        entities = []
+        confidences = {}
+        for key, section in zip(keys, index.sections):
+            record = cached.get(key) or fresh.get(key)
+            if record is None:
+                continue  # Blank section
+            for entity in record['entities']:
+                entities.append({**entity, 'start': entity['start'] + section.start, 'end': entity['end'] + section.start})
+            for keyword, confidence in record['skills'].items():
+                confidences[keyword] = max(confidence, confidences.get(keyword, 0.0))
+        return entities, confidences
+
+    def extract_education(self, text: str, index: Optional[ResumeIndex] = None) -> List[Dict[str, str]]:
         """Extract education information from resume text."""
         try:
-            # Define education-related keywords
-            edu_keywords = ['education', 'degree', 'bachelor', 'master', 'phd', 'diploma', 'certification']
-            
-            # Split text into sections
-            sections = text.split('\n\n')
+            # Reuse the document's section index when the caller already built it
+            index = index or ResumeIndex(text)
             
             education_info = []
-            for section in sections:
+            for section in index.sections:
                 # Check if section is about education
-                if any(keyword in section.lower() for keyword in edu_keywords):
+                if section.is_education:
                     # Extract degree and institution
-                    degree_match = re.search(r'(Bachelor|Master|PhD|B\.?Tech|M\.?Tech|B\.?E|M\.?E|B\.?S|M\.?S)[^,]*', section)
-                    institution_match = re.search(r'([A-Z][a-zA-Z\s&]+(?:University|College|Institute|School))', section)
+                    degree_match = section.degree
+                    institution_match = section.institution
                     
                     if degree_match or institution_match:
                         education_info.append({
                             'degree': degree_match.group(0) if degree_match else '',
                             'institution': institution_match.group(0) if institution_match else '',
-                            'section': section.strip()
+                            'section': section.text.strip()
                         })
             
             return education_info
         except Exception as e:
             logger.error(f"Error extracting education: {str(e)}")
+            _stage_failed('education')
             return []
 
-    def extract_experience(self, text: str) -> List[Dict[str, str]]:
+    def extract_experience(self, text: str, index: Optional[ResumeIndex] = None) -> List[Dict[str, str]]:
         """Extract work experience from resume text."""
         try:
-            # Define experience-related keywords
-            exp_keywords = ['experience', 'work', 'employment', 'job', 'position']
-            
-            # Split text into sections
-            sections = text.split('\n\n')
+            # Reuse the document's section index when the caller already built it
+            index = index or ResumeIndex(text)
             
             experience_info = []
-            for section in sections:
+            for section in index.sections:
                 # Check if section is about experience
-                if any(keyword in section.lower() for keyword in exp_keywords):
+                if section.is_experience:
                     # Extract company and position
-                    company_match = re.search(r'([A-Z][a-zA-Z\s&]+(?:Inc\.|Corp\.|LLC|Ltd\.|Company))', section)
-                    position_match = re.search(r'(Senior|Junior|Lead|Manager|Director|Engineer|Developer|Designer|Architect|Consultant|Analyst|Scientist)[^,]*', section)
+                    company_match = section.company
+                    position_match = section.position
                     
                     if company_match or position_match:
                         experience_info.append({
                             'company': company_match.group(0) if company_match else '',
                             'position': position_match.group(0) if position_match else '',
-                            'section': section.strip()
+                            'section': section.text.strip()
                         })
             
             return experience_info
         except Exception as e:
             logger.error(f"Error extracting experience: {str(e)}")
+            _stage_failed('experience')
             return []
 
-    def extract_skills(self, text: str) -> List[Dict[str, float]]:
-        """Analyze skills and their proficiency levels."""
+    def extract_skills(self, text: str, index: Optional[ResumeIndex] = None,
+                       verified: Optional[Dict[str, float]] = None) -> List[Dict[str, float]]:
+        """Analyze skills and their proficiency levels.
+
+        verified maps skills to confidences already computed (by analyze_sections); the
+        zero-shot verification is then skipped.
+        """
         try:
-            # Define skill categories and keywords
-            skill_categories = {
-                'programming': ['python', 'java', 'javascript', 'c++', 'sql', 'ruby', 'php', 'swift', 'kotlin'],
-                'frameworks': ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'laravel', 'express', 'node.js'],
-                'databases': ['mysql', 'postgresql', 'mongodb', 'redis', 'oracle', 'sqlite', 'elasticsearch'],
-                'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'ci/cd'],
-                'tools': ['git', 'jira', 'confluence', 'slack', 'trello', 'bitbucket', 'github'],
-                'soft_skills': ['leadership', 'communication', 'problem-solving', 'teamwork', 'project management'],
-                'ai_ml': ['machine learning', 'deep learning', 'tensorflow', 'pytorch', 'scikit-learn', 'nlp'],
-                'mobile': ['android', 'ios', 'react native', 'flutter', 'mobile development'],
-                'web': ['html', 'css', 'sass', 'less', 'webpack', 'babel', 'rest api', 'graphql']
-            }
+            # Convert text to lowercase for matching (cached on the index when available)
+            text_lower = index.lower if index else text.lower()
+            
+            # Find every taxonomy skill and all of its mentions in a single pass
+            matched = self.taxonomy.find_skills(text_lower)
             
-            # Convert text to lowercase for matching
-            text_lower = text.lower()
+            # Proficiency indicators are located once and shared by every skill
+            indicator_spans = self._find_proficiency_indicators(text_lower)
+            
+            # Verify all matched skills with batched zero-shot classification
+            if verified is None:
+                confidences = self._verify_skills(text_lower, [keyword for _, keyword, _ in matched])
+            else:
+                confidences = [verified.get(keyword, 0.0) for _, keyword, _ in matched]
             
-            # Analyze skills using zero-shot classification
             skills = []
-            for category, keywords in skill_categories.items():
-                for keyword in keywords:
-                    if keyword in text_lower:
-                        # Use zero-shot classification to determine if the skill is mentioned
-                        result = self.zero_shot(
-                            text_lower,
-                            candidate_labels=[f"has {keyword} experience", f"does not have {keyword} experience"]
-                        )
-                        
-                        if result['scores'][0] > 0.5:  # If confidence is high
-                            proficiency = self._calculate_skill_proficiency(text_lower, keyword)
-                            skills.append({
-                                'name': keyword,
-                                'category': category,
-                                'proficiency': proficiency,
-                                'confidence': result['scores'][0]
-                            })
+            for (category, keyword, positions), confidence in zip(matched, confidences):
+                if confidence > 0.5:  # If confidence is high
+                    proficiency = self._calculate_skill_proficiency(
+                        text_lower, keyword, positions, indicator_spans
+                    )
+                    skills.append({
+                        'name': keyword,
+                        'category': category,
+                        'proficiency': proficiency,
+                        'confidence': confidence
+                    })
             
             return skills
+        except QueueFullError:
+            raise  # Back-pressure: the whole request is retried, not served degraded
         except Exception as e:
             logger.error(f"Error in skill analysis: {str(e)}")
+            _stage_failed('skills')
+            return []
+
+    def _verify_skills(self, text: str, keywords: List[str]) -> List[float]:
+        """Score how confidently the text supports having each skill, in batched NLI passes.
+
+        In the default mode each skill gets the probability of "has X experience" against
+        "does not have X experience", exactly as a per-keyword zero-shot call would compute
+        it. In multi-label mode each skill is scored on its own hypothesis alone.
+        """
+        return self._score_skill_claims([(text, keyword) for keyword in keywords])
+
+    def _score_skill_claims(self, claims: List[Tuple[str, str]]) -> List[float]:
+        """_verify_skills for (premise, keyword) claims that may have different premises."""
+        if not claims:
             return []
+        
+        entailment_id = self.zero_shot.entailment_id
+        contradiction_id = -1 if entailment_id == 0 else 0
+        
+        if self.multi_label_skills:
+            pairs = [
+                (premise, NLI_HYPOTHESIS_TEMPLATE.format(f"has {keyword} experience"))
+                for premise, keyword in claims
+            ]
+        else:
+            pairs = [
+                (premise, NLI_HYPOTHESIS_TEMPLATE.format(label))
+                for premise, keyword in claims
+                for label in (f"has {keyword} experience", f"does not have {keyword} experience")
+            ]
+        logits = torch.stack(self._run_batched('zero_shot', pairs, self._nli_batch, self.nli_batch_size))
+        
+        if self.multi_label_skills:
+            scores = logits[:, [contradiction_id, entailment_id]].softmax(dim=-1)[:, 1]
+        else:
+            # Softmax over each skill's (has, does not have) entailment logits
+            scores = logits[:, entailment_id].view(-1, 2).softmax(dim=-1)[:, 0]
+        return scores.tolist()
 
-    def _calculate_skill_proficiency(self, text: str, skill: str) -> float:
-        """Calculate proficiency level for a skill based on context."""
+    def _find_proficiency_indicators(self, text: str) -> List[Tuple[int, int, float]]:
+        """Locate every proficiency indicator in the text as (start, end, score)."""
+        return sorted(
+            (start, end, PROFICIENCY_INDICATORS[indicator])
+            for start, end, indicator in PROFICIENCY_MATCHER.finditer(text)
+        )
+
+    def _calculate_skill_proficiency(self, text: str, skill: str,
+                                     positions: Optional[List[int]] = None,
+                                     indicator_spans: Optional[List[Tuple[int, int, float]]] = None) -> float:
+        """Calculate proficiency level for a skill based on the context of all its mentions."""
         try:
-            # Define proficiency indicators
-            indicators = {
-                'expert': 1.0,
-                'advanced': 0.8,
-                'proficient': 0.6,
-                'intermediate': 0.4,
-                'basic': 0.2
-            }
-            
-            # Find the context around the skill
-            skill_index = text.find(skill)
-            if skill_index == -1:
+            # Find every mention of the skill unless the caller already has them
+            if positions is None:
+                positions = KeywordMatcher([skill]).find_positions(text).get(skill, [])
+            if not positions:
                 return 0.0
-                
-            # Look for proficiency indicators in the context
-            context = text[max(0, skill_index-50):min(len(text), skill_index+50)]
-            for indicator, score in indicators.items():
-                if indicator in context:
-                    return score
-            
-            return 0.3  # Default to basic proficiency if no indicator found
+            if indicator_spans is None:
+                indicator_spans = self._find_proficiency_indicators(text)
+            
+            # Take the strongest indicator found in the context around any mention
+            best = None
+            starts = [start for start, _, _ in indicator_spans]
+            for skill_index in positions:
+                context_start = max(0, skill_index-50)
+                context_end = min(len(text), skill_index+50)
+                for start, end, score in indicator_spans[bisect_left(starts, context_start):]:
+                    if start >= context_end:
+                        break
+                    if end <= context_end and (best is None or score > best):
+                        best = score
+            
+            return best if best is not None else 0.3  # Default to basic proficiency if no indicator found
         except Exception as e:
             logger.error(f"Error calculating skill proficiency: {str(e)}")
+            _stage_failed('skill_proficiency')
             return 0.0
 
-    def generate_job_recommendations(self, skills: List[Dict[str, float]], experience: str) -> List[Dict[str, str]]:
-        """Generate job recommendations based on skills and experience."""
+    @property
+    def job_matcher(self) -> JobMatcher:
+        """Embedding matcher over JOB_TEMPLATES, built once on first use.
+
+        Reads precomputed embeddings from the shared store at EMBEDDING_STORE_PATH, if any.
+        """
+        if self._job_matcher is None:
+            jobs = [{'id': job_id, **template} for job_id, template in JOB_TEMPLATES.items()]
+            # Stored embeddings come from the float32 encoder; don't mix them with int8 ones
+            store = open_store(readonly=True) if self.quantization == 'none' else None
+            encoder = _ScheduledEncoder(self) if self.scheduler is not None else _RegistryEncoder(self)
+            self._job_matcher = JobMatcher(encoder, jobs, store=store)
+        return self._job_matcher
+
+    @property
+    def job_index(self) -> Optional[JobIndex]:
+        """Job catalog index loaded from JOB_INDEX_PATH on first use, if configured."""
+        if self._job_index is None and os.getenv('JOB_INDEX_PATH'):
+            self._job_index = JobIndex.load(os.getenv('JOB_INDEX_PATH'))
+        return self._job_index
+
+    def generate_job_recommendations(self, skills: List[Dict[str, float]], experience: str,
+                                     **filters) -> List[Dict[str, str]]:
+        """Generate job recommendations based on skills and experience.
+
+        Searches the job catalog index when one is configured (filters such as location
+        or salary_band are passed to it), otherwise the built-in job templates.
+        """
         try:
-            # Define job templates with detailed requirements
-            job_templates = {
-                'software_engineer': {
-                    'title': 'Software Engineer',
-                    'description': 'Develop and maintain software applications using modern technologies.',
-                    'required_skills': ['programming', 'frameworks', 'databases'],
-                    'salary_range': '₹6-15 LPA',
-                    'growth_path': 'Senior Software Engineer → Technical Lead → Engineering Manager'
-                },
-                'data_scientist': {
-                    'title': 'Data Scientist',
-                    'description': 'Analyze complex data sets and develop machine learning models.',
-                    'required_skills': ['python', 'machine learning', 'data analysis'],
-                    'salary_range': '₹8-20 LPA',
-                    'growth_path': 'Senior Data Scientist → Data Science Lead → Chief Data Scientist'
-                },
-                'devops_engineer': {
-                    'title': 'DevOps Engineer',
-                    'description': 'Manage and optimize cloud infrastructure and deployment pipelines.',
-                    'required_skills': ['cloud', 'tools', 'programming'],
-                    'salary_range': '₹7-18 LPA',
-                    'growth_path': 'Senior DevOps Engineer → DevOps Lead → Cloud Architect'
-                },
-                'full_stack_developer': {
-                    'title': 'Full Stack Developer',
-                    'description': 'Develop end-to-end web applications using modern frameworks.',
-                    'required_skills': ['programming', 'frameworks', 'web'],
-                    'salary_range': '₹5-12 LPA',
-                    'growth_path': 'Senior Full Stack Developer → Technical Lead → Solution Architect'
-                },
-                'mobile_developer': {
-                    'title': 'Mobile Developer',
-                    'description': 'Develop mobile applications for iOS and Android platforms.',
-                    'required_skills': ['mobile', 'programming', 'frameworks'],
-                    'salary_range': '₹6-15 LPA',
-                    'growth_path': 'Senior Mobile Developer → Mobile Lead → Mobile Architect'
-                }
-            }
+            # Weighted profile: each verified skill by proficiency and confidence, plus experience
+            profile = [(skill['name'], skill['proficiency'] * skill.get('confidence', 1.0)) for skill in skills]
+            if experience and experience.strip():
+                profile.append((experience.strip(), EXPERIENCE_PROFILE_WEIGHT))
             
-            # Calculate job matches
+            # Score every job with one matrix-vector product and keep the top 3
             recommendations = []
-            for job_id, template in job_templates.items():
-                match_score = self._calculate_job_match(skills, template['required_skills'])
-                if match_score > 0.5:  # Only recommend jobs with >50% match
-                    recommendations.append({
-                        'title': template['title'],
-                        'description': template['description'],
-                        'match_score': match_score,
-                        'salary_range': template['salary_range'],
-                        'growth_path': template['growth_path'],
-                        'explanation': self._generate_match_explanation(skills, template['required_skills'])
-                    })
-            
-            # Sort by match score
-            recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-            return recommendations[:3]  # Return top 3 recommendations
+            if self.job_index is not None:
+                matches = self.job_matcher.match_index(
+                    self.job_index, profile, top_k=3, min_score=JOB_MATCH_THRESHOLD, **filters
+                )
+            else:
+                matches = self.job_matcher.match(profile, top_k=3, min_score=JOB_MATCH_THRESHOLD)
+            for match in matches:
+                template = match['job']
+                recommendations.append({
+                    'title': template['title'],
+                    'description': template.get('description', ''),
+                    'match_score': match['score'],
+                    'salary_range': template.get('salary_range', ''),
+                    'growth_path': template.get('growth_path', ''),
+                    'skill_contributions': [
+                        {'skill': phrase, 'contribution': contribution}
+                        for phrase, contribution in match['contributions']
+                    ],
+                    'explanation': self._generate_match_explanation(skills, match['contributions'])
+                })
+            
+            return recommendations
+        except QueueFullError:
+            raise  # Back-pressure: the whole request is retried, not served degraded
         except Exception as e:
             logger.error(f"Error generating job recommendations: {str(e)}")
+            _stage_failed('job_recommendations')
             return []
 
-    def _calculate_job_match(self, skills: List[Dict[str, float]], required_skills: List[str]) -> float:
-        """Calculate match score between candidate skills and job requirements."""
-        try:
-            if not skills or not required_skills:
-                return 0.0
-                
-            # Convert skills to set for easier matching
-            candidate_skills = {skill['name'] for skill in skills}
-            required_skills_set = set(required_skills)
-            
-            # Calculate match score
-            matching_skills = candidate_skills.intersection(required_skills_set)
-            return len(matching_skills) / len(required_skills_set)
-        except Exception as e:
-            logger.error(f"Error calculating job match: {str(e)}")
-            return 0.0
-
-    def _generate_match_explanation(self, skills: List[Dict[str, float]], required_skills: List[str]) -> str:
-        """Generate explanation for why the candidate matches the job requirements."""
+    def _generate_match_explanation(self, skills: List[Dict[str, float]],
+                                    contributions: List[Tuple[str, float]]) -> str:
+        """Generate explanation for why the candidate matches the job, strongest skills first."""
         try:
-            matching_skills = [skill for skill in skills if skill['name'] in required_skills]
+            proficiencies = {skill['name']: skill['proficiency'] for skill in skills}
+            total = sum(contribution for _, contribution in contributions)
+            matching_skills = [
+                (name, contribution) for name, contribution in contributions
+                if name in proficiencies and contribution > 0
+            ][:5]
             if not matching_skills:
                 return "Candidate's skills do not match the job requirements."
                 
             explanation = "Candidate is well-suited for this role because they have:"
-            for skill in matching_skills:
-                proficiency = "high" if skill['proficiency'] > 0.7 else "good" if skill['proficiency'] > 0.4 else "basic"
-                explanation += f"\n- {proficiency} proficiency in {skill['name']}"
+            for name, contribution in matching_skills:
+                proficiency = "high" if proficiencies[name] > 0.7 else "good" if proficiencies[name] > 0.4 else "basic"
+                explanation += f"\n- {proficiency} proficiency in {name}"
+                if total > 0:
+                    explanation += f" ({contribution / total:.0%} of match)"
             
             return explanation
         except Exception as e:
             logger.error(f"Error generating match explanation: {str(e)}")
+            _stage_failed('match_explanation')
             return "Unable to generate match explanation."
 
-    def generate_resume_improvements(self, text: str, skills: List[Dict[str, float]]) -> List[str]:
+    def generate_resume_improvements(self, text: str, skills: List[Dict[str, float]],
+                                     index: Optional[ResumeIndex] = None) -> List[str]:
         """Generate suggestions for resume improvement."""
         try:
+            # Every check reads facts computed once by the section index
+            index = index or ResumeIndex(text)
             improvements = []
             
             # Check for ATS optimization
-            if not any(keyword in text.lower() for keyword in ['experience', 'skills', 'education']):
+            if not index.has_section_headers:
                 improvements.append("Add clear section headers (Experience, Skills, Education) to improve ATS compatibility.")
             
             # Check for keyword optimization
-            common_keywords = ['achieved', 'developed', 'led', 'managed', 'improved', 'increased', 'reduced', 'optimized']
-            if not any(keyword in text.lower() for keyword in common_keywords):
+            if not index.has_action_verbs:
                 improvements.append("Use action verbs (achieved, developed, led) to describe your accomplishments.")
             
             # Check for skills presentation
@@ -324,44 +826,118 @@ class AIResumeAnalyzer:
                 improvements.append("Add more specific technical skills to highlight your expertise.")
             
             # Check for metrics
-            if not any(char.isdigit() for char in text):
+            if not index.has_digits:
                 improvements.append("Include quantifiable achievements (e.g., 'increased efficiency by 25%').")
             
             # Check for education details
-            if not re.search(r'(Bachelor|Master|PhD|B\.?Tech|M\.?Tech|B\.?E|M\.?E|B\.?S|M\.?S)', text):
+            if not index.has_degree:
                 improvements.append("Clearly specify your educational qualifications with degrees and institutions.")
             
             # Check for experience details
-            if not re.search(r'\d{4}[-–]\d{4}|\d{4}[-–]present', text):
+            if not index.has_date_ranges:
                 improvements.append("Include dates for your work experience to show career progression.")
             
             return improvements
         except Exception as e:
             logger.error(f"Error generating resume improvements: {str(e)}")
+            _stage_failed('improvements')
             return []
 
-    def analyze_resume(self, text: str) -> Dict:
-        """Perform comprehensive resume analysis."""
+    def analyze_resume(self, text: str, use_cache: bool = True, trace: bool = False) -> Dict:
+        """Perform comprehensive resume analysis.
+
+        Results are served from the analysis cache when an identical resume was analyzed
+        under the same model and taxonomy versions; pass use_cache=False to bypass it.
+        With trace set, the result carries a '_trace' of per-stage and per-model-call
+        timings (wall, CPU, tokens, batch size, RSS change).
+        """
+        if trace:
+            with start_trace() as recorded:
+                result = self.analyze_resume(text, use_cache)
+            return {**result, '_trace': recorded.export()}
+        with span('analyzer.analyze_resume', chars=len(text)):
+            return self._analyze_resume(text, use_cache)
+
+    def _analyze_resume(self, text: str, use_cache: bool) -> Dict:
+        use_cache = bool(self.cache) and use_cache
+        if use_cache:
+            versions = self.version_info()
+            with span('analyzer.cache_lookup') as stage:
+                try:
+                    cached = self.cache.get(text, versions)
+                except Exception as e:
+                    # e.g. "database is locked" under concurrent writers; analyze instead
+                    logger.warning(f"Analysis cache lookup failed: {str(e)}")
+                    cached = None
+                stage.set(hit=cached is not None)
+            if cached is not None:
+                return cached
+        
+        failed: List[str] = []
+        token = _failed_stages.set(failed)
         try:
+            result = self._run_stages(text)
+        finally:
+            _failed_stages.reset(token)
+        
+        # Only complete analyses are cached; a transient model failure must not stick for the TTL
+        if use_cache and 'error' not in result:
+            if failed:
+                logger.warning(f"Not caching analysis with failed stages: {', '.join(failed)}")
+            else:
+                try:
+                    self.cache.put(text, versions, result)
+                except Exception as e:
+                    logger.warning(f"Could not cache analysis: {str(e)}")
+        return result
+
+    def _run_stages(self, text: str) -> Dict:
+        try:
+            # Segment the document once for all extractors and improvement rules
+            with span('analyzer.sections'):
+                index = ResumeIndex(text)
+            
+            # In incremental mode the model stages run per section, only on uncached sections
+            section_spans = verified = None
+            sections_failed = False
+            if self.incremental:
+                try:
+                    section_spans, verified = self.analyze_sections(index)
+                except QueueFullError:
+                    raise  # Back-pressure: the whole request is retried, not served degraded
+                except Exception as e:
+                    # Same degradation as the document path: only the model stages come back empty
+                    logger.error(f"Error in section analysis: {str(e)}")
+                    _stage_failed('entities')
+                    _stage_failed('skills')
+                    sections_failed = True
+            
             # Extract entities
-            entities = self.extract_entities(text)
+            with span('analyzer.entities'):
+                entities = {} if sections_failed else self.extract_entities(text, section_spans)
             
             # Extract education information
-            education = self.extract_education(text)
+            with span('analyzer.education'):
+                education = self.extract_education(text, index)
             
             # Extract experience information
-            experience = self.extract_experience(text)
+            with span('analyzer.experience'):
+                experience = self.extract_experience(text, index)
             
             # Analyze skills
-            skills = self.analyze_skills(text)
+            with span('analyzer.skills'):
+                skills = [] if sections_failed else self.extract_skills(text, index, verified)
             
-            # Generate job recommendations
-            recommendations = self.generate_job_recommendations(skills, text)
+            # Generate job recommendations from skills and the roles held
+            roles = '; '.join(entry['position'] for entry in experience if entry['position'])
+            with span('analyzer.job_recommendations'):
+                recommendations = self.generate_job_recommendations(skills, roles)
             
             # Generate resume improvements
-            improvements = self.generate_resume_improvements(text, skills)
+            with span('analyzer.improvements'):
+                improvements = self.generate_resume_improvements(text, skills, index)
             
-            return {
+            result = {
                 'entities': entities,
                 'education': education,
                 'experience': experience,
@@ -369,6 +945,9 @@ class AIResumeAnalyzer:
                 'job_recommendations': recommendations,
                 'resume_improvements': improvements
             }
+            return result
+        except QueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Error in resume analysis: {str(e)}")
             return {
@@ -379,4 +958,18 @@ class AIResumeAnalyzer:
                 'skills': [],
                 'job_recommendations': [],
                 'resume_improvements': []
-            } 
\ No newline at end of file
+            }
+
+if __name__ == "__main__":
+    try:
+        if len(sys.argv) < 2:
+            print(json.dumps({"error": "No text provided"}))
+            sys.exit(1)
+
+        resume_text = sys.argv[1]
+        analyzer = AIResumeAnalyzer()
+        analysis = analyzer.analyze_resume(resume_text)
+        print(json.dumps(analysis))
+
+    except Exception as e:
+        print(json.dumps({"error": str(e)}))
@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'analysis_cache.sqlite3')
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+# Section results kept per cached resume on average
+SECTIONS_PER_ENTRY = 20
+
+_HORIZONTAL_SPACE_RE = re.compile(r'[ \t\f\v\r]+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalize extracted resume text so trivially different re-uploads share a key.
+
+    Unicode is NFKC-normalized, carriage returns dropped, and runs of horizontal
+    whitespace collapsed. The analyzers split sections on '\n\n' in the raw text, so
+    only inputs that split identically may share a key: empty lines are kept, and a
+    line holding only whitespace becomes a single space rather than an empty line.
+    """
+    lines = []
+    for line in unicodedata.normalize('NFKC', text).split('\n'):
+        stripped = _HORIZONTAL_SPACE_RE.sub(' ', line).strip()
+        lines.append(stripped or (' ' if line else ''))
+    return '\n'.join(lines)
+
+
+def cache_key(text: str, versions: Dict[str, Any]) -> str:
+    """Content address of a resume under a given set of model/taxonomy versions."""
+    digest = hashlib.sha256(normalize_text(text).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(versions, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def section_cache_key(section_text: str, versions: Dict[str, Any]) -> str:
+    """Content address of one resume section under a given set of versions.
+
+    The raw text is hashed (not normalized) because cached section results hold
+    character offsets into it.
+    """
+    digest = hashlib.sha256(section_text.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(versions, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed cache of analysis results keyed by resume content and versions.
+
+    A second table holds per-section model outputs keyed by section content, so an
+    edited resume only needs its changed sections re-analyzed.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS):
+        self.path = path or os.getenv('ANALYSIS_CACHE_PATH') or DEFAULT_CACHE_PATH
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.max_section_entries = max_entries * SECTIONS_PER_ENTRY
+        self.hits = 0
+        self.misses = 0
+        self.section_hits = 0
+        self.section_misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = self._connect()
+        self._inherited_conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS analyses ('
+            ' key TEXT PRIMARY KEY,'
+            ' versions TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS analyses_last_access ON analyses (last_access)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sections ('
+            ' key TEXT PRIMARY KEY,'
+            ' versions TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS sections_last_access ON sections (last_access)')
+        conn.commit()
+        return conn
+
+    def reopen(self) -> None:
+        """Switch to a fresh connection in a forked child.
+
+        SQLite connections must not be used across fork(). The inherited one is kept
+        referenced but never used, so it isn't closed (and checkpointed) under the parent.
+        """
+        self._lock = threading.Lock()
+        self._inherited_conn = self._conn
+        self._conn = self._connect()
+
+    def get(self, text: str, versions: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached result for text under versions, or None on a miss."""
+        key = cache_key(text, versions)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, created_at FROM analyses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE analyses SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, text: str, versions: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store a result and evict expired or least recently used entries."""
+        key = cache_key(text, versions)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO analyses (key, versions, result, created_at, last_access)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(versions, sort_keys=True), json.dumps(result), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_sections(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached section results for whichever of keys are present and fresh."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f'SELECT key, result FROM sections WHERE key IN ({",".join("?" * len(chunk))})'
+                    ' AND created_at >= ?',
+                    (*chunk, now - self.max_age_seconds)
+                ).fetchall()
+                found.update((key, result) for key, result in rows)
+            if found:
+                self._conn.executemany('UPDATE sections SET last_access = ? WHERE key = ?',
+                                       [(now, key) for key in found])
+                self._conn.commit()
+            self.section_hits += len(found)
+            self.section_misses += len(keys) - len(found)
+        return {key: json.loads(result) for key, result in found.items()}
+
+    def put_sections(self, versions: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> None:
+        """Store section results by section key and evict old or least recently used ones."""
+        if not results:
+            return
+        now = time.time()
+        versions_json = json.dumps(versions, sort_keys=True)
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO sections (key, versions, result, created_at, last_access)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                [(key, versions_json, json.dumps(result), now, now) for key, result in results.items()]
+            )
+            self._conn.execute('DELETE FROM sections WHERE created_at < ?', (now - self.max_age_seconds,))
+            self._conn.execute(
+                'DELETE FROM sections WHERE key IN ('
+                ' SELECT key FROM sections ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                (self.max_section_entries,)
+            )
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute('DELETE FROM analyses WHERE created_at < ?', (now - self.max_age_seconds,))
+        self._conn.execute(
+            'DELETE FROM analyses WHERE key IN ('
+            ' SELECT key FROM analyses ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def purge_versions(self, current_versions: Dict[str, Any]) -> int:
+        """Delete entries produced under any versions other than current_versions."""
+        versions_json = json.dumps(current_versions, sort_keys=True)
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM analyses WHERE versions != ?', (versions_json,))
+            self._conn.execute('DELETE FROM sections WHERE versions != ?', (versions_json,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM analyses')
+            self._conn.execute('DELETE FROM sections')
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the number of stored entries."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM analyses').fetchone()[0]
+            section_entries = self._conn.execute('SELECT COUNT(*) FROM sections').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'section_hits': self.section_hits,
+            'section_misses': self.section_misses,
+            'section_entries': section_entries,
+            'path': self.path
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,466 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import logging
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from model_registry import ModelRegistry
+from skill_matcher import load_taxonomy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Document sizes in pages; 10 pages exercises the page-parallel PDF path
+DEFAULT_SIZES = (1, 3, 10)
+DEFAULT_ITERATIONS = 5
+STAGE_GROUPS = ('extract', 'analyzer', 'recommender', 'cohort')
+# Students in the synthetic cohort, and how many new analyses an incremental update adds
+COHORT_STUDENTS = 100_000
+COHORT_UPDATE = 1000
+
+# Roughly one US Letter page of 10pt text
+LINES_PER_PAGE = 48
+# Incompressible images in generated DOCX files, like photos and logos in real resumes
+DOCX_IMAGES_PER_PAGE = 1
+DOCX_IMAGE_SIZE = 256
+
+FIRST_NAMES = ['Priya', 'Rahul', 'Ananya', 'Mohammed', 'Sneha', 'Arjun', 'Kavya', 'Vikram']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Khan', 'Reddy', 'Nair', 'Gupta', 'Menon']
+CITIES = ['Bangalore', 'Pune', 'Chennai', 'Hyderabad', 'Mumbai', 'Delhi']
+COMPANIES = ['Infosys Ltd.', 'Zoho Corp.', 'Flipkart Internet Ltd.', 'Tech Mahindra Ltd.',
+             'Persistent Systems Ltd.', 'Wipro Technologies Inc.']
+POSITIONS = ['Software Engineer', 'Data Scientist', 'Full Stack Developer', 'DevOps Engineer',
+             'Mobile Engineer', 'Data Analyst']
+DEGREES = ['Bachelor of Engineering in Computer Science', 'Master of Technology in Data Science',
+           'B.Tech in Electronics', 'Bachelor of Science in Mathematics']
+INSTITUTIONS = ['Anna University College of Engineering', 'Indian Institute of Technology Madras',
+                'Osmania University College of Science', 'Pune Institute of Computer Technology']
+VERBS = ['Developed', 'Led', 'Managed', 'Implemented', 'Designed', 'Optimized', 'Built', 'Improved']
+PROFICIENCY = ['expert in', 'advanced', 'proficient in', 'intermediate', 'familiar with']
+
+
+def synthetic_resume(pages: int, seed: int = 0) -> str:
+    """Deterministic resume text of about the given number of pages.
+
+    Skills are drawn from the skill taxonomy so matching, NLI verification and job
+    matching do realistic amounts of work.
+    """
+    rng = random.Random(seed * 1000 + pages)
+    skills = sorted(skill for names in load_taxonomy().categories.values() for skill in names)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{rng.choice(CITIES)}, India", "", "Summary",
+             f"{rng.choice(POSITIONS)} with {rng.randint(2, 15)} years of experience.", "", "Experience"]
+    target = pages * LINES_PER_PAGE
+    year = 2024
+    while len(lines) < target - 12:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(POSITIONS)}, {rng.choice(COMPANIES)} {start}-{year}")
+        for _ in range(rng.randint(3, 6)):
+            used = rng.sample(skills, 2)
+            lines.append(f"{rng.choice(VERBS)} services with {used[0]} and {used[1]}, "
+                         f"improving throughput by {rng.randint(5, 60)}%.")
+        lines.append("")
+        year = start
+    lines.extend(["Education", f"{rng.choice(DEGREES)}, {rng.choice(INSTITUTIONS)}, {year - 1}", "", "Skills"])
+    while len(lines) < target:
+        lines.append(', '.join(f"{rng.choice(PROFICIENCY)} {skill}" for skill in rng.sample(skills, 4)))
+    return '\n'.join(lines)
+
+
+def noise_png(size: int, seed: int = 0) -> bytes:
+    """A size x size RGB PNG of random pixels (so it doesn't compress away)."""
+    rng = random.Random(seed)
+    rows = b''.join(b'\0' + rng.getrandbits(size * 24).to_bytes(size * 3, 'big') for _ in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows, 1)) + chunk(b'IEND', b''))
+
+
+def write_docx(text: str, path: str, images: int = 0) -> None:
+    """Write text as a DOCX in the layout of common resume templates.
+
+    The first line becomes the page header and the lines under "Skills" a two-column
+    table; images random-pixel pictures are added after the summary.
+    """
+    import io
+    from docx import Document
+
+    lines = text.split('\n')
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = lines[0]
+    skills_at = lines.index('Skills') + 1 if 'Skills' in lines else len(lines)
+    for number, line in enumerate(lines[1:skills_at], start=1):
+        document.add_paragraph(line)
+        if number == 5:
+            for seed in range(images):
+                document.add_picture(io.BytesIO(noise_png(DOCX_IMAGE_SIZE, seed)))
+    skill_lines = lines[skills_at:]
+    if skill_lines:
+        table = document.add_table(rows=len(skill_lines), cols=2)
+        for row, line in zip(table.rows, skill_lines):
+            first, _, rest = line.partition(', ')
+            row.cells[0].text = first
+            row.cells[1].text = rest
+    document.save(path)
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(text: str, path: str, lines_per_page: int = LINES_PER_PAGE) -> None:
+    """Write text as a minimal multi-page PDF with a Helvetica text layer.
+
+    No PDF library is a dependency, so the file is assembled directly; PyPDF2 reads
+    it back like any text-based PDF.
+    """
+    lines = text.split('\n')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = []  # Object n is objects[n - 1]
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for page_id, page_lines in zip(page_ids, pages):
+        body = ''.join(f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines)
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td\n{body}ET".encode('latin-1')
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as file:
+        file.write(output)
+
+
+def peak_rss_bytes(children: bool = False) -> int:
+    """Peak resident set size of this process (or its reaped children) so far."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+def summarize(samples: List[float], rss_before: int) -> Dict[str, Any]:
+    """Latency percentiles, throughput and peak RSS for one stage's timed samples."""
+    times = np.asarray(samples)
+    rss = peak_rss_bytes()
+    return {
+        'samples': len(samples),
+        'p50_ms': float(np.percentile(times, 50) * 1000),
+        'p95_ms': float(np.percentile(times, 95) * 1000),
+        'p99_ms': float(np.percentile(times, 99) * 1000),
+        'mean_ms': float(times.mean() * 1000),
+        'throughput_per_s': float(len(samples) / max(times.sum(), 1e-9)),
+        'peak_rss_bytes': rss,
+        'peak_rss_growth_bytes': rss - rss_before
+    }
+
+
+def time_stage(fn: Callable[[], Any], iterations: int, warmup: int = 1) -> Dict[str, Any]:
+    """Run fn warmup times untimed (model loading, caches), then time it iterations times."""
+    rss_before = peak_rss_bytes()
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, rss_before)
+
+
+def peak_traced_bytes(fn: Callable[[], Any]) -> int:
+    """Peak Python heap allocation during one call of fn."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def build_analyzer(backend: str) -> Any:
+    from ai_resume_analyzer import AIResumeAnalyzer
+
+    registry = ModelRegistry()
+    if backend == 'stub':
+        from stub_models import register_stub_analyzer_models
+        register_stub_analyzer_models(registry)
+        return AIResumeAnalyzer(registry=registry, cache=False, quantization='none')
+    return AIResumeAnalyzer(registry=registry, cache=False)
+
+
+def build_recommender(backend: str) -> Any:
+    from ai_job_recommender import JobRecommender
+
+    registry = ModelRegistry()
+    if backend != 'stub':
+        return JobRecommender(registry=registry)
+    from stub_models import STUB_CAUSAL_LM, build_stub_causal_lm
+    pair = build_stub_causal_lm()
+    # Pre-registered under the key JobRecommender would load the checkpoint into
+    registry.register(f"causal_lm:{STUB_CAUSAL_LM}:float32", lambda: pair)
+    role_models = {role: STUB_CAUSAL_LM for role in ('skills', 'experience', 'recommendations')}
+    return JobRecommender(role_models=role_models, registry=registry, quantization='none')
+
+
+def bench_extract(directory: str, sizes: Iterable[int], iterations: int) -> Tuple[Dict[str, Any], Dict[int, str]]:
+    """Time extract_text on generated PDF and DOCX files; returns (results, extracted text per size).
+
+    DOCX files are also read with the python-docx extractor for comparison, and both
+    DOCX stages report their peak heap allocation. With iterations=0 the files are
+    only generated and extracted once, for later stages.
+    """
+    from extract_text import extract_from_docx, extract_from_docx_dom, extract_text
+
+    results, texts = {}, {}
+    for pages in sizes:
+        text = synthetic_resume(pages)
+        images = pages * DOCX_IMAGES_PER_PAGE
+        writers = (('pdf', write_pdf), ('docx', lambda text, path: write_docx(text, path, images)))
+        for kind, writer in writers:
+            path = os.path.join(directory, f"resume_{pages}p.{kind}")
+            writer(text, path)
+            extracted = extract_text(path)
+            if not extracted['success']:
+                raise RuntimeError(f"Could not extract generated {path}: {extracted['error']}")
+            texts.setdefault(pages, extracted['text'])
+            if not iterations:
+                continue
+            results[f"extract_text.{kind}.{pages}p"] = time_stage(lambda path=path: extract_text(path), iterations)
+            if kind == 'docx':
+                results[f"extract_text.docx.{pages}p"]['peak_alloc_bytes'] = peak_traced_bytes(
+                    lambda: extract_from_docx(path))
+                results[f"extract_docx_dom.docx.{pages}p"] = {
+                    **time_stage(lambda path=path: extract_from_docx_dom(path), iterations),
+                    'peak_alloc_bytes': peak_traced_bytes(lambda: extract_from_docx_dom(path))
+                }
+            logger.info(f"extract_text.{kind}.{pages}p done")
+    return results, texts
+
+
+def bench_analyzer(backend: str, texts: Dict[int, str], iterations: int) -> Dict[str, Any]:
+    from resume_sections import ResumeIndex
+
+    analyzer = build_analyzer(backend)
+    results = {}
+    for pages, text in texts.items():
+        index = ResumeIndex(text)
+        skills = analyzer.extract_skills(text, index)
+        roles = '; '.join(entry['position'] for entry in analyzer.extract_experience(text, index) if entry['position'])
+        stages = {
+            'entities': lambda: analyzer.extract_entities(text),
+            'sections': lambda: ResumeIndex(text),
+            'education': lambda: analyzer.extract_education(text, index),
+            'experience': lambda: analyzer.extract_experience(text, index),
+            'skills': lambda: analyzer.extract_skills(text, index),
+            'job_recommendations': lambda: analyzer.generate_job_recommendations(skills, roles),
+            'improvements': lambda: analyzer.generate_resume_improvements(text, skills, index),
+            'analyze_resume': lambda: analyzer.analyze_resume(text, use_cache=False)
+        }
+        for stage, fn in stages.items():
+            results[f"analyzer.{stage}.{pages}p"] = time_stage(fn, iterations)
+            logger.info(f"analyzer.{stage}.{pages}p done")
+    return results
+
+
+def bench_recommender(backend: str, texts: Dict[int, str], iterations: int) -> Dict[str, Any]:
+    import torch
+
+    recommender = build_recommender(backend)
+    results = {}
+    for pages, text in texts.items():
+        torch.manual_seed(0)
+        skills = recommender.analyze_skills(text)
+        experience = recommender.analyze_experience(text)
+        stages = {
+            'skills': lambda: recommender.analyze_skills(text),
+            'experience': lambda: recommender.analyze_experience(text),
+            'job_recommendations': lambda: recommender.get_job_recommendations(skills, experience),
+            'analyze_resume': lambda: recommender.analyze_resume(text)
+        }
+        for stage, fn in stages.items():
+            # Sampled decoding is seeded so generated lengths repeat between runs
+            torch.manual_seed(0)
+            results[f"recommender.{stage}.{pages}p"] = time_stage(fn, iterations)
+            logger.info(f"recommender.{stage}.{pages}p done")
+    return results
+
+
+def synthetic_cohort(students: int, roles: List[str], seed: int = 0) -> List[Dict[str, Any]]:
+    """Exported-analysis records for a cohort, with taxonomy skills and one target role each."""
+    rng = random.Random(seed)
+    skills = sorted(skill for names in load_taxonomy().categories.values() for skill in names)
+    return [
+        {
+            'id': f"student-{number}",
+            'cohort': f"batch-{number % 20}",
+            'roles': [rng.choice(roles)],
+            'result': {'skills': [{'name': skill, 'proficiency': round(rng.random(), 2)}
+                                  for skill in rng.sample(skills, rng.randint(3, 15))]}
+        }
+        for number in range(students)
+    ]
+
+
+def bench_cohort(iterations: int, students: int = COHORT_STUDENTS) -> Dict[str, Any]:
+    """Time loading a cohort, its gap report, and an incremental update followed by a report."""
+    from cohort_analytics import CohortAnalytics, default_roles
+
+    roles = default_roles()
+    records = synthetic_cohort(students + COHORT_UPDATE, [role['title'] for role in roles.values()])
+    results = {}
+    rss_before = peak_rss_bytes()
+    start = time.perf_counter()
+    analytics = CohortAnalytics(roles)
+    analytics.add_records(records[:students])
+    results['cohort.load'] = summarize([time.perf_counter() - start], rss_before)
+    results['cohort.report'] = time_stage(analytics.report, iterations)
+    results['cohort.report_one_batch'] = time_stage(lambda: analytics.report('batch-3'), iterations)
+    update = records[students:]
+
+    def add_and_report():
+        analytics.add_records(update)
+        analytics.report()
+
+    results['cohort.update_and_report'] = time_stage(add_and_report, iterations)
+    logger.info("cohort done")
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(backend: str = 'stub', sizes: Iterable[int] = DEFAULT_SIZES, iterations: int = DEFAULT_ITERATIONS,
+        groups: Iterable[str] = STAGE_GROUPS) -> Dict[str, Any]:
+    """Run the selected stage groups and return the machine-readable report."""
+    sizes, groups = list(sizes), list(groups)
+    stages = {}
+    started = time.time()
+    with tempfile.TemporaryDirectory(prefix='resume-bench-') as directory:
+        extract_results, texts = bench_extract(directory, sizes, iterations if 'extract' in groups else 0)
+        if 'extract' in groups:
+            stages.update(extract_results)
+    if 'analyzer' in groups:
+        stages.update(bench_analyzer(backend, texts, iterations))
+    if 'recommender' in groups:
+        stages.update(bench_recommender(backend, texts, iterations))
+    if 'cohort' in groups:
+        stages.update(bench_cohort(iterations))
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'backend': backend,
+            'sizes_pages': sizes,
+            'iterations': iterations,
+            'characters': {f"{pages}p": len(text) for pages, text in texts.items()},
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'started_at': started,
+            'seconds': time.time() - started
+        },
+        'peak_rss_bytes': peak_rss_bytes(),
+        'children_peak_rss_bytes': peak_rss_bytes(children=True),
+        'stages': stages
+    }
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], metric: str = 'p50_ms',
+            threshold: float = 0.1) -> Tuple[str, List[str]]:
+    """Markdown diff of two reports; returns (table, stages slower than base by more than threshold)."""
+    lines = [f"| stage | base {metric} | head {metric} | change |", "|---|---|---|---|"]
+    regressions = []
+    for stage in sorted(set(base['stages']) | set(head['stages'])):
+        old, new = base['stages'].get(stage), head['stages'].get(stage)
+        if old is None or new is None:
+            lines.append(f"| {stage} | {old[metric] if old else '-'} | {new[metric] if new else '-'} | n/a |")
+            continue
+        change = (new[metric] - old[metric]) / max(old[metric], 1e-9)
+        if change > threshold:
+            regressions.append(stage)
+        lines.append(f"| {stage} | {old[metric]:.2f} | {new[metric]:.2f} | {change:+.1%} |")
+    rss_change = head['peak_rss_bytes'] - base['peak_rss_bytes']
+    lines.append(f"| peak RSS (MiB) | {base['peak_rss_bytes'] / 2 ** 20:.1f} "
+                 f"| {head['peak_rss_bytes'] / 2 ** 20:.1f} | {rss_change / 2 ** 20:+.1f} |")
+    return '\n'.join(lines), regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline on synthetic resumes")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subcommands.add_parser('run', help="Run the benchmark")
+    run_parser.add_argument('--backend', choices=('stub', 'real'), default='stub',
+                            help="'stub' uses tiny random local models (offline); 'real' the configured checkpoints")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Resume sizes in pages")
+    run_parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    run_parser.add_argument('--stages', nargs='+', choices=STAGE_GROUPS, default=list(STAGE_GROUPS))
+    run_parser.add_argument('-o', '--output', help="Write the report as JSON")
+
+    compare_parser = subcommands.add_parser('compare', help="Diff two JSON reports")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--metric', default='p50_ms', choices=('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'))
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="Exit 1 when a stage is slower than base by more than this fraction")
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.base, encoding='utf-8') as file:
+            base = json.load(file)
+        with open(args.head, encoding='utf-8') as file:
+            head = json.load(file)
+        table, regressions = compare(base, head, args.metric, args.threshold)
+        print(table)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed: {', '.join(regressions)}")
+            return 1
+        return 0
+
+    report = run(args.backend, args.sizes, args.iterations, args.stages)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    for stage, entry in report['stages'].items():
+        print(f"{stage:45s} p50 {entry['p50_ms']:9.2f} ms  p95 {entry['p95_ms']:9.2f} ms  "
+              f"p99 {entry['p99_ms']:9.2f} ms  {entry['throughput_per_s']:8.2f}/s")
+    print(f"peak RSS {report['peak_rss_bytes'] / 2 ** 20:.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+# Rough resident size of one worker with every analyzer model loaded in float32
+WORKER_MEMORY_BYTES = 3 * 1024 ** 3
+
+# Per-process analyzer, built once by the pool initializer
+_analyzer = None
+
+
+def iter_inputs(source: str) -> Iterator[Dict[str, str]]:
+    """Yield {'id', 'path'} jobs from a directory, a glob pattern or a JSONL manifest.
+
+    Manifest lines are objects with a 'path' and an optional 'id' (defaults to the path).
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield {'id': os.path.relpath(path, source), 'path': path}
+    elif source.endswith('.jsonl') and os.path.isfile(source):
+        with open(source, 'r', encoding='utf-8') as manifest:
+            for line_number, line in enumerate(manifest, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    yield {'id': str(entry.get('id', entry['path'])), 'path': entry['path']}
+                except (ValueError, KeyError) as e:
+                    logger.error(f"Skipping manifest line {line_number}: {str(e)}")
+    else:
+        for path in sorted(glob.glob(source, recursive=True)):
+            if path.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield {'id': path, 'path': path}
+
+
+def load_checkpoint(output_path: Optional[str]) -> Set[str]:
+    """Return ids already completed successfully in an existing output file."""
+    done = set()
+    if not output_path or not os.path.exists(output_path):
+        return done
+    with open(output_path, 'r', encoding='utf-8') as output:
+        for line in output:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line from an interrupted run
+            if record.get('ok'):
+                done.add(record['id'])
+    return done
+
+
+def _drop_partial_line(output_path: str) -> None:
+    """Truncate output_path after its last newline so appends start on a fresh line."""
+    with open(output_path, 'rb+') as output:
+        end = output.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(position, 64 * 1024)
+            output.seek(position - step)
+            newline = output.read(step).rfind(b'\n')
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != end:
+            output.truncate(position)
+
+
+def _available_memory() -> Optional[int]:
+    """MemAvailable from /proc/meminfo in bytes, or None where it can't be read."""
+    try:
+        with open('/proc/meminfo', 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def default_workers() -> int:
+    """CPU count, capped by how many fully loaded workers fit in available memory."""
+    cpus = os.cpu_count() or 1
+    available = _available_memory()
+    if available is None:
+        return cpus
+    return max(1, min(cpus, available // WORKER_MEMORY_BYTES))
+
+
+def _init_worker(stages: Optional[List[str]], torch_threads: int) -> None:
+    """Load models once per worker process."""
+    global _analyzer
+    import torch
+    import extract_text
+    from ai_resume_analyzer import AIResumeAnalyzer
+
+    # Workers run side by side; each gets its share of the cores, not a pool over all of them
+    torch.set_num_threads(torch_threads)
+    # Pool workers already run in parallel; don't nest a page-level pool inside them
+    extract_text.PDF_WORKERS = 1
+    _analyzer = AIResumeAnalyzer()
+    _analyzer.warm_up(stages)
+
+
+def _process(job: Dict[str, str]) -> Dict[str, Any]:
+    """Extract and analyze one resume inside a worker process."""
+    from extract_text import extract_text
+
+    record = {'id': job['id'], 'path': job['path']}
+    start = time.perf_counter()
+    try:
+        extracted = extract_text(job['path'])
+        record['extract_seconds'] = time.perf_counter() - start
+        if not extracted['success']:
+            raise ValueError(extracted['error'])
+
+        analyze_start = time.perf_counter()
+        result = _analyzer.analyze_resume(extracted['text'])
+        record['analyze_seconds'] = time.perf_counter() - analyze_start
+        if 'error' in result:
+            raise ValueError(result['error'])
+
+        record.update({'ok': True, 'result': result})
+    except Exception as e:
+        record.update({'ok': False, 'error': str(e)})
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+def run(source: str, output_path: Optional[str] = None, workers: Optional[int] = None,
+        stages: Optional[List[str]] = None, torch_threads: Optional[int] = None) -> Dict[str, Any]:
+    """Process every resume in source, streaming one JSONL record per finished resume.
+
+    Records are appended to output_path (stdout when omitted). Resumes already recorded
+    as successful in output_path are skipped, so an interrupted run picks up where it
+    stopped. Returns a throughput/latency summary.
+
+    workers defaults to default_workers(); each worker runs torch_threads intra-op
+    threads, by default its share of the CPU count.
+    """
+    workers = workers or default_workers()
+    torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+    done = load_checkpoint(output_path)
+    jobs = (job for job in iter_inputs(source) if job['id'] not in done)
+    if done:
+        logger.info(f"Skipping {len(done)} resumes already in {output_path}")
+
+    if output_path and os.path.exists(output_path):
+        # An interrupted run can leave a torn last record; don't append onto it
+        _drop_partial_line(output_path)
+    output = open(output_path, 'a', encoding='utf-8') if output_path else sys.stdout
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(stages, torch_threads)) as executor:
+            # Keep a bounded number of resumes in flight so huge inputs stream through
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < workers * 2:
+                    job = next(jobs, None)
+                    if job is None:
+                        exhausted = True
+                    else:
+                        pending.add(executor.submit(_process, job))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    output.write(json.dumps(record) + '\n')
+                    output.flush()
+                    latencies.append(record['seconds'])
+                    if not record['ok']:
+                        failures += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'processed': len(latencies),
+        'failed': failures,
+        'skipped': len(done),
+        'workers': workers,
+        'torch_threads': torch_threads,
+        'elapsed_seconds': elapsed,
+        'throughput_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_p50': _percentile(latencies, 50),
+        'latency_p95': _percentile(latencies, 95),
+        'latency_max': max(latencies) if latencies else 0.0
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk resume extraction and analysis")
+    parser.add_argument('source', help="Directory, glob pattern or JSONL manifest of resumes")
+    parser.add_argument('-o', '--output', help="JSONL output file, also used as the restart checkpoint")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="Worker processes (default: CPU count, capped by available memory)")
+    parser.add_argument('--stages', help="Comma-separated analysis stages to preload models for")
+    parser.add_argument('--torch-threads', type=int,
+                        help="Intra-op threads per worker (default: CPU count / workers)")
+    args = parser.parse_args(argv)
+
+    stages = args.stages.split(',') if args.stages else None
+    summary = run(args.source, args.output, args.workers, stages, args.torch_threads)
+    # Summary goes to stderr so stdout stays pure JSONL
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
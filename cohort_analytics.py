@@ -0,0 +1,439 @@
+import re
+import sys
+import json
+import logging
+import argparse
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from job_templates import JOB_TEMPLATES
+from skill_matcher import SkillTaxonomy, load_taxonomy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_MISSING = 10
+
+
+def normalize_skill(name: str) -> str:
+    return ' '.join(str(name).lower().split())
+
+
+def role_key(name: str) -> str:
+    """Key a role name or title matches under, e.g. 'Data Scientist' -> 'data_scientist'."""
+    return re.sub(r'[^a-z0-9]+', '_', str(name).lower()).strip('_')
+
+
+def default_roles() -> Dict[str, Dict[str, Any]]:
+    """The analyzer's job templates, as {role: {'title', 'required_skills'}}."""
+    return JOB_TEMPLATES
+
+
+def analysis_skills(analysis: Dict[str, Any]) -> Dict[str, float]:
+    """Skill -> proficiency from an analysis's 'skills', in any of the shapes it is stored in.
+
+    Analyzer output is a list of {'name', 'proficiency', ...}; User documents may hold
+    {'technical': [...], 'soft': [...], 'missing': [...]} or plain names, which count
+    as fully proficient.
+    """
+    skills = analysis.get('skills') or []
+    if isinstance(skills, dict):
+        skills = [name for group in ('technical', 'soft') for name in skills.get(group) or []]
+    levels: Dict[str, float] = {}
+    for skill in skills:
+        if isinstance(skill, dict):
+            name, level = skill.get('name'), skill.get('proficiency')
+        else:
+            name, level = skill, None
+        if not name:
+            continue
+        name = normalize_skill(name)
+        levels[name] = max(levels.get(name, 0.0), 1.0 if level is None else float(level))
+    return levels
+
+
+def parse_record(record: Dict[str, Any], cohort_field: str = 'cohort') -> Optional[Dict[str, Any]]:
+    """Normalize one exported analysis to {'id', 'skills', 'roles', 'cohort'}, or None to skip it.
+
+    Accepts bulk_ingest.py output records ({'id', 'ok', 'result'}), exported User
+    documents ({'_id', 'resumeAnalysis', 'jobPreferences'}) and bare analyses with an
+    'id'. Target roles come from 'roles' or jobPreferences.roles, falling back to the
+    top job recommendation.
+    """
+    if record.get('ok') is False:
+        return None
+    student_id = record.get('id') or record.get('_id') or record.get('email')
+    if isinstance(student_id, dict):
+        student_id = student_id.get('$oid')  # mongoexport extended JSON
+    if not student_id:
+        return None
+    analysis = record.get('result') or record.get('resumeAnalysis') or record
+    roles = record.get('roles') or (record.get('jobPreferences') or {}).get('roles') or []
+    if not roles:
+        recommended = analysis.get('job_recommendations') or analysis.get('jobRecommendations') or []
+        if recommended and isinstance(recommended[0], dict) and recommended[0].get('title'):
+            roles = [recommended[0]['title']]
+    return {
+        'id': str(student_id),
+        'skills': analysis_skills(analysis),
+        'roles': list(roles),
+        'cohort': record.get(cohort_field)
+    }
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a JSONL file or a JSON array file (mongoexport --jsonArray)."""
+    with open(path, 'r', encoding='utf-8') as file:
+        first = file.read(1)
+        while first.isspace():
+            first = file.read(1)
+        if first == '[':
+            file.seek(0)
+            yield from json.load(file)
+            return
+        file.seek(0)
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                logger.error(f"Skipping {path} line {line_number}: {str(e)}")
+
+
+class CohortAnalytics:
+    """Skill gaps of student cohorts against role requirements, over sparse matrices.
+
+    Students are rows of a CSR student x skill matrix of proficiencies, appended to as
+    analyses arrive; a re-analyzed student gets a new row and the old one is masked
+    out. Role requirements (the 'required_skills' of each role) are either skills or
+    taxonomy categories. A category is met by any of its skills, so requirements are
+    a requirement x skill indicator matrix, and which requirements each student meets
+    is one sparse product. It is cached and only computed for rows added since the
+    last report.
+    """
+
+    def __init__(self, roles: Optional[Dict[str, Dict[str, Any]]] = None,
+                 taxonomy: Optional[SkillTaxonomy] = None, min_proficiency: float = 0.0):
+        """Initialize the engine.
+
+        Args:
+            roles: {role: {'title', 'required_skills'}}; defaults to the analyzer's job templates.
+            taxonomy: Skill taxonomy whose categories may appear as requirements.
+            min_proficiency: Proficiency a skill needs to count towards a requirement.
+        """
+        self.taxonomy = taxonomy or load_taxonomy()
+        self.min_proficiency = min_proficiency
+        self.skills: Dict[str, int] = {}
+        self.skill_names: List[str] = []
+        self.students: Dict[str, int] = {}  # Student id -> current row
+        self.row_ids: List[str] = []
+        self.cohorts: Dict[Any, int] = {}
+        self.unknown_roles: Counter = Counter()
+        # CSR arrays of the student x skill matrix, appended to row by row
+        self._indptr = array('q', [0])
+        self._indices = array('i')
+        self._data = array('f')
+        self._row_cohort = array('i')
+        self._active = array('b')
+        # Target role names as given, per row, so set_roles can resolve them again
+        self._requested_rows = array('i')
+        self._requested_roles: List[str] = []
+        # Coordinates of the student x role target matrix
+        self._target_rows = array('i')
+        self._target_roles = array('i')
+        self._met: Optional[sparse.csr_matrix] = None
+        self.set_roles(roles or default_roles())
+
+    def _skill_column(self, name: str) -> int:
+        column = self.skills.get(name)
+        if column is None:
+            column = self.skills[name] = len(self.skill_names)
+            self.skill_names.append(name)
+        return column
+
+    def set_roles(self, roles: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the role requirements; cached results are recomputed on the next report."""
+        self.roles = list(roles)
+        self.role_titles = [roles[role].get('title', role) for role in self.roles]
+        self._role_lookup = {}
+        for index, role in enumerate(self.roles):
+            self._role_lookup[role_key(role)] = index
+            self._role_lookup[role_key(self.role_titles[index])] = index
+        self.requirements: List[str] = []
+        requirement_index: Dict[str, int] = {}
+        self._role_requirements: List[List[int]] = []
+        for role in self.roles:
+            indices = []
+            for requirement in roles[role].get('required_skills', []):
+                requirement = normalize_skill(requirement)
+                if requirement not in requirement_index:
+                    requirement_index[requirement] = len(self.requirements)
+                    self.requirements.append(requirement)
+                indices.append(requirement_index[requirement])
+            self._role_requirements.append(sorted(set(indices)))
+        self._requirement_skills = [
+            [self._skill_column(skill) for skill in self.taxonomy.categories.get(requirement, [requirement])]
+            for requirement in self.requirements
+        ]
+        # Role x requirement indicator
+        self._role_matrix = np.zeros((len(self.roles), len(self.requirements)), dtype=np.float32)
+        for role, indices in enumerate(self._role_requirements):
+            self._role_matrix[role, indices] = 1.0
+        self._met = None
+        # Role indices refer to the old role list; resolve every student's targets again
+        self._target_rows = array('i')
+        self._target_roles = array('i')
+        self.unknown_roles = Counter()
+        for row, name in zip(self._requested_rows, self._requested_roles):
+            self._add_target(row, name)
+
+    def _add_target(self, row: int, name: str) -> None:
+        role = self._role_lookup.get(role_key(name))
+        if role is None:
+            self.unknown_roles[name] += 1
+            return
+        self._target_rows.append(row)
+        self._target_roles.append(role)
+
+    def add(self, student_id: str, skills: Dict[str, float], roles: Iterable[str] = (),
+            cohort: Any = None) -> None:
+        """Add or replace one student's analysis: skill -> proficiency, target roles and cohort."""
+        row = len(self.row_ids)
+        previous = self.students.get(student_id)
+        if previous is not None:
+            self._active[previous] = 0
+        self.students[student_id] = row
+        self.row_ids.append(student_id)
+        columns = sorted((self._skill_column(normalize_skill(name)), level) for name, level in skills.items())
+        self._indices.extend(column for column, _ in columns)
+        self._data.extend(level for _, level in columns)
+        self._indptr.append(len(self._indices))
+        if cohort not in self.cohorts:
+            self.cohorts[cohort] = len(self.cohorts)
+        self._row_cohort.append(self.cohorts[cohort])
+        self._active.append(1)
+        for name in roles:
+            self._requested_rows.append(row)
+            self._requested_roles.append(name)
+            self._add_target(row, name)
+
+    def add_records(self, records: Iterable[Dict[str, Any]], cohort_field: str = 'cohort') -> int:
+        """Add exported analyses (see parse_record); returns how many were added."""
+        added = 0
+        for record in records:
+            parsed = parse_record(record, cohort_field)
+            if parsed is None:
+                continue
+            self.add(parsed['id'], parsed['skills'], parsed['roles'], parsed['cohort'])
+            added += 1
+        return added
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    def skill_matrix(self, start: int = 0, stop: Optional[int] = None) -> sparse.csr_matrix:
+        """Rows start:stop of the student x skill proficiency matrix."""
+        stop = len(self.row_ids) if stop is None else stop
+        indptr = np.frombuffer(self._indptr, dtype=np.int64)[start:stop + 1].copy()
+        indices = np.frombuffer(self._indices, dtype=np.int32)[indptr[0]:indptr[-1]].copy()
+        data = np.frombuffer(self._data, dtype=np.float32)[indptr[0]:indptr[-1]].copy()
+        return sparse.csr_matrix((data, indices, indptr - indptr[0]), shape=(stop - start, len(self.skill_names)))
+
+    def _held(self, skills: sparse.csr_matrix) -> sparse.csr_matrix:
+        """1 where a student's proficiency in a skill reaches min_proficiency."""
+        held = sparse.csr_matrix(((skills.data >= self.min_proficiency).astype(np.float32),
+                                  skills.indices, skills.indptr), shape=skills.shape)
+        held.eliminate_zeros()
+        return held
+
+    def _requirement_matrix(self) -> sparse.csr_matrix:
+        """Requirement x skill indicator over the current skill columns."""
+        rows = [row for row, columns in enumerate(self._requirement_skills) for _ in columns]
+        columns = [column for columns in self._requirement_skills for column in columns]
+        return sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)),
+                                 shape=(len(self.requirements), len(self.skill_names)))
+
+    def met_matrix(self) -> sparse.csr_matrix:
+        """Student x requirement matrix with 1 where the student meets the requirement."""
+        done = 0 if self._met is None else self._met.shape[0]
+        if done < len(self.row_ids):
+            met = (self._held(self.skill_matrix(done)) @ self._requirement_matrix().T).tocsr()
+            met.data = (met.data > 0).astype(np.float32)
+            met.eliminate_zeros()
+            self._met = met if self._met is None else sparse.vstack([self._met, met], format='csr')
+        if self._met is None:
+            return sparse.csr_matrix((0, len(self.requirements)), dtype=np.float32)
+        return self._met
+
+    def _select(self, cohort: Any = None) -> np.ndarray:
+        """Rows of current analyses, optionally restricted to one cohort."""
+        mask = np.frombuffer(self._active, dtype=np.int8).astype(bool)
+        if cohort is not None:
+            code = self.cohorts.get(cohort)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            mask &= np.frombuffer(self._row_cohort, dtype=np.int32) == code
+        return np.flatnonzero(mask)
+
+    def _targets(self, rows: np.ndarray, role: Optional[str] = None) -> sparse.csr_matrix:
+        """Student x role matrix for rows: their target roles, or only role for everyone."""
+        if role is not None:
+            index = self._role_index(role)
+            return sparse.csr_matrix((np.ones(len(rows), dtype=np.float32),
+                                      (np.arange(len(rows)), np.full(len(rows), index))),
+                                     shape=(len(rows), len(self.roles)))
+        targets = sparse.csr_matrix(
+            (np.ones(len(self._target_rows), dtype=np.float32),
+             (np.frombuffer(self._target_rows, dtype=np.int32), np.frombuffer(self._target_roles, dtype=np.int32))),
+            shape=(len(self.row_ids), len(self.roles))
+        )
+        targets.data[:] = 1.0  # A role listed twice still counts once
+        return targets[rows]
+
+    def _role_index(self, role: str) -> int:
+        index = self._role_lookup.get(role_key(role))
+        if index is None:
+            raise ValueError(f"Unknown role '{role}'. Expected one of: {', '.join(self.roles)}")
+        return index
+
+    def coverage(self, cohort: Any = None, role: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Per student, the share of each target role's requirements they meet.
+
+        With role given, every selected student is scored against that role instead.
+        """
+        rows = self._select(cohort)
+        targets = self._targets(rows, role).tocoo()
+        scores = self._coverage_scores(rows)
+        result: Dict[str, Dict[str, float]] = {}
+        for position, index in zip(targets.row, targets.col):
+            result.setdefault(self.row_ids[rows[position]], {})[self.roles[index]] = float(scores[position, index])
+        return result
+
+    def _coverage_scores(self, rows: np.ndarray) -> np.ndarray:
+        """Dense rows x roles share of each role's requirements met."""
+        sizes = np.maximum(self._role_matrix.sum(axis=1), 1.0)
+        return np.asarray(self.met_matrix()[rows] @ self._role_matrix.T) / sizes
+
+    def report(self, cohort: Any = None, role: Optional[str] = None,
+               top: int = DEFAULT_TOP_MISSING) -> Dict[str, Any]:
+        """Coverage and the most commonly missing requirements per role for a cohort.
+
+        Students are counted under the roles they target, or all under role when given.
+        A missing category requirement also names the skill in it most common among the
+        cohort, as the most accessible one to pick up.
+        """
+        rows = self._select(cohort)
+        targets = self._targets(rows, role)
+        met = self.met_matrix()[rows]
+        scores = self._coverage_scores(rows)
+        students = np.asarray(targets.sum(axis=0)).ravel()
+        met_counts = (targets.T @ met).toarray()
+        missing = (students[:, None] - met_counts) * self._role_matrix
+        coverage_sums = np.asarray(targets.multiply(scores).sum(axis=0)).ravel()
+        ready = np.asarray(targets.multiply((scores >= 1.0).astype(np.float32)).sum(axis=0)).ravel()
+        prevalence = np.asarray(self._held(self.skill_matrix())[rows].sum(axis=0)).ravel()
+
+        roles = {}
+        for index, name in enumerate(self.roles):
+            count = int(students[index])
+            if not count:
+                continue
+            requirements = self._role_requirements[index]
+            ranked = sorted(requirements, key=lambda requirement: -missing[index, requirement])[:top]
+            gaps = []
+            for requirement in ranked:
+                if missing[index, requirement] <= 0:
+                    break
+                gap = {
+                    'requirement': self.requirements[requirement],
+                    'students_missing': int(missing[index, requirement]),
+                    'share_missing': float(missing[index, requirement] / count)
+                }
+                columns = self._requirement_skills[requirement]
+                if self.requirements[requirement] in self.taxonomy.categories:
+                    gap['skills'] = [self.skill_names[column] for column in columns]
+                    gap['most_common_skill'] = self.skill_names[max(columns, key=lambda column: prevalence[column])]
+                gaps.append(gap)
+            roles[name] = {
+                'title': self.role_titles[index],
+                'students': count,
+                'mean_coverage': float(coverage_sums[index] / count),
+                'ready_share': float(ready[index] / count),
+                'requirements_met': {
+                    self.requirements[requirement]: float(met_counts[index, requirement] / count)
+                    for requirement in requirements
+                },
+                'top_missing': gaps
+            }
+        top_skills = np.argsort(-prevalence)[:top]
+        return {
+            'cohort': cohort,
+            'students': int(len(rows)),
+            'students_without_target_role': int(len(rows) - np.count_nonzero(targets.getnnz(axis=1))),
+            'roles': roles,
+            'top_skills': {self.skill_names[column]: int(prevalence[column]) for column in top_skills
+                           if prevalence[column] > 0},
+            'unknown_roles': dict(self.unknown_roles.most_common(top))
+        }
+
+    def student_gaps(self, student_id: str) -> Dict[str, List[str]]:
+        """Requirements one student is missing for each role they target."""
+        row = self.students[student_id]
+        met = set(self.met_matrix()[row].indices)
+        targets = self._targets(np.array([row]))
+        return {
+            self.roles[index]: [self.requirements[requirement] for requirement in self._role_requirements[index]
+                                if requirement not in met]
+            for index in targets.indices
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cohort skill-gap report over exported resume analyses")
+    parser.add_argument('inputs', nargs='+',
+                        help="JSONL/JSON exports: bulk_ingest.py output or User documents")
+    parser.add_argument('--cohort', help="Only students whose cohort field has this value")
+    parser.add_argument('--cohort-field', default='cohort', help="Record field naming the student's cohort")
+    parser.add_argument('--role', help="Score every student against this role instead of their targets")
+    parser.add_argument('--roles', help="JSON file of {role: {'title', 'required_skills'}} (default: job templates)")
+    parser.add_argument('--min-proficiency', type=float, default=0.0,
+                        help="Proficiency a skill needs to count towards a requirement")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_MISSING)
+    parser.add_argument('--student', help="Report one student's missing requirements instead")
+    parser.add_argument('-o', '--output', help="Write the report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    roles = None
+    if args.roles:
+        with open(args.roles, 'r', encoding='utf-8') as file:
+            roles = json.load(file)
+    analytics = CohortAnalytics(roles, min_proficiency=args.min_proficiency)
+    for path in args.inputs:
+        added = analytics.add_records(iter_records(path), args.cohort_field)
+        logger.info(f"Loaded {added} analyses from {path}")
+
+    try:
+        if args.student:
+            report = analytics.student_gaps(args.student)
+        else:
+            report = analytics.report(args.cohort, args.role, args.top)
+    except (KeyError, ValueError) as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
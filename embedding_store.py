@@ -0,0 +1,362 @@
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = ('float16', 'float32')
+
+META_FILE = 'meta.json'
+# Data files carry the compaction generation, e.g. vectors.3.bin and index.3.jsonl
+VECTORS_FILE = 'vectors.{}.bin'
+INDEX_FILE = 'index.{}.jsonl'
+
+
+def text_key(text: str) -> str:
+    """Store key for an embedded text, so edited texts are re-embedded and unchanged ones are not."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """Persistent, memory-mapped store of fixed-width embedding vectors keyed by id.
+
+    A store directory holds three files:
+
+    - vectors.<generation>.bin: rows of dim values in a fixed dtype (float16 or float32), row-major
+      with no header, memory-mapped read-only so every process opening the store shares
+      the same page-cache pages instead of holding its own copy on the heap;
+    - index.<generation>.jsonl: an append-only log of {"id", "row"} additions and {"id", "deleted"}
+      tombstones, replayed on open to rebuild the id -> row map;
+    - meta.json: dim, dtype and the current generation, bumped by compaction.
+
+    Growth is append-only: vectors are written to the end of the vectors file first and the
+    log line is the commit point, so a crash mid-append leaves the store consistent.
+    There must be a single writer; any number of readers can call refresh() to pick up
+    rows appended (or a compaction done) by the writer.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, dtype: str = 'float32',
+                 readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        meta_path = os.path.join(directory, META_FILE)
+
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            if dim is not None and dim != meta['dim']:
+                raise ValueError(f"Store {directory} has dim {meta['dim']}, not {dim}")
+        elif readonly:
+            raise FileNotFoundError(f"No embedding store at {directory}")
+        else:
+            if dim is None:
+                raise ValueError("dim is required to create a new embedding store")
+            if dtype not in SUPPORTED_DTYPES:
+                raise ValueError(f"dtype must be one of {SUPPORTED_DTYPES}, not {dtype}")
+            os.makedirs(directory, exist_ok=True)
+            meta = {'dim': int(dim), 'dtype': dtype, 'generation': 0}
+            self._write_meta(meta)
+            open(os.path.join(directory, VECTORS_FILE.format(0)), 'ab').close()
+            open(os.path.join(directory, INDEX_FILE.format(0)), 'ab').close()
+
+        self.dim = meta['dim']
+        self.dtype = np.dtype(meta['dtype'])
+        self._open(meta['generation'])
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        path = os.path.join(self.directory, META_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        os.replace(path + '.tmp', path)
+
+    def _path(self, template: str) -> str:
+        return os.path.join(self.directory, template.format(self.generation))
+
+    def _open(self, generation: int) -> None:
+        """(Re)load the id map from the log and map the committed rows."""
+        self.generation = generation
+        self.id_to_row: Dict[str, int] = {}
+        self.row_ids: List[Optional[str]] = []
+        self._log_offset = 0
+        self._vectors = None
+        self._replay()
+
+        if not self.readonly:
+            # Drop a torn log line and vector bytes past the last committed row
+            for path, size in ((self._path(INDEX_FILE), self._log_offset),
+                               (self._path(VECTORS_FILE), len(self.row_ids) * self.dim * self.dtype.itemsize)):
+                if os.path.getsize(path) > size:
+                    with open(path, 'r+b') as file:
+                        file.truncate(size)
+
+    def _replay(self) -> bool:
+        """Apply log lines written since the last replay. Returns True if any were applied."""
+        applied = False
+        with open(self._path(INDEX_FILE), 'rb') as log:
+            log.seek(self._log_offset)
+            for line in log:
+                if not line.endswith(b'\n'):
+                    break  # Partially written line; the writer hasn't committed it yet
+                self._log_offset += len(line)
+                entry = json.loads(line)
+                if entry.get('deleted'):
+                    row = self.id_to_row.pop(entry['id'], None)
+                    if row is not None:
+                        self.row_ids[row] = None
+                else:
+                    row = entry['row']
+                    while len(self.row_ids) <= row:
+                        self.row_ids.append(None)
+                    previous = self.id_to_row.get(entry['id'])
+                    if previous is not None:
+                        self.row_ids[previous] = None
+                    self.id_to_row[entry['id']] = row
+                    self.row_ids[row] = entry['id']
+                applied = True
+        if applied:
+            self._vectors = None
+        return applied
+
+    def _map_vectors(self) -> np.ndarray:
+        rows = len(self.row_ids)
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=self.dtype)
+        return np.memmap(self._path(VECTORS_FILE), dtype=self.dtype, mode='r', shape=(rows, self.dim))
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only memmap of every committed row, tombstoned rows included.
+
+        A reader whose generation was compacted away and deleted since it last mapped
+        the vectors moves to the current generation, as refresh() would.
+        """
+        if self._vectors is None:
+            try:
+                self._vectors = self._map_vectors()
+            except FileNotFoundError:
+                if not self.readonly:
+                    raise
+                self.refresh()
+                self._vectors = self._map_vectors()
+        return self._vectors
+
+    def refresh(self) -> bool:
+        """Pick up appends, tombstones or a compaction made by the writer process."""
+        with self._lock:
+            with open(os.path.join(self.directory, META_FILE), 'r', encoding='utf-8') as file:
+                generation = json.load(file)['generation']
+            if generation != self.generation:
+                self._open(generation)
+                return True
+            try:
+                return self._replay()
+            except FileNotFoundError:
+                # Compacted between reading meta.json and the log; reload the new generation
+                with open(os.path.join(self.directory, META_FILE), 'r', encoding='utf-8') as file:
+                    self._open(json.load(file)['generation'])
+                return True
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.id_to_row
+
+    def ids(self) -> List[str]:
+        return list(self.id_to_row)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Vector for key as float32, or None if the key is absent."""
+        vectors = self.vectors  # May move a reader to a new generation, renumbering rows
+        row = self.id_to_row.get(key)
+        if row is None:
+            return None
+        return np.asarray(vectors[row], dtype=np.float32)
+
+    def rows(self, keys: Sequence[str]) -> np.ndarray:
+        """Row numbers for keys, raising KeyError for any key not in the store."""
+        return np.fromiter((self.id_to_row[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def matrix(self, keys: Sequence[str]) -> np.ndarray:
+        """float32 matrix of the vectors for keys, in order."""
+        if not len(keys):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.asarray(self.vectors[self.rows(keys)], dtype=np.float32)
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Append vectors; a key that already exists is re-pointed to its new row."""
+        if self.readonly:
+            raise PermissionError("Embedding store is opened read-only")
+        vectors = np.asarray(vectors, dtype=self.dtype).reshape(len(keys), self.dim)
+        if not len(keys):
+            return
+        with self._lock:
+            start = len(self.row_ids)
+            with open(self._path(VECTORS_FILE), 'ab') as file:
+                file.write(np.ascontiguousarray(vectors).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            lines = ''.join(
+                json.dumps({'id': key, 'row': start + offset}) + '\n'
+                for offset, key in enumerate(keys)
+            )
+            self._append_log(lines)
+            self._replay()
+
+    def delete(self, keys: Iterable[str]) -> int:
+        """Tombstone keys. Returns how many were present."""
+        if self.readonly:
+            raise PermissionError("Embedding store is opened read-only")
+        with self._lock:
+            present = [key for key in keys if key in self.id_to_row]
+            if present:
+                self._append_log(''.join(json.dumps({'id': key, 'deleted': True}) + '\n' for key in present))
+                self._replay()
+        return len(present)
+
+    def _append_log(self, lines: str) -> None:
+        with open(self._path(INDEX_FILE), 'a', encoding='utf-8') as log:
+            log.write(lines)
+            log.flush()
+            os.fsync(log.fileno())
+
+    @property
+    def dead_rows(self) -> int:
+        return len(self.row_ids) - len(self.id_to_row)
+
+    def compact(self) -> int:
+        """Rewrite the store without tombstoned or superseded rows. Returns rows reclaimed.
+
+        The live rows are written to the next generation's files and meta.json is then
+        switched to it atomically. Readers keep using their existing mapping (the old
+        files stay readable through open handles) until they refresh().
+        """
+        if self.readonly:
+            raise PermissionError("Embedding store is opened read-only")
+        with self._lock:
+            reclaimed = self.dead_rows
+            if reclaimed == 0:
+                return 0
+            keys = list(self.id_to_row)
+            generation = self.generation + 1
+            source = self.vectors
+            with open(os.path.join(self.directory, VECTORS_FILE.format(generation)), 'wb') as file:
+                # Copy in chunks so compaction doesn't load the whole store into memory
+                for offset in range(0, len(keys), 8192):
+                    rows = self.rows(keys[offset:offset + 8192])
+                    file.write(np.ascontiguousarray(source[rows]).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            with open(os.path.join(self.directory, INDEX_FILE.format(generation)), 'w', encoding='utf-8') as log:
+                log.write(''.join(json.dumps({'id': key, 'row': row}) + '\n' for row, key in enumerate(keys)))
+                log.flush()
+                os.fsync(log.fileno())
+            self._write_meta({'dim': self.dim, 'dtype': self.dtype.name, 'generation': generation})
+
+            old_files = [self._path(VECTORS_FILE), self._path(INDEX_FILE)]
+            self._open(generation)
+            for path in old_files:
+                os.remove(path)
+        logger.info(f"Compacted embedding store {self.directory}: reclaimed {reclaimed} rows")
+        return reclaimed
+
+    def embed(self, texts: Sequence[str], encoder: Any, batch_size: int = 64) -> np.ndarray:
+        """Return normalized float32 embeddings for texts, encoding only texts not yet stored.
+
+        A writable store keeps the new embeddings; a read-only one just returns them.
+        """
+        keys = [text_key(text) for text in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self.id_to_row:
+                missing.setdefault(key, text)
+        if not missing:
+            return self.matrix(keys)
+
+        embeddings = np.asarray(encoder.encode(
+            list(missing.values()),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ), dtype=np.float32)
+        if not self.readonly:
+            self.add(list(missing), embeddings)
+            return self.matrix(keys)
+
+        fresh = dict(zip(missing, embeddings))
+        return np.stack([fresh[key] if key in fresh else self.get(key) for key in keys])
+
+
+def open_store(dim: Optional[int] = None, readonly: bool = False) -> Optional[EmbeddingStore]:
+    """Open the store at EMBEDDING_STORE_PATH (dtype from EMBEDDING_STORE_DTYPE), if configured.
+
+    Workers open it read-only; a missing store then just means nothing is precomputed.
+    """
+    path = os.getenv('EMBEDDING_STORE_PATH')
+    if not path:
+        return None
+    if readonly and not os.path.exists(os.path.join(path, META_FILE)):
+        logger.warning(f"Embedding store {path} does not exist yet; embedding on the fly")
+        return None
+    return EmbeddingStore(path, dim=dim, dtype=os.getenv('EMBEDDING_STORE_DTYPE', 'float32'), readonly=readonly)
+
+
+def warm(directory: str, dtype: str = 'float32') -> Dict[str, Any]:
+    """Embed the analyzer's job templates and taxonomy skills into a store ahead of time."""
+    from sentence_transformers import SentenceTransformer
+    from ai_resume_analyzer import MODEL_CHECKPOINTS
+    from job_templates import JOB_TEMPLATES
+    from job_matcher import job_text
+    from skill_matcher import load_taxonomy
+
+    encoder = SentenceTransformer(MODEL_CHECKPOINTS['sentence_transformer'])
+    store = EmbeddingStore(directory, dim=encoder.get_sentence_embedding_dimension(), dtype=dtype)
+    before = len(store)
+    texts = [job_text(template) for template in JOB_TEMPLATES.values()]
+    for skills in load_taxonomy().categories.values():
+        texts.extend(skills)
+    store.embed(texts, encoder)
+    return {'entries': len(store), 'added': len(store) - before}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage an on-disk embedding store")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    warm_parser = subparsers.add_parser('warm', help="Precompute job template and skill embeddings")
+    warm_parser.add_argument('directory')
+    warm_parser.add_argument('--dtype', choices=SUPPORTED_DTYPES, default='float32')
+    compact_parser = subparsers.add_parser('compact', help="Reclaim tombstoned rows")
+    compact_parser.add_argument('directory')
+    stats_parser = subparsers.add_parser('stats', help="Print entry and row counts")
+    stats_parser.add_argument('directory')
+    args = parser.parse_args(argv)
+
+    if args.command == 'warm':
+        print(json.dumps(warm(args.directory, args.dtype)))
+    elif args.command == 'compact':
+        print(json.dumps({'reclaimed': EmbeddingStore(args.directory).compact()}))
+    else:
+        store = EmbeddingStore(args.directory, readonly=True)
+        print(json.dumps({
+            'entries': len(store),
+            'rows': len(store.row_ids),
+            'dead_rows': store.dead_rows,
+            'dim': store.dim,
+            'dtype': store.dtype.name,
+            'generation': store.generation
+        }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,273 @@
+import os
+import re
 import sys
 import json
-from docx import Document
+import time
+import zipfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
 import PyPDF2
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from tracing import span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# PDFs with at least this many pages are extracted across a process pool
+PARALLEL_PAGE_THRESHOLD = 8
+PAGES_PER_TASK = 4
+
+# Pool size for page-parallel extraction; 1 disables it (e.g. inside other worker pools)
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', '0')) or None
+
+# Page-extraction pool shared by every document; started on first use
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+# Extraction budget; unset means read the whole document
+MAX_PDF_PAGES = int(os.getenv('PDF_MAX_PAGES', '0')) or None
+MAX_PDF_CHARS = int(os.getenv('PDF_MAX_CHARS', '0')) or None
+
+# Pages slower than this are logged so pathological PDFs can be found
+SLOW_PAGE_SECONDS = 2.0
+
+# WordprocessingML names used by the streaming DOCX extractor
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_RELATIONSHIP = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+_RUN_CHARACTERS = {_W + 'tab': '\t', _W + 'br': '\n', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+_HEADER_PART_RE = re.compile(r'word/header(\d*)\.xml')
+_FOOTER_PART_RE = re.compile(r'word/footer(\d*)\.xml')
+
+# Separator between the cells of a table row
+DOCX_CELL_SEPARATOR = '\t'
+
+def _iter_docx_part_lines(stream) -> Iterator[str]:
+    """Yield the text lines of one WordprocessingML part in document order.
+
+    Each paragraph is a line and each table row is a line of tab-separated cells.
+    Text box paragraphs are yielded where they occur, just before the paragraph
+    anchoring them. mc:Fallback copies of text boxes are skipped so nothing is read
+    twice, as are deleted revisions and field codes. Finished blocks are cleared
+    from the tree as parsing goes, so memory stays bounded.
+    """
+    open_elements = []
+    paragraphs = []  # Run text of each open (possibly nested) paragraph
+    containers = [[]]  # Finished lines: document level, then one list per open table cell
+    rows = []  # Cells of each open table row
+    fallback = 0
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            open_elements.append(element)
+            if tag == _MC_FALLBACK:
+                fallback += 1
+            elif fallback:
+                continue
+            elif tag == _W + 'p':
+                paragraphs.append([])
+            elif tag == _W + 'tc':
+                containers.append([])
+            elif tag == _W + 'tr':
+                rows.append([])
+            continue
+        
+        open_elements.pop()
+        if tag == _MC_FALLBACK:
+            fallback -= 1
+            continue
+        if fallback:
+            continue
+        if tag == _W + 't':
+            if paragraphs:
+                paragraphs[-1].append(element.text or '')
+        elif tag in _RUN_CHARACTERS:
+            if paragraphs:
+                paragraphs[-1].append(_RUN_CHARACTERS[tag])
+        elif tag == _W + 'p':
+            containers[-1].append(''.join(paragraphs.pop()))
+        elif tag == _W + 'tc':
+            cell = containers.pop()
+            rows[-1].append(' '.join(line for line in cell if line.strip()))
+        elif tag == _W + 'tr':
+            containers[-1].append(DOCX_CELL_SEPARATOR.join(rows.pop()))
+        else:
+            continue
+        
+        if not paragraphs and not rows and len(containers) == 1:
+            # A top-level block is done: emit its lines and drop it from the tree
+            yield from containers[0]
+            containers[0].clear()
+            if open_elements:
+                open_elements[-1].clear()
+
+def _docx_main_part(archive: zipfile.ZipFile) -> str:
+    """Name of the main document part, from the package relationships."""
+    try:
+        relationships = ElementTree.fromstring(archive.read('_rels/.rels'))
+        for relationship in relationships.iter(_RELATIONSHIP):
+            if relationship.get('Type') == _OFFICE_DOCUMENT:
+                return relationship.get('Target').lstrip('/')
+    except (KeyError, ElementTree.ParseError):
+        pass
+    return 'word/document.xml'
+
+def _docx_parts(names: List[str], pattern: re.Pattern) -> List[str]:
+    """Part names matching pattern, in numeric order (header1, header2, ...)."""
+    matches = [pattern.fullmatch(name) for name in names]
+    return [match.group(0) for match in sorted(filter(None, matches), key=lambda m: int(m.group(1) or 0))]
+
 def extract_from_docx(file_path: str) -> str:
-    """Extract text from a Word document."""
+    """Extract text from a Word document by streaming its XML parts.
+
+    Paragraphs, tables (a line per row), text boxes and headers/footers are read
+    straight from the zip with an incremental parser, without loading the document
+    model or any embedded images. Headers come first and footers last, each distinct
+    one once.
+    """
     try:
-        doc = Document(file_path)
-        text = []
-        for para in doc.paragraphs:
-            text.append(para.text)
-        return '\n'.join(text)
+        with zipfile.ZipFile(file_path) as archive:
+            names = archive.namelist()
+            
+            def part_text(name: str) -> str:
+                with archive.open(name) as stream:
+                    return '\n'.join(_iter_docx_part_lines(stream))
+            
+            lines = []
+            seen = set()
+            for name in _docx_parts(names, _HEADER_PART_RE):
+                text = part_text(name)
+                if text.strip() and text not in seen:
+                    seen.add(text)
+                    lines.append(text)
+            with archive.open(_docx_main_part(archive)) as stream:
+                lines.extend(_iter_docx_part_lines(stream))
+            for name in _docx_parts(names, _FOOTER_PART_RE):
+                text = part_text(name)
+                if text.strip() and text not in seen:
+                    seen.add(text)
+                    lines.append(text)
+        return '\n'.join(lines)
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         raise
 
-def extract_from_pdf(file_path: str) -> str:
-    """Extract text from a PDF document."""
+def extract_from_docx_dom(file_path: str) -> str:
+    """Body paragraphs only, via the python-docx document model (the previous extractor).
+
+    Kept as the baseline extract_from_docx is benchmarked against.
+    """
+    from docx import Document
+    
+    doc = Document(file_path)
+    return '\n'.join(para.text for para in doc.paragraphs)
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[Tuple[int, str, float]]:
+    """Extract pages [start, stop) as (page_index, text, seconds); runs in pool workers."""
+    pages = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for index in range(start, stop):
+            page_start = time.perf_counter()
+            text = pdf_reader.pages[index].extract_text() or ''
+            pages.append((index, text, time.perf_counter() - page_start))
+    return pages
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared page-extraction pool, started with workers processes on first use."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=workers)
+        return _page_pool
+
+def _discard_page_pool(pool: Executor) -> None:
+    """Drop a broken shared pool so the next document starts a fresh one."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_page_pool() -> None:
+    """Stop the shared page-extraction pool, if one was started."""
+    global _page_pool
+    with _page_pool_lock:
+        pool, _page_pool = _page_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def iter_pdf_pages(file_path: str, max_pages: Optional[int] = None,
+                   workers: Optional[int] = None,
+                   executor: Optional[Executor] = None) -> Iterator[Tuple[int, str, float]]:
+    """Yield (page_index, text, seconds) for each page of a PDF, in page order.
+
+    Documents with at least PARALLEL_PAGE_THRESHOLD pages are extracted in chunks of
+    PAGES_PER_TASK pages on executor, or else on a module-level process pool that is
+    started once and reused for every document. Closing the generator early cancels
+    the chunks that have not started yet.
+    """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        num_pages = len(pdf_reader.pages)
+        if max_pages is not None:
+            num_pages = min(num_pages, max_pages)
+        
+        if workers is None:
+            workers = PDF_WORKERS or min(os.cpu_count() or 1, 4)
+        if num_pages < PARALLEL_PAGE_THRESHOLD or (executor is None and workers <= 1):
+            for index in range(num_pages):
+                page_start = time.perf_counter()
+                text = pdf_reader.pages[index].extract_text() or ''
+                yield index, text, time.perf_counter() - page_start
+            return
+    
+    pool = executor or _get_page_pool(workers)
+    futures = []
+    try:
+        futures = [
+            pool.submit(_extract_page_range, file_path, start, min(start + PAGES_PER_TASK, num_pages))
+            for start in range(0, num_pages, PAGES_PER_TASK)
+        ]
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        if executor is None:
+            _discard_page_pool(pool)
+        raise
+    finally:
+        # The pool outlives this document; only this document's pending chunks are dropped
+        for future in futures:
+            future.cancel()
+
+def extract_from_pdf(file_path: str, max_pages: Optional[int] = MAX_PDF_PAGES,
+                     max_chars: Optional[int] = MAX_PDF_CHARS,
+                     page_timings: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Extract text from a PDF document.
+
+    Stops early once max_pages pages or max_chars characters have been read. When a
+    page_timings list is given, one entry per extracted page is appended to it.
+    """
     try:
         text = []
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text.append(page.extract_text())
+        total_chars = 0
+        for index, page_text, seconds in iter_pdf_pages(file_path, max_pages=max_pages):
+            if page_timings is not None:
+                page_timings.append({'page': index + 1, 'chars': len(page_text), 'seconds': round(seconds, 4)})
+            if seconds > SLOW_PAGE_SECONDS:
+                logger.warning(f"Slow PDF page {index + 1} in {file_path}: {seconds:.1f}s")
+            
+            if max_chars is not None and total_chars + len(page_text) >= max_chars:
+                if max_chars > total_chars:
+                    text.append(page_text[:max_chars - total_chars])
+                break
+            text.append(page_text)
+            total_chars += len(page_text) + 1
         return '\n'.join(text)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
@@ -37,17 +276,21 @@ def extract_from_pdf(file_path: str) -> str:
 def extract_text(file_path: str) -> Dict[str, Any]:
     """Extract text from a document based on its file extension."""
     try:
-        if file_path.lower().endswith('.docx'):
-            text = extract_from_docx(file_path)
-        elif file_path.lower().endswith('.pdf'):
-            text = extract_from_pdf(file_path)
-        else:
-            raise ValueError("Unsupported file type. Only PDF and Word documents are supported.")
+        result = {'success': True}
+        with span('extract_text', file_type=os.path.splitext(file_path)[1].lower()) as stage:
+            if file_path.lower().endswith('.docx'):
+                text = extract_from_docx(file_path)
+            elif file_path.lower().endswith('.pdf'):
+                page_timings = []
+                text = extract_from_pdf(file_path, page_timings=page_timings)
+                result['page_timings'] = page_timings
+                stage.set(pages=len(page_timings))
+            else:
+                raise ValueError("Unsupported file type. Only PDF and Word documents are supported.")
+            stage.set(chars=len(text))
         
-        return {
-            'success': True,
-            'text': text
-        }
+        result['text'] = text
+        return result
     except Exception as e:
         logger.error(f"Error in text extraction: {str(e)}")
         return {
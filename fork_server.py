@@ -0,0 +1,341 @@
+import os
+import gc
+import sys
+import json
+import time
+import ctypes
+import signal
+import shutil
+import socket
+import logging
+import argparse
+import selectors
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import extract_text
+from model_worker import SERVICES, ModelWorker, serve_socket
+
+# Configure logging (stderr only: stdout carries the event frames)
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+# Workers dying sooner than this after being forked, twice in a row, are respawned after a pause
+MIN_WORKER_UPTIME_SECONDS = 1.0
+_PR_SET_PDEATHSIG = 1
+
+
+def service_checkpoints(service: str) -> List[str]:
+    """Hub repositories holding the checkpoints a service loads."""
+    if service == 'jobs':
+        from ai_job_recommender import DEFAULT_ROLE_MODELS
+        return sorted(set(DEFAULT_ROLE_MODELS.values()))
+    from ai_resume_analyzer import MODEL_CHECKPOINTS
+    checkpoints = dict(MODEL_CHECKPOINTS)
+    # sentence-transformers resolves bare model names under its own organisation
+    if '/' not in checkpoints['sentence_transformer']:
+        checkpoints['sentence_transformer'] = f"sentence-transformers/{checkpoints['sentence_transformer']}"
+    return sorted(set(checkpoints.values()))
+
+
+def prepare(service: str) -> Dict[str, str]:
+    """Download every checkpoint a service loads into the local Hugging Face cache.
+
+    Only safetensors weights are fetched where a repository publishes them, since
+    they are memory-mapped on load; the others fall back to pickled .bin weights.
+    Returns the weight format used per checkpoint.
+    """
+    from huggingface_hub import list_repo_files, snapshot_download
+
+    token = os.getenv('HUGGINGFACE_API_KEY')
+    formats = {}
+    for checkpoint in service_checkpoints(service):
+        files = list_repo_files(checkpoint, token=token)
+        weights = 'safetensors' if any(name.endswith('.safetensors') for name in files) else 'bin'
+        if weights == 'bin':
+            logger.warning(f"{checkpoint} has no safetensors weights; its .bin weights are read into memory")
+        snapshot_download(checkpoint, token=token,
+                          allow_patterns=['*.json', '*.txt', '*.model', '*.py', 'tokenizer*', f"*.{weights}"])
+        formats[checkpoint] = weights
+        logger.info(f"Prepared {checkpoint} ({weights})")
+    return formats
+
+
+def _exit_with_parent() -> None:
+    """Have the kernel send this process SIGTERM when its parent dies (Linux only)."""
+    try:
+        ctypes.CDLL(None, use_errno=True).prctl(_PR_SET_PDEATHSIG, signal.SIGTERM)
+    except (OSError, AttributeError):
+        pass
+
+
+class ForkServer:
+    """Zygote that loads a service's models once and forks workers sharing them copy-on-write.
+
+    The parent imports torch/transformers and loads every model, then forks `workers`
+    ModelWorkers. Weights are only read by inference, so their pages stay shared between
+    all workers instead of being copied per process. Each worker serves its own Unix
+    socket. The parent reports workers and exits as JSON event frames on stdout, e.g.
+    ``{"event": "worker", "slot": 0, "pid": 123, "socket": "..."}``. It forks a
+    replacement as soon as a worker dies; no models are loaded for that.
+
+    The parent never runs a forward pass: torch's thread pool and CUDA state do not
+    survive fork(), so models are loaded single-threaded on CPU and each worker sets
+    its own thread count.
+    """
+
+    def __init__(self, service: str, workers: int, socket_dir: Optional[str] = None,
+                 stages: Optional[List[str]] = None, torch_threads: Optional[int] = None):
+        if service not in SERVICES:
+            raise ValueError(f"Unknown service '{service}'. Expected one of: {', '.join(SERVICES)}")
+        self.service = service
+        self.workers = workers
+        self.stages = stages
+        self._own_socket_dir = socket_dir is None
+        self.socket_dir = socket_dir or tempfile.mkdtemp(prefix=f"{service}-workers-")
+        # Split the cores between workers so they don't oversubscribe the CPU
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+        self.backend = None
+        self.load_seconds = 0.0
+        self.children: Dict[int, int] = {}  # pid -> slot
+        self.forked_at: Dict[int, float] = {}  # slot -> time its current worker was forked
+        self.quick_exits: Dict[int, int] = {}  # slot -> consecutive exits within MIN_WORKER_UPTIME_SECONDS
+        self.respawn_at: Dict[int, float] = {}  # slot -> when its worker, crashing on startup, is forked again
+        self.respawns = 0
+        self.running = True
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wakeup_fds: tuple = ()
+
+    def socket_path(self, slot: int) -> str:
+        return os.path.join(self.socket_dir, f"{self.service}-{slot}.sock")
+
+    def load(self) -> None:
+        """Import and load the service's models in this (parent) process."""
+        import torch
+
+        # With one thread no OpenMP pool is started, so none is left half-alive in the workers
+        torch.set_num_threads(1)
+        start = time.time()
+        self.backend = SERVICES[self.service]()
+        if hasattr(self.backend, 'warm_up'):
+            self.backend.warm_up(self.stages)
+        if torch.cuda.is_initialized():
+            raise RuntimeError("The fork server needs CPU models: CUDA state does not survive fork()")
+        registry = getattr(self.backend, 'registry', None)
+        if registry is not None:
+            # Models unloaded in a worker would not free the shared pages anyway
+            registry.stop_reaper()
+        self.load_seconds = time.time() - start
+        logger.info(f"{self.service} models loaded in {self.load_seconds:.1f}s (pid {os.getpid()})")
+        # Keep the collector off everything allocated so far: collections in the workers
+        # would otherwise write to (and so copy) the pages holding the parent's objects
+        gc.collect()
+        gc.freeze()
+
+    def spawn(self, slot: int) -> int:
+        """Fork the worker for slot, listening on its own socket. Returns its pid."""
+        path = self.socket_path(slot)
+        if os.path.exists(path):
+            os.unlink(path)
+        # Listening before the fork lets clients connect as soon as the worker is announced
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                self._run_worker(slot, listener)
+                status = 0
+            except BaseException:
+                logger.exception(f"{self.service} worker {slot} failed")
+            finally:
+                sys.stderr.flush()
+                os._exit(status)
+        listener.close()
+        fork_ms = (time.perf_counter() - start) * 1000
+        self.children[pid] = slot
+        self.forked_at[slot] = time.time()
+        logger.info(f"Forked {self.service} worker {slot} (pid {pid}) in {fork_ms:.1f}ms")
+        self._emit({'event': 'worker', 'slot': slot, 'pid': pid, 'socket': path, 'fork_ms': fork_ms})
+        return pid
+
+    def _run_worker(self, slot: int, listener: socket.socket) -> None:
+        """Body of a forked worker: serve the inherited backend on the inherited listener."""
+        import torch
+
+        _exit_with_parent()
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        if self._selector is not None:
+            self._selector.close()
+        for fd in self._wakeup_fds:
+            os.close(fd)
+        # stdin and stdout carry the parent's event frames, not this worker's
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.dup2(2, 1)
+
+        torch.set_num_threads(self.torch_threads)
+        # Never fork a page-extraction pool from here: GC is frozen and the weights are shared
+        extract_text.PDF_WORKERS = 1
+        cache = getattr(self.backend, 'cache', None)
+        if cache:
+            cache.reopen()
+        worker = ModelWorker(self.service, self.stages, backend=self.backend)
+        serve_socket(worker, self.socket_path(slot), listener)
+
+    def serve_forever(self) -> None:
+        """Fork the workers and keep every slot filled until stdin closes or SIGTERM."""
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        self._wakeup_fds = (read_fd, write_fd)
+        # Signals only wake the selector; children are reaped in the loop below
+        signal.set_wakeup_fd(write_fd)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop_serving())
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(read_fd, selectors.EVENT_READ)
+        self._selector.register(sys.stdin.fileno(), selectors.EVENT_READ)
+
+        try:
+            for slot in range(self.workers):
+                self.spawn(slot)
+            self._emit({'event': 'ready', 'service': self.service, 'pid': os.getpid(),
+                        'workers': self.workers, 'load_seconds': self.load_seconds})
+            while self.running:
+                timeout = None
+                if self.respawn_at:
+                    timeout = max(0.0, min(self.respawn_at.values()) - time.time())
+                for key, _ in self._selector.select(timeout):
+                    if key.fd == read_fd:
+                        while True:
+                            try:
+                                if not os.read(read_fd, 512):
+                                    break
+                            except BlockingIOError:
+                                break
+                    elif not os.read(key.fd, 4096):
+                        # The backend that started us is gone
+                        self._stop_serving()
+                self._reap()
+                self._respawn_due()
+        finally:
+            self.stop()
+
+    def _reap(self) -> None:
+        """Collect exited workers and fork their replacements."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self.children.pop(pid, None)
+            if slot is None:
+                continue
+            code = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            logger.warning(f"{self.service} worker {slot} (pid {pid}) exited with code {code}")
+            self._emit({'event': 'exit', 'slot': slot, 'pid': pid, 'code': code})
+            if not self.running:
+                continue
+            if time.time() - self.forked_at.get(slot, 0) < MIN_WORKER_UPTIME_SECONDS:
+                self.quick_exits[slot] = self.quick_exits.get(slot, 0) + 1
+            else:
+                self.quick_exits[slot] = 0
+            if self.quick_exits[slot] > 1:
+                # Crashing on startup: fork it again after a pause (from the loop, which
+                # keeps serving meanwhile) rather than in a tight loop
+                self.respawn_at[slot] = time.time() + MIN_WORKER_UPTIME_SECONDS
+                continue
+            self.respawns += 1
+            self.spawn(slot)
+
+    def _respawn_due(self) -> None:
+        """Fork the workers whose startup-crash pause has passed."""
+        now = time.time()
+        for slot, due in list(self.respawn_at.items()):
+            if due <= now and self.running:
+                del self.respawn_at[slot]
+                self.respawns += 1
+                self.spawn(slot)
+
+    def _stop_serving(self) -> None:
+        self.running = False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Terminate every worker, waiting up to timeout before killing them."""
+        self.running = False
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + timeout
+        while self.children and time.time() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break  # Every child was already reaped; the pids left are stale
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.children.clear()
+        self.respawn_at.clear()
+        if self._own_socket_dir:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+    def _emit(self, frame: Dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps(frame) + '\n')
+        sys.stdout.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load models once and fork workers that share them")
+    parser.add_argument('--service', choices=sorted(SERVICES), default='resume')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Number of workers to fork")
+    parser.add_argument('--stages',
+                        help="Comma-separated analysis stages to preload models for (default: all)")
+    parser.add_argument('--socket-dir', help="Directory for the workers' sockets (default: a temporary one)")
+    parser.add_argument('--torch-threads', type=int,
+                        help="Intra-op threads per worker (default: CPU count / workers)")
+    parser.add_argument('--prepare', action='store_true',
+                        help="Download the service's checkpoints (safetensors where available) and exit")
+    args = parser.parse_args(argv)
+
+    if args.prepare:
+        print(json.dumps(prepare(args.service), indent=2))
+        return 0
+
+    if os.getenv('MODEL_LOCAL_FILES_ONLY', '1') != '0':
+        # Every from_pretrained call then behaves as local_files_only=True: no hub requests at startup.
+        # Set before the backend modules import transformers and huggingface_hub
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+        os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+    try:
+        stages = args.stages.split(',') if args.stages else None
+        server = ForkServer(args.service, args.workers, args.socket_dir, stages, args.torch_threads)
+        server.load()
+    except Exception as e:
+        sys.stdout.write(json.dumps({'event': 'error', 'error': str(e)}) + '\n')
+        sys.stdout.flush()
+        return 1
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
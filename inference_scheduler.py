@@ -0,0 +1,210 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_QUEUE = 1024
+
+# Batch-size histogram buckets (upper bounds)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a model queue is at capacity; callers should back off and retry."""
+
+
+class MicroBatcher:
+    """Queues items for one model and runs them in batches on a dedicated thread.
+
+    The first queued item opens a batch; more items join until max_batch_size is reached
+    or max_wait_ms has passed since it arrived. The batch goes through batch_fn (a list of
+    items in, a list of results out, one forward pass) and each caller gets its own result.
+    Submissions that would push the queue past max_queue are rejected with QueueFullError;
+    one larger than max_queue is queued in chunks of max_queue, one after another.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                 max_queue: int = DEFAULT_MAX_QUEUE):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # One thread per model: its forward passes never overlap, different models' can
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batch-{name}")
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.queue_wait_seconds = 0.0
+        self.batch_seconds = 0.0
+        self.batch_size_counts = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+
+    def start(self) -> None:
+        """Start the batching loop on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, items: Sequence[Any]) -> List[Any]:
+        """Queue items and wait for their results, in order."""
+        if not items:
+            return []
+        if len(items) > self.max_queue:
+            # Could never fit at once; each chunk is still rejected while the queue is busy
+            results = []
+            for start in range(0, len(items), self.max_queue):
+                results.extend(await self.submit(items[start:start + self.max_queue]))
+            return results
+        if self.depth + len(items) > self.max_queue:
+            self.rejected += len(items)
+            raise QueueFullError(f"{self.name} queue is full ({self.depth} items waiting)")
+        loop = asyncio.get_running_loop()
+        futures = []
+        now = time.perf_counter()
+        for item in items:
+            future = loop.create_future()
+            futures.append(future)
+            self._queue.put_nowait((item, future, now))
+        self.max_depth = max(self.max_depth, self.depth)
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            await self._execute(loop, batch)
+
+    async def _execute(self, loop: asyncio.AbstractEventLoop, batch: List[Any]) -> None:
+        items = [item for item, _, _ in batch]
+        started = time.perf_counter()
+        self.queue_wait_seconds += sum(started - queued for _, _, queued in batch)
+        try:
+            results = await loop.run_in_executor(self._executor, self.batch_fn, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name} batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error(f"Error running {self.name} batch of {len(items)}: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        self.batch_seconds += time.perf_counter() - started
+        self.batches += 1
+        self.items += len(items)
+        bucket = next((bound for bound in BATCH_SIZE_BUCKETS if len(items) <= bound), BATCH_SIZE_BUCKETS[-1])
+        self.batch_size_counts[bucket] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'batches': self.batches,
+            'items': self.items,
+            'rejected': self.rejected,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'mean_queue_wait_ms': 1000 * self.queue_wait_seconds / self.items if self.items else 0.0,
+            'mean_batch_ms': 1000 * self.batch_seconds / self.batches if self.batches else 0.0,
+            'batch_sizes': {f"le_{bound}": count for bound, count in self.batch_size_counts.items()}
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+
+class InferenceScheduler:
+    """Per-model micro-batching in front of a set of batch functions.
+
+    The scheduler runs its own asyncio loop on a background thread. Asyncio code calls
+    ``await scheduler.submit(model, items)``; ordinary threads call
+    ``scheduler.run(model, items)``, which blocks until the results are ready. Items
+    submitted concurrently by different requests share forward passes.
+    """
+
+    def __init__(self, batch_fns: Dict[str, Callable[[List[Any]], List[Any]]],
+                 max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None,
+                 max_queue: Optional[int] = None, batch_sizes: Optional[Dict[str, int]] = None):
+        """Limits default to BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS and BATCH_MAX_QUEUE from the
+        environment; batch_sizes overrides max_batch_size per model."""
+        max_batch_size = max_batch_size or int(os.getenv('BATCH_MAX_SIZE', DEFAULT_MAX_BATCH_SIZE))
+        max_wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv('BATCH_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS))
+        max_queue = max_queue or int(os.getenv('BATCH_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+        self.batchers = {
+            name: MicroBatcher(name, fn, (batch_sizes or {}).get(name, max_batch_size), max_wait_ms, max_queue)
+            for name, fn in batch_fns.items()
+        }
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def start_batchers():
+            for batcher in self.batchers.values():
+                batcher.start()
+            started.set()
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(start_batchers)
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, name="inference-scheduler", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    async def submit(self, model: str, items: Sequence[Any]) -> List[Any]:
+        """Queue items for a model from any event loop and await their results."""
+        future = asyncio.run_coroutine_threadsafe(self.batchers[model].submit(items), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def run(self, model: str, items: Sequence[Any], timeout: Optional[float] = None) -> List[Any]:
+        """Blocking variant of submit for use from worker threads."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("InferenceScheduler.run can't be called from the scheduler thread")
+        return asyncio.run_coroutine_threadsafe(self.batchers[model].submit(items), self._loop).result(timeout)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: batcher.metrics() for name, batcher in self.batchers.items()}
+
+    def close(self) -> None:
+        async def stop_all():
+            for batcher in self.batchers.values():
+                await batcher.stop()
+
+        asyncio.run_coroutine_threadsafe(stop_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,391 @@
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from job_matcher import job_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows scored per chunk when assigning vectors to centroids, bounding temporary memory
+ASSIGN_CHUNK = 16384
+
+
+def load_catalog(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield job postings from a JSONL or CSV catalog.
+
+    Each posting needs an 'id' and 'title'; 'description', 'required_skills' (list, or
+    a ';'-separated string in CSV), 'location', 'salary_min' and 'salary_max' are optional.
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                skills = row.get('required_skills') or ''
+                row['required_skills'] = [skill.strip() for skill in skills.split(';') if skill.strip()]
+                yield row
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    logger.error(f"Skipping catalog line {line_number}: {str(e)}")
+
+
+def _salary(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every vector, computed in chunks."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        chunk = vectors[start:start + ASSIGN_CHUNK]
+        assignments[start:start + ASSIGN_CHUNK] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors: np.ndarray, n_lists: int, iterations: int = 10,
+                    sample_size: int = 50000, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors; returns normalized centroids."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_lists)
+        # Re-seed empty lists from random vectors so every list stays useful
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class JobIndex:
+    """Inverted-file (IVF) approximate nearest-neighbour index over job embeddings.
+
+    Vectors are L2-normalized and partitioned by a spherical k-means coarse quantizer.
+    A query scores the centroids, scans only the n_probe closest lists and applies
+    location/salary filters as vectorized masks over those candidates. Postings can be
+    added (assigned to their nearest list) and deleted (tombstoned) without retraining.
+    """
+
+    def __init__(self, centroids: np.ndarray, n_probe: int = 8):
+        self.centroids = _normalize(np.asarray(centroids, dtype=np.float32))
+        self.dim = self.centroids.shape[1]
+        self.n_probe = n_probe
+        self.ids: List[str] = []
+        self.jobs: List[Dict[str, Any]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.deleted = np.zeros(0, dtype=bool)
+        # Locations are stored as integer codes so filters are plain array comparisons
+        self.location_codes: Dict[str, int] = {'': 0}
+        self.locations = np.zeros(0, dtype=np.int32)
+        self.salary_min = np.zeros(0, dtype=np.float32)
+        self.salary_max = np.zeros(0, dtype=np.float32)
+        self.list_rows: List[np.ndarray] = [np.zeros(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self._size = 0
+
+    @classmethod
+    def build(cls, jobs: Sequence[Dict[str, Any]], vectors: np.ndarray,
+              n_lists: Optional[int] = None, n_probe: int = 8) -> 'JobIndex':
+        """Train the coarse quantizer on vectors and index all jobs."""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        index = cls(train_centroids(vectors, n_lists), n_probe=n_probe)
+        index.add(jobs, vectors)
+        return index
+
+    @classmethod
+    def from_catalog(cls, path: str, encoder: Any, batch_size: int = 256,
+                     n_lists: Optional[int] = None, n_probe: int = 8,
+                     store: Optional[Any] = None) -> 'JobIndex':
+        """Load a catalog file, embed it in batches and build the index.
+
+        With an EmbeddingStore, postings whose text was embedded before are not re-embedded.
+        """
+        jobs = list(load_catalog(path))
+        start = time.perf_counter()
+        embeddings = []
+        for offset in range(0, len(jobs), batch_size):
+            batch = [job_text(job) for job in jobs[offset:offset + batch_size]]
+            if store is not None:
+                embeddings.append(store.embed(batch, encoder, batch_size=batch_size))
+                continue
+            embeddings.append(np.asarray(
+                encoder.encode(batch, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True),
+                dtype=np.float32
+            ))
+        vectors = np.concatenate(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+        logger.info(f"Embedded {len(jobs)} jobs in {time.perf_counter() - start:.1f}s")
+        return cls.build(jobs, vectors, n_lists=n_lists, n_probe=n_probe)
+
+    def __len__(self) -> int:
+        return int(self._size - self.deleted[:self._size].sum())
+
+    def _grow(self, needed: int) -> None:
+        """Grow row storage geometrically so repeated adds stay amortized O(1).
+
+        Vectors are grown separately because a loaded index memory-maps them at their
+        exact size; they are only copied to the heap once rows are actually added.
+        """
+        def grown(array, fill, capacity):
+            out = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            out[:self._size] = array[:self._size]
+            return out
+
+        capacity = len(self.deleted)
+        if needed > capacity:
+            capacity = max(needed, capacity * 2, 1024)
+            self.deleted = grown(self.deleted, True, capacity)
+            self.locations = grown(self.locations, 0, capacity)
+            self.salary_min = grown(self.salary_min, np.nan, capacity)
+            self.salary_max = grown(self.salary_max, np.nan, capacity)
+        if needed > len(self.vectors):
+            self.vectors = grown(self.vectors, 0, capacity)
+
+    def add(self, jobs: Sequence[Dict[str, Any]], vectors: np.ndarray) -> None:
+        """Add postings; a posting whose id already exists (or repeats in jobs) replaces the old one."""
+        if not len(jobs):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Within the batch the last occurrence of an id wins
+        last = {str(job['id']): i for i, job in enumerate(jobs)}
+        if len(last) < len(jobs):
+            keep = sorted(last.values())
+            jobs = [jobs[i] for i in keep]
+            vectors = vectors[keep]
+        vectors = _normalize(vectors)
+        for job in jobs:
+            if str(job['id']) in self.id_to_row:
+                self.delete(str(job['id']))
+
+        start = self._size
+        stop = start + len(jobs)
+        self._grow(stop)
+        self.vectors[start:stop] = vectors
+        self.deleted[start:stop] = False
+        for offset, job in enumerate(jobs):
+            row = start + offset
+            job_id = str(job['id'])
+            self.ids.append(job_id)
+            self.jobs.append(job)
+            self.id_to_row[job_id] = row
+            self._set_attributes(row, job)
+        self._size = stop
+
+        assignments = _assign(vectors, self.centroids)
+        rows = np.arange(start, stop)
+        for list_id in np.unique(assignments):
+            self.list_rows[list_id] = np.concatenate([self.list_rows[list_id], rows[assignments == list_id]])
+
+    def _set_attributes(self, row: int, job: Dict[str, Any]) -> None:
+        location = str(job.get('location') or '').strip().lower()
+        self.locations[row] = self.location_codes.setdefault(location, len(self.location_codes))
+        self.salary_min[row] = _salary(job.get('salary_min'))
+        self.salary_max[row] = _salary(job.get('salary_max'))
+
+    def delete(self, job_id: str) -> bool:
+        """Tombstone a posting. Returns False if the id is unknown."""
+        row = self.id_to_row.pop(str(job_id), None)
+        if row is None:
+            return False
+        self.deleted[row] = True
+        return True
+
+    def compact(self) -> int:
+        """Rebuild row storage without tombstoned rows; returns the number reclaimed.
+
+        Surviving rows are renumbered in order, so 'row' values from earlier searches
+        are invalid afterwards. The vectors end up on the heap at their exact size.
+        """
+        size = self._size
+        keep = np.flatnonzero(~self.deleted[:size])
+        reclaimed = size - len(keep)
+        if not reclaimed:
+            return 0
+        remap = np.full(size, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        self.vectors = np.ascontiguousarray(self.vectors[keep])
+        self.locations = self.locations[keep]
+        self.salary_min = self.salary_min[keep]
+        self.salary_max = self.salary_max[keep]
+        self.deleted = np.zeros(len(keep), dtype=bool)
+        self.ids = [self.ids[row] for row in keep]
+        self.jobs = [self.jobs[row] for row in keep]
+        self.id_to_row = {job_id: row for row, job_id in enumerate(self.ids)}
+        self._size = len(keep)
+        for list_id, rows in enumerate(self.list_rows):
+            self.list_rows[list_id] = remap[rows[remap[rows] >= 0]]
+        return int(reclaimed)
+
+    def _candidate_mask(self, rows: np.ndarray, location: Optional[str],
+                        salary_band: Optional[Tuple[float, float]]) -> np.ndarray:
+        mask = ~self.deleted[rows]
+        if location:
+            code = self.location_codes.get(location.strip().lower())
+            if code is None:
+                return np.zeros(len(rows), dtype=bool)
+            mask &= self.locations[rows] == code
+        if salary_band:
+            low, high = salary_band
+            # Keep jobs whose advertised range overlaps the requested band
+            job_min = self.salary_min[rows]
+            job_max = np.where(np.isnan(self.salary_max[rows]), job_min, self.salary_max[rows])
+            mask &= (job_max >= low) & (job_min <= high)
+        return mask
+
+    def search(self, query: np.ndarray, k: int = 10, n_probe: Optional[int] = None,
+               location: Optional[str] = None,
+               salary_band: Optional[Tuple[float, float]] = None) -> List[Dict[str, Any]]:
+        """Return up to k postings most similar to query, optionally filtered.
+
+        When filters leave fewer than k candidates in the probed lists, the probe
+        widens (doubling) until k are found or every list has been scanned.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm == 0 or len(self) == 0:
+            return []
+        query = query / norm
+
+        n_lists = len(self.centroids)
+        probe = min(n_probe or self.n_probe, n_lists)
+        order = np.argsort(-(self.centroids @ query))
+        while True:
+            rows = np.concatenate([self.list_rows[list_id] for list_id in order[:probe]])
+            rows = rows[self._candidate_mask(rows, location, salary_band)]
+            if len(rows) >= k or probe >= n_lists:
+                break
+            probe = min(probe * 2, n_lists)
+
+        if not len(rows):
+            return []
+        scores = self.vectors[rows] @ query
+        top = min(k, len(rows))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [
+            {'id': self.ids[rows[i]], 'score': float(scores[i]), 'job': self.jobs[rows[i]], 'row': int(rows[i])}
+            for i in best
+        ]
+
+    def save(self, directory: str) -> None:
+        """Persist the index as NumPy arrays plus a JSONL file of postings.
+
+        Vectors go to their own vectors.npy so load() can memory-map them.
+        """
+        os.makedirs(directory, exist_ok=True)
+        size = self._size
+        list_ids = np.concatenate([np.full(len(rows), i) for i, rows in enumerate(self.list_rows)])
+        np.save(os.path.join(directory, 'vectors.npy'), np.ascontiguousarray(self.vectors[:size]))
+        np.savez(
+            os.path.join(directory, 'index.npz'),
+            centroids=self.centroids,
+            deleted=self.deleted[:size],
+            list_rows=np.concatenate(self.list_rows),
+            list_ids=list_ids,
+            n_probe=self.n_probe
+        )
+        with open(os.path.join(directory, 'jobs.jsonl'), 'w', encoding='utf-8') as file:
+            for job in self.jobs:
+                file.write(json.dumps(job) + '\n')
+
+    @classmethod
+    def load(cls, directory: str) -> 'JobIndex':
+        """Load a saved index, memory-mapping its vectors read-only.
+
+        Worker processes loading the same index share the vectors through the page
+        cache; the first add() copies them onto the heap.
+        """
+        data = np.load(os.path.join(directory, 'index.npz'), allow_pickle=False)
+        index = cls(data['centroids'], n_probe=int(data['n_probe']))
+        jobs = list(load_catalog(os.path.join(directory, 'jobs.jsonl')))
+        vectors_path = os.path.join(directory, 'vectors.npy')
+        if os.path.exists(vectors_path):
+            index.vectors = np.load(vectors_path, mmap_mode='r')
+        else:
+            index.vectors = data['vectors']  # Indexes saved before vectors.npy existed
+        index._grow(len(jobs))
+        for row, job in enumerate(jobs):
+            job_id = str(job['id'])
+            index.ids.append(job_id)
+            index.jobs.append(job)
+            index._set_attributes(row, job)
+        index._size = len(jobs)
+        index.deleted[:len(jobs)] = data['deleted']
+        for row, job_id in enumerate(index.ids):
+            if not index.deleted[row]:
+                index.id_to_row[job_id] = row
+        list_rows, list_ids = data['list_rows'], data['list_ids']
+        index.list_rows = [list_rows[list_ids == i] for i in range(len(index.centroids))]
+        return index
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query the job catalog index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Embed a JSONL/CSV catalog and write an index directory")
+    build.add_argument('catalog')
+    build.add_argument('output')
+    build.add_argument('--lists', type=int, help="Number of inverted lists (default: sqrt of postings)")
+    build.add_argument('--batch-size', type=int, default=256)
+    build.add_argument('--store', help="Embedding store directory; unchanged postings are not re-embedded")
+    query = subparsers.add_parser('query', help="Search an index directory with free text")
+    query.add_argument('index')
+    query.add_argument('text')
+    query.add_argument('-k', type=int, default=10)
+    query.add_argument('--location')
+    query.add_argument('--salary', nargs=2, type=float, metavar=('MIN', 'MAX'))
+    args = parser.parse_args(argv)
+
+    from sentence_transformers import SentenceTransformer
+    encoder = SentenceTransformer('all-MiniLM-L6-v2')
+
+    if args.command == 'build':
+        store = None
+        if args.store:
+            from embedding_store import EmbeddingStore
+            store = EmbeddingStore(args.store, dim=encoder.get_sentence_embedding_dimension())
+        index = JobIndex.from_catalog(args.catalog, encoder, batch_size=args.batch_size,
+                                      n_lists=args.lists, store=store)
+        index.save(args.output)
+        print(json.dumps({'jobs': len(index), 'lists': len(index.centroids)}))
+    else:
+        index = JobIndex.load(args.index)
+        vector = encoder.encode([args.text], convert_to_numpy=True, normalize_embeddings=True)[0]
+        results = index.search(vector, k=args.k, location=args.location,
+                               salary_band=tuple(args.salary) if args.salary else None)
+        for result in results:
+            print(json.dumps({'id': result['id'], 'score': result['score'], 'title': result['job'].get('title')}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Phrase embeddings kept per matcher; covers a skill taxonomy several times over
+DEFAULT_PHRASE_CACHE_SIZE = 4096
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text embedded for a job: title, description and required skills."""
+    parts = [job.get('title', ''), job.get('description', '')]
+    if job.get('required_skills'):
+        parts.append('Skills: ' + ', '.join(job['required_skills']))
+    return '. '.join(part for part in parts if part)
+
+
+class JobMatcher:
+    """Scores a candidate profile against every job with one matrix-vector product.
+
+    Job embeddings are computed once and kept as an L2-normalized float32 matrix. A
+    profile is a weighted list of phrases (skills, experience); its embedding is the
+    normalized weighted sum of phrase embeddings, so each job's cosine score splits
+    exactly into per-phrase contributions.
+    """
+
+    def __init__(self, encoder: Any, jobs: Sequence[Dict[str, Any]], batch_size: int = 64,
+                 store: Optional[Any] = None, phrase_cache_size: int = DEFAULT_PHRASE_CACHE_SIZE):
+        self.encoder = encoder
+        self.jobs = list(jobs)
+        self.batch_size = batch_size
+        # Optional EmbeddingStore: embeddings already on disk are read, not recomputed
+        self.store = store
+        # Phrase embeddings are reused across resumes. Skill phrases repeat, but profiles
+        # also carry per-resume experience text, so least recently used ones are evicted
+        self.phrase_cache_size = phrase_cache_size
+        self._phrase_cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._phrase_lock = threading.Lock()
+        self.job_matrix = self._encode([job_text(job) for job in self.jobs])
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.store is not None:
+            return self.store.embed(texts, self.encoder, batch_size=self.batch_size)
+        embeddings = self.encoder.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def encode_phrases(self, phrases: List[str]) -> np.ndarray:
+        """Embed phrases, encoding only those not in the cache in a single batch."""
+        vectors: Dict[str, np.ndarray] = {}
+        with self._phrase_lock:
+            for phrase in phrases:
+                if phrase in self._phrase_cache:
+                    self._phrase_cache.move_to_end(phrase)
+                    vectors[phrase] = self._phrase_cache[phrase]
+        missing = list(dict.fromkeys(phrase for phrase in phrases if phrase not in vectors))
+        if missing:
+            vectors.update(zip(missing, self._encode(missing)))
+            with self._phrase_lock:
+                for phrase in missing:
+                    self._phrase_cache[phrase] = vectors[phrase]
+                while len(self._phrase_cache) > self.phrase_cache_size:
+                    self._phrase_cache.popitem(last=False)
+        return np.stack([vectors[phrase] for phrase in phrases])
+
+    def profile_embedding(self, profile: List[Tuple[str, float]]):
+        """Embed a weighted profile.
+
+        Returns (phrases, weights, phrase_matrix, norm, vector) where vector is the
+        normalized weighted sum of phrase embeddings, or None for an empty profile.
+        """
+        profile = [(phrase, weight) for phrase, weight in profile if phrase and weight > 0]
+        if not profile:
+            return None
+        phrases = [phrase for phrase, _ in profile]
+        weights = np.array([weight for _, weight in profile], dtype=np.float32)
+        phrase_matrix = self.encode_phrases(phrases)
+        combined = weights @ phrase_matrix
+        norm = float(np.linalg.norm(combined))
+        if norm == 0.0:
+            return None
+        return phrases, weights, phrase_matrix, norm, combined / norm
+
+    def _contributions(self, embedded, job_vector: np.ndarray) -> List[Tuple[str, float]]:
+        phrases, weights, phrase_matrix, norm, _ = embedded
+        contributions = weights * (phrase_matrix @ job_vector) / norm
+        return [(phrases[i], float(contributions[i])) for i in np.argsort(-contributions)]
+
+    def match(self, profile: List[Tuple[str, float]], top_k: int = 3,
+              min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Return the top_k jobs for a weighted profile, with per-phrase contributions.
+
+        Each result holds the job, its cosine 'score' and 'contributions', a list of
+        (phrase, contribution) pairs sorted from strongest to weakest that sum to the score.
+        """
+        embedded = self.profile_embedding(profile)
+        if embedded is None or not self.jobs:
+            return []
+        scores = self.job_matrix @ embedded[4]
+
+        k = min(top_k, len(self.jobs))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {
+                'job': self.jobs[index],
+                'score': float(scores[index]),
+                'contributions': self._contributions(embedded, self.job_matrix[index])
+            }
+            for index in top
+            if scores[index] >= min_score
+        ]
+
+    def match_index(self, index: Any, profile: List[Tuple[str, float]], top_k: int = 3,
+                    min_score: float = 0.0, **filters: Any) -> List[Dict[str, Any]]:
+        """Like match, but searches a JobIndex catalog (with optional filters) instead."""
+        embedded = self.profile_embedding(profile)
+        if embedded is None:
+            return []
+        return [
+            {
+                'job': hit['job'],
+                'score': hit['score'],
+                'contributions': self._contributions(embedded, index.vectors[hit['row']])
+            }
+            for hit in index.search(embedded[4], k=top_k, **filters)
+            if hit['score'] >= min_score
+        ]
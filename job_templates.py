@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+# Job templates with detailed requirements; kept free of model imports so analytics can use them
+JOB_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    'software_engineer': {
+        'title': 'Software Engineer',
+        'description': 'Develop and maintain software applications using modern technologies.',
+        'required_skills': ['programming', 'frameworks', 'databases'],
+        'salary_range': '₹6-15 LPA',
+        'growth_path': 'Senior Software Engineer → Technical Lead → Engineering Manager'
+    },
+    'data_scientist': {
+        'title': 'Data Scientist',
+        'description': 'Analyze complex data sets and develop machine learning models.',
+        'required_skills': ['python', 'machine learning', 'data analysis'],
+        'salary_range': '₹8-20 LPA',
+        'growth_path': 'Senior Data Scientist → Data Science Lead → Chief Data Scientist'
+    },
+    'devops_engineer': {
+        'title': 'DevOps Engineer',
+        'description': 'Manage and optimize cloud infrastructure and deployment pipelines.',
+        'required_skills': ['cloud', 'tools', 'programming'],
+        'salary_range': '₹7-18 LPA',
+        'growth_path': 'Senior DevOps Engineer → DevOps Lead → Cloud Architect'
+    },
+    'full_stack_developer': {
+        'title': 'Full Stack Developer',
+        'description': 'Develop end-to-end web applications using modern frameworks.',
+        'required_skills': ['programming', 'frameworks', 'web'],
+        'salary_range': '₹5-12 LPA',
+        'growth_path': 'Senior Full Stack Developer → Technical Lead → Solution Architect'
+    },
+    'mobile_developer': {
+        'title': 'Mobile Developer',
+        'description': 'Develop mobile applications for iOS and Android platforms.',
+        'required_skills': ['mobile', 'programming', 'frameworks'],
+        'salary_range': '₹6-15 LPA',
+        'growth_path': 'Senior Mobile Developer → Mobile Lead → Mobile Architect'
+    }
+}
@@ -0,0 +1,143 @@
+import gc
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def model_memory_bytes(obj: Any) -> int:
+    """Estimate resident memory of a model's parameters and buffers in bytes.
+
+    Accepts a torch module directly, any wrapper (e.g. a transformers pipeline)
+    exposing one as ``.model``, or a tuple/list of those such as a
+    (tokenizer, model) pair. Returns 0 when nothing measurable is found.
+    """
+    if isinstance(obj, (tuple, list)):
+        return sum(model_memory_bytes(item) for item in obj)
+    module = obj if hasattr(obj, 'parameters') else getattr(obj, 'model', None)
+    if module is None or not hasattr(module, 'parameters'):
+        return 0
+    total = 0
+    for tensor in list(module.parameters()) + list(getattr(module, 'buffers', lambda: [])()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """Builds models on first use, shares them between callers and unloads idle ones."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.RLock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._reaper: Optional[threading.Thread] = None
+        self._stop_reaper = threading.Event()
+
+    def register(self, name: str, factory: Callable[[], Any], replace: bool = False) -> None:
+        """Register a factory for a model. Existing registrations are kept unless replace is set."""
+        with self._lock:
+            if name in self._factories and not replace:
+                return
+            self._factories[name] = factory
+            self._build_locks.setdefault(name, threading.Lock())
+            if replace:
+                self._models.pop(name, None)
+                self._stats.pop(name, None)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._factories
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """Return the model for name, building it on first use."""
+        model = self._models.get(name)
+        if model is None:
+            if name not in self._factories:
+                raise KeyError(f"No model registered under '{name}'")
+            # Per-model lock so concurrent callers build each model only once
+            with self._build_locks[name]:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._build(name)
+        stats = self._stats.get(name)
+        if stats is not None:
+            stats['last_used'] = time.time()
+        return model
+
+    def _build(self, name: str) -> Any:
+        logger.info(f"Loading model '{name}'")
+        start = time.time()
+        try:
+            model = self._factories[name]()
+        except Exception as e:
+            logger.error(f"Error loading model '{name}': {str(e)}")
+            raise
+        now = time.time()
+        with self._lock:
+            self._models[name] = model
+            self._stats[name] = {
+                'loaded_at': now,
+                'last_used': now,
+                'load_seconds': now - start,
+                'memory_bytes': model_memory_bytes(model)
+            }
+        logger.info(f"Loaded model '{name}' in {now - start:.1f}s")
+        return model
+
+    def preload(self, names: Iterable[str]) -> None:
+        """Build the given models up front, e.g. for the stages a worker will serve."""
+        for name in names:
+            self.get(name)
+
+    def unload(self, name: str) -> bool:
+        """Drop a resident model. Returns True if it was loaded."""
+        with self._lock:
+            model = self._models.pop(name, None)
+            self._stats.pop(name, None)
+        if model is None:
+            return False
+        del model
+        gc.collect()
+        logger.info(f"Unloaded model '{name}'")
+        return True
+
+    def unload_idle(self, max_idle_seconds: float) -> List[str]:
+        """Unload every model that has not been used for max_idle_seconds."""
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            idle = [name for name, stats in self._stats.items() if stats['last_used'] < cutoff]
+        return [name for name in idle if self.unload(name)]
+
+    def start_reaper(self, idle_timeout: float, interval: Optional[float] = None) -> None:
+        """Periodically unload models idle for longer than idle_timeout, in a daemon thread."""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        interval = interval or max(1.0, idle_timeout / 4)
+        self._stop_reaper.clear()
+
+        def reap():
+            while not self._stop_reaper.wait(interval):
+                self.unload_idle(idle_timeout)
+
+        self._reaper = threading.Thread(target=reap, name='model-reaper', daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self) -> None:
+        self._stop_reaper.set()
+
+    def resident(self) -> Dict[str, Dict[str, float]]:
+        """Report resident models with load time, last use and estimated memory."""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# Process-wide registry shared by all analyzers
+registry = ModelRegistry()
@@ -0,0 +1,362 @@
+import json
+import os
+import sys
+import time
+import logging
+import argparse
+import socket
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, IO, List, Optional
+
+import extract_text
+from inference_scheduler import QueueFullError
+from resume_pipeline import analyze_file
+from tracing import enable_metrics, memory_breakdown, metrics
+
+# Configure logging (stderr only: stdout carries the response frames)
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+
+def _load_resume_analyzer():
+    from ai_resume_analyzer import AIResumeAnalyzer
+    return AIResumeAnalyzer()
+
+
+def _load_job_recommender():
+    from ai_job_recommender import JobRecommender
+    return JobRecommender()
+
+
+# Service name -> factory building the resident model holder
+SERVICES: Dict[str, Callable[[], Any]] = {
+    'resume': _load_resume_analyzer,
+    'jobs': _load_job_recommender,
+}
+
+
+class ModelWorker:
+    """Resident worker that loads a service's models once and answers many requests.
+
+    Requests and responses are JSON objects framed one per line. A request looks like
+    ``{"id": 1, "op": "analyze", "text": "..."}`` and is answered with
+    ``{"id": 1, "ok": true, "result": {...}}``. Supported ops are ``analyze``,
+    ``analyze_file``, ``health``, ``metrics`` and ``shutdown``. ``analyze_file`` takes a
+    ``path`` to a PDF/DOCX and extracts it in the worker, so the text never crosses
+    the pipe; ``"include_text": true`` returns it in the result's ``text``. An analyze
+    request with ``"trace": true`` gets the per-stage timings back in the result's
+    ``_trace`` field.
+
+    Stage metrics (per-stage latency histograms, CPU time and token counters) are
+    collected unless STAGE_METRICS=0; the ``metrics`` op returns them as JSON, or as
+    Prometheus text with ``"format": "prometheus"``.
+
+    With batching enabled (INFERENCE_BATCHING=1) the backend's forward passes go through
+    a micro-batching scheduler, so up to ``concurrency`` requests are handled at once
+    and answered as they finish, possibly out of order.
+    """
+
+    def __init__(self, service: str, stages: Optional[List[str]] = None,
+                 batching: Optional[bool] = None, concurrency: Optional[int] = None,
+                 backend: Any = None):
+        if service not in SERVICES:
+            raise ValueError(f"Unknown service '{service}'. Expected one of: {', '.join(SERVICES)}")
+        self.service = service
+        self.started_at = time.time()
+        self.requests_served = 0
+        self.errors = 0
+        self.ready = False
+        self.running = True
+        # Pipelines are not safe to call concurrently; serialize model access
+        self._lock = threading.Lock()
+        # Concurrent handlers (with batching) update the counters from several threads
+        self._counter_lock = threading.Lock()
+        self.concurrency = 1
+
+        enable_metrics(os.getenv('STAGE_METRICS', '1') != '0')
+        # analyze_file extracts in this process: with torch and scheduler threads live, don't
+        # fork a page-extraction pool per large PDF (as bulk_ingest.py workers also avoid)
+        extract_text.PDF_WORKERS = 1
+        load_start = time.time()
+        # A fork server passes the backend it loaded before forking this worker
+        self.backend = backend if backend is not None else SERVICES[service]()
+        if batching is None:
+            batching = os.getenv('INFERENCE_BATCHING', '0') == '1'
+        if batching and hasattr(self.backend, 'enable_batching'):
+            # The scheduler serializes each model's forward passes itself
+            self.backend.enable_batching()
+            self._lock = nullcontext()
+            self.concurrency = concurrency or int(os.getenv('WORKER_CONCURRENCY', '8'))
+        # Lazily-loading backends preload only the models the served stages need
+        if hasattr(self.backend, 'warm_up'):
+            self.backend.warm_up(stages)
+        self.load_seconds = time.time() - load_start
+        self.ready = True
+        logger.info(f"{service} worker ready in {self.load_seconds:.1f}s (pid {os.getpid()})")
+
+    def health(self) -> Dict[str, Any]:
+        """Report readiness and basic counters for pool supervisors."""
+        health = {
+            'status': 'ok' if self.ready else 'loading',
+            'service': self.service,
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started_at,
+            'load_seconds': self.load_seconds,
+            'requests_served': self.requests_served,
+            'errors': self.errors
+        }
+        if hasattr(self.backend, 'resident_models'):
+            health['models'] = self.backend.resident_models()
+        if hasattr(self.backend, 'cache_stats'):
+            health['cache'] = self.backend.cache_stats()
+        memory = memory_breakdown()
+        if memory:
+            health['memory'] = memory
+        if getattr(self.backend, 'scheduler', None) is not None:
+            health['concurrency'] = self.concurrency
+            health['batching'] = self.backend.scheduler.metrics()
+        return health
+
+    def analyze(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the service's resume analysis on the request text."""
+        text = request.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Request must include non-empty 'text'")
+        trace = bool(request.get('trace'))
+        with self._lock:
+            if request.get('bypass_cache') and getattr(self.backend, 'cache', None):
+                return self.backend.analyze_resume(text, use_cache=False, trace=trace)
+            return self.backend.analyze_resume(text, trace=trace)
+
+    def analyze_file(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the file at the request's path and analyze it in this process."""
+        file_path = request.get('path')
+        if not isinstance(file_path, str) or not file_path:
+            raise ValueError("Request must include a file 'path'")
+        with self._lock:
+            return analyze_file(self.backend, file_path, use_cache=not request.get('bypass_cache'),
+                                include_text=bool(request.get('include_text')),
+                                trace=bool(request.get('trace')))
+
+    def metrics(self, format: str = 'json') -> Dict[str, Any]:
+        """Stage metrics as JSON, or as Prometheus text under 'text'."""
+        if format == 'prometheus':
+            return {'text': metrics.prometheus()}
+        return {'enabled': metrics.enabled, 'stages': metrics.snapshot()}
+
+    def _count(self, counter: str) -> None:
+        """Increment a health counter."""
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a single decoded request and build its response frame."""
+        request_id = request.get('id')
+        op = request.get('op', 'analyze')
+        try:
+            if op == 'analyze':
+                result = self.analyze(request)
+            elif op == 'analyze_file':
+                result = self.analyze_file(request)
+            elif op == 'health':
+                result = self.health()
+            elif op == 'metrics':
+                result = self.metrics(request.get('format', 'json'))
+            elif op == 'shutdown':
+                self.running = False
+                result = {'status': 'stopping'}
+            else:
+                raise ValueError(f"Unknown op '{op}'")
+            self._count('requests_served')
+            return {'id': request_id, 'ok': True, 'result': result}
+        except QueueFullError as e:
+            # Back-pressure: the caller should retry later or on another worker
+            self._count('errors')
+            logger.warning(f"Rejecting {op} request: {str(e)}")
+            return {'id': request_id, 'ok': False, 'error': str(e), 'retryable': True}
+        except Exception as e:
+            self._count('errors')
+            logger.error(f"Error handling {op} request: {str(e)}")
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+
+    def handle_line(self, line: str) -> Dict[str, Any]:
+        """Decode one framed request line and handle it."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request frame must be a JSON object")
+        except ValueError as e:
+            self._count('errors')
+            return {'id': None, 'ok': False, 'error': f"Invalid request frame: {str(e)}"}
+        return self.handle(request)
+
+    def serve_stream(self, reader: IO[str], writer: IO[str]) -> None:
+        """Answer framed requests from a text stream until EOF or shutdown."""
+        if self.concurrency > 1:
+            self._serve_stream_concurrently(reader, writer)
+            return
+        for line in reader:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            writer.write(json.dumps(response) + '\n')
+            writer.flush()
+            if not self.running:
+                break
+
+    def _serve_stream_concurrently(self, reader: IO[str], writer: IO[str]) -> None:
+        """Handle up to self.concurrency requests at once, writing each response when ready."""
+        write_lock = threading.Lock()
+        slots = threading.BoundedSemaphore(self.concurrency)
+
+        def respond(line: str) -> None:
+            try:
+                response = self.handle_line(line)
+                with write_lock:
+                    writer.write(json.dumps(response) + '\n')
+                    writer.flush()
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for line in reader:
+                if not line.strip():
+                    continue
+                slots.acquire()  # Stop reading while every slot is busy
+                if _is_shutdown(line):
+                    # Answer on the reader thread so the loop stops without blocking on more input
+                    respond(line)
+                    break
+                executor.submit(respond, line)
+
+
+def _is_shutdown(line: str) -> bool:
+    """Whether a framed request line asks the worker to shut down."""
+    if 'shutdown' not in line:
+        return False  # Skip decoding ordinary (possibly large) analyze requests twice
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(request, dict) and request.get('op') == 'shutdown'
+
+
+def _ready_frame(worker: ModelWorker) -> str:
+    return json.dumps({'event': 'ready', **worker.health()}) + '\n'
+
+
+def serve_stdio(worker: ModelWorker) -> None:
+    """Serve framed requests over stdin/stdout."""
+    sys.stdout.write(_ready_frame(worker))
+    sys.stdout.flush()
+    worker.serve_stream(sys.stdin, sys.stdout)
+
+
+def serve_socket(worker: ModelWorker, socket_path: str, listener: Optional[socket.socket] = None) -> None:
+    """Serve framed requests over a local Unix domain socket.
+
+    listener is an already bound and listening socket for socket_path, e.g. one a fork
+    server created before forking this worker.
+    """
+    if listener is None and os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            reader = (line.decode('utf-8') for line in self.rfile)
+            writer = _SocketWriter(self.wfile)
+            writer.write(_ready_frame(worker))
+            worker.serve_stream(reader, writer)
+            if not worker.running:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    with Server(socket_path, Handler, bind_and_activate=listener is None) as server:
+        if listener is not None:
+            server.socket.close()
+            server.socket = listener
+        logger.info(f"Listening on {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def serve_metrics_http(worker: ModelWorker, port: int) -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text) and /metrics.json on a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = worker.metrics('prometheus')['text'], 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = json.dumps(worker.metrics()), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes would otherwise log every few seconds
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"Serving metrics on http://127.0.0.1:{server.server_port}/metrics")
+    return server
+
+
+class _SocketWriter:
+    """Minimal text-writer adapter over a binary socket file."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, data: str) -> None:
+        self.wfile.write(data.encode('utf-8'))
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Resident model-serving worker")
+    parser.add_argument('--service', choices=sorted(SERVICES), default='resume',
+                        help="Which analyzer to keep resident")
+    parser.add_argument('--stages',
+                        help="Comma-separated analysis stages to preload models for (default: all)")
+    parser.add_argument('--socket', help="Serve on this Unix socket path instead of stdin/stdout")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Also expose stage metrics over HTTP on this localhost port")
+    args = parser.parse_args(argv)
+
+    try:
+        stages = args.stages.split(',') if args.stages else None
+        worker = ModelWorker(args.service, stages)
+    except Exception as e:
+        sys.stdout.write(json.dumps({'event': 'error', 'error': str(e)}) + '\n')
+        sys.stdout.flush()
+        return 1
+
+    if args.metrics_port:
+        serve_metrics_http(worker, args.metrics_port)
+    if args.socket:
+        serve_socket(worker, args.socket)
+    else:
+        serve_stdio(worker)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import os
+import re
+import time
+import logging
+from typing import Any, Callable, Optional
+
+import torch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 'none' keeps float32 weights; 'int8' applies dynamic int8 quantization to Linear layers
+QUANTIZATION_MODES = ('none', 'int8')
+
+DEFAULT_QUANTIZED_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'quantized')
+
+
+def quantization_mode(mode: Optional[str] = None) -> str:
+    """Resolve the quantization mode from an explicit setting or MODEL_QUANTIZATION."""
+    mode = (mode or os.getenv('MODEL_QUANTIZATION') or 'none').lower()
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}'; expected one of {', '.join(QUANTIZATION_MODES)}")
+    return mode
+
+
+def quantize_linear_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization of every nn.Linear: int8 weights, activations quantized per batch.
+
+    Only meaningful on CPU; the model must be float32.
+    """
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _library_versions() -> str:
+    """torch and transformers versions; either one changing can change module layout."""
+    try:
+        import transformers
+        transformers_version = transformers.__version__
+    except ImportError:
+        transformers_version = 'none'
+    return f"torch-{torch.__version__.split('+')[0]}.transformers-{transformers_version}"
+
+
+def quantized_cache_path(checkpoint: str, cache_dir: Optional[str] = None) -> str:
+    """File holding the quantized weights of a checkpoint, tied to the library versions that made them."""
+    cache_dir = cache_dir or os.getenv('QUANTIZED_MODEL_CACHE') or DEFAULT_QUANTIZED_CACHE_DIR
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '--', checkpoint)
+    return os.path.join(cache_dir, f"{slug}.int8.{_library_versions()}.state.pt")
+
+
+def load_quantized(checkpoint: str, load_float: Callable[[], Any], cache_dir: Optional[str] = None,
+                   build_float: Optional[Callable[[], Any]] = None) -> Any:
+    """Return the int8 quantized model for checkpoint, reusing the on-disk weights when present.
+
+    load_float builds the pretrained float32 model on a cache miss, and the quantized
+    state_dict is saved. On a hit, build_float (default load_float) builds the float32
+    architecture, which is quantized on the spot and given the cached weights; passing a
+    builder that skips the pretrained weights (e.g. from_config) avoids reading them.
+    The cache holds tensors only and is read with weights_only=True, so a cache
+    directory pointed elsewhere can't run code.
+    """
+    path = quantized_cache_path(checkpoint, cache_dir)
+    if os.path.exists(path):
+        try:
+            start = time.time()
+            state_dict = torch.load(path, map_location='cpu', weights_only=True)
+            model = quantize_linear_int8((build_float or load_float)())
+            model.load_state_dict(state_dict)
+            model.eval()
+            logger.info(f"Loaded quantized {checkpoint} from {path} in {time.time() - start:.1f}s")
+            return model
+        except Exception as e:
+            logger.warning(f"Discarding unreadable quantized cache {path}: {str(e)}")
+
+    start = time.time()
+    model = quantize_linear_int8(load_float())
+    logger.info(f"Quantized {checkpoint} to int8 in {time.time() - start:.1f}s")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        torch.save(model.state_dict(), path + '.tmp')
+        os.replace(path + '.tmp', path)
+    except Exception as e:
+        logger.warning(f"Could not cache quantized {checkpoint}: {str(e)}")
+    return model
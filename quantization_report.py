@@ -0,0 +1,246 @@
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from model_registry import ModelRegistry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fixed corpus used when no --corpus is given, so reports from different runs are comparable
+SAMPLE_RESUMES = [
+    """Priya Sharma
+Bangalore, India
+
+Summary
+Data scientist with 4 years of experience building machine learning models in Python.
+
+Experience
+Senior Data Scientist, Flipkart Internet Ltd. 2021-present
+Developed demand forecasting models with TensorFlow and scikit-learn, reduced stockouts by 18%.
+Data Analyst, Infosys Ltd. 2019-2021
+Built Tableau dashboards and SQL pipelines on AWS.
+
+Education
+Master of Technology in Computer Science, Indian Institute of Technology Madras, 2019
+
+Skills
+Expert in Python and SQL, advanced in machine learning, pandas, numpy, Docker""",
+    """Rahul Verma
+Pune
+
+Experience
+Full Stack Developer, Persistent Systems Ltd. 2020-present
+Led a team of 4 building React and Node.js applications with MongoDB and PostgreSQL.
+Improved page load time by 40% and managed CI/CD pipelines with Jenkins and Kubernetes.
+
+Education
+Bachelor of Engineering in Information Technology, Pune Institute of Computer Technology, 2020
+
+Skills
+JavaScript, TypeScript, React, Angular, Express, HTML, CSS, Git, communication, teamwork""",
+    """Ananya Iyer
+Chennai, Tamil Nadu
+
+Objective
+Mobile developer seeking to build delightful Android and iOS apps.
+
+Work Experience
+Mobile Engineer, Zoho Corp. 2018-2023
+Developed Kotlin and Swift applications used by 2 million users; intermediate Flutter.
+
+Education
+B.Tech in Electronics, Anna University College of Engineering, 2018
+
+Certifications
+AWS Certified Cloud Practitioner""",
+    """Mohammed Khan
+Hyderabad
+
+Professional Experience
+DevOps Engineer, Tech Mahindra Ltd. 2017-present
+Managed Azure and GCP infrastructure with Terraform, Ansible and Docker; optimized costs by 25%.
+Proficient in Linux, Bash scripting, Python and Go.
+
+Education
+Bachelor of Science in Computer Science, Osmania University College of Science, 2016
+
+Skills
+leadership, problem solving, Kubernetes, Prometheus, Grafana"""
+]
+
+
+def load_corpus(source: Optional[str]) -> List[str]:
+    """Resume texts from a directory/glob/JSONL manifest of PDF/DOCX files, or the sample corpus."""
+    if not source:
+        return list(SAMPLE_RESUMES)
+    from bulk_ingest import iter_inputs
+    from extract_text import extract_text
+
+    texts = []
+    for job in iter_inputs(source):
+        extracted = extract_text(job['path'])
+        if extracted['success'] and extracted['text'].strip():
+            texts.append(extracted['text'])
+        else:
+            logger.warning(f"Skipping {job['path']}: {extracted.get('error', 'no text')}")
+    return texts
+
+
+def _timed(fn: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _set_f1(reference: Set, candidate: Set) -> float:
+    if not reference and not candidate:
+        return 1.0
+    overlap = len(reference & candidate)
+    if overlap == 0:
+        return 0.0
+    precision = overlap / len(candidate)
+    recall = overlap / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _latency(times: List[float]) -> Dict[str, float]:
+    return {'p50_ms': float(np.median(times) * 1000), 'total_s': float(sum(times))}
+
+
+def compare_analyzers(texts: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Run the float32 and int8 analyzers over texts and compare each model's outputs."""
+    from ai_resume_analyzer import AIResumeAnalyzer
+
+    # Separate registries so both variants stay resident side by side
+    analyzers = {
+        mode: AIResumeAnalyzer(registry=ModelRegistry(), cache=False, quantization=mode)
+        for mode in ('none', 'int8')
+    }
+    stages = {
+        'ner': lambda analyzer, text: analyzer.extract_entity_spans(text),
+        'zero_shot': lambda analyzer, text: analyzer.extract_skills(text),
+        'sentence_transformer': lambda analyzer, text: np.asarray(
+            analyzer.sentence_transformer.encode([text], convert_to_numpy=True, normalize_embeddings=True)[0]
+        )
+    }
+
+    report = {}
+    for stage, run in stages.items():
+        outputs = {}
+        times = {}
+        for mode, analyzer in analyzers.items():
+            run(analyzer, texts[0])  # Load and warm the model outside the timed loop
+            results = [_timed(lambda text=text: run(analyzer, text)) for text in texts]
+            outputs[mode] = [result for result, _ in results]
+            times[mode] = [seconds for _, seconds in results]
+
+        entry = {
+            'float32': _latency(times['none']),
+            'int8': _latency(times['int8']),
+            'speedup': sum(times['none']) / max(sum(times['int8']), 1e-9),
+            'float32_bytes': analyzers['none'].resident_models().get(stage, {}).get('memory_bytes'),
+            'int8_bytes': analyzers['int8'].resident_models().get(f"{stage}:int8", {}).get('memory_bytes')
+        }
+        if stage == 'ner':
+            entry['entity_f1'] = float(np.mean([
+                _set_f1({(e['type'], e['text']) for e in reference}, {(e['type'], e['text']) for e in candidate})
+                for reference, candidate in zip(outputs['none'], outputs['int8'])
+            ]))
+        elif stage == 'zero_shot':
+            f1s, deltas = [], []
+            for reference, candidate in zip(outputs['none'], outputs['int8']):
+                f1s.append(_set_f1({s['name'] for s in reference}, {s['name'] for s in candidate}))
+                candidate_confidence = {s['name']: s['confidence'] for s in candidate}
+                deltas.extend(
+                    abs(s['confidence'] - candidate_confidence[s['name']])
+                    for s in reference if s['name'] in candidate_confidence
+                )
+            entry['verified_skill_f1'] = float(np.mean(f1s))
+            entry['mean_abs_confidence_delta'] = float(np.mean(deltas)) if deltas else 0.0
+        else:
+            cosines = [float(a @ b) for a, b in zip(outputs['none'], outputs['int8'])]
+            entry['mean_cosine'] = float(np.mean(cosines))
+            entry['min_cosine'] = float(np.min(cosines))
+        report[stage] = entry
+    return report
+
+
+def compare_causal_lm(texts: List[str], checkpoint: str, max_tokens: int = 256) -> Dict[str, Any]:
+    """Teacher-forced next-token agreement between float32 and int8 copies of a causal LM."""
+    import torch
+    from ai_job_recommender import JobRecommender
+
+    recommenders = {
+        mode: JobRecommender(role_models={role: checkpoint for role in ('skills', 'experience', 'recommendations')},
+                             registry=ModelRegistry(), quantization=mode)
+        for mode in ('none', 'int8')
+    }
+    tokenizer = recommenders['none'].tokenizers['skills']
+    agreements, times = [], {'none': [], 'int8': []}
+    for text in texts:
+        inputs = tokenizer(text, return_tensors="pt", max_length=max_tokens, truncation=True)
+        predictions = {}
+        for mode, recommender in recommenders.items():
+            model = recommender.models_loaded['skills']
+            with torch.inference_mode():
+                logits, seconds = _timed(lambda: model(input_ids=inputs.input_ids.to(model.device)).logits)
+            predictions[mode] = logits[0].argmax(-1).cpu()
+            times[mode].append(seconds)
+        agreements.append(float((predictions['none'] == predictions['int8']).float().mean()))
+    return {
+        'checkpoint': checkpoint,
+        'float32': _latency(times['none']),
+        'int8': _latency(times['int8']),
+        'speedup': sum(times['none']) / max(sum(times['int8']), 1e-9),
+        'next_token_agreement': float(np.mean(agreements))
+    }
+
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    """Markdown table summarising latency and accuracy per model."""
+    lines = [
+        "| model | float32 p50 ms | int8 p50 ms | speedup | accuracy vs float32 |",
+        "|---|---|---|---|---|"
+    ]
+    accuracy_keys = ('entity_f1', 'verified_skill_f1', 'mean_abs_confidence_delta', 'mean_cosine',
+                     'min_cosine', 'next_token_agreement')
+    for model, entry in report.items():
+        accuracy = ', '.join(f"{key}={entry[key]:.4f}" for key in accuracy_keys if key in entry)
+        lines.append(
+            f"| {model} | {entry['float32']['p50_ms']:.1f} | {entry['int8']['p50_ms']:.1f} "
+            f"| {entry['speedup']:.2f}x | {accuracy} |"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare int8 quantized models against float32")
+    parser.add_argument('--corpus', help="Directory, glob or JSONL manifest of resumes (default: built-in samples)")
+    parser.add_argument('--causal-lm', nargs='?', const="microsoft/phi-2",
+                        help="Also compare a causal LM checkpoint (default microsoft/phi-2)")
+    parser.add_argument('-o', '--output', help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    texts = load_corpus(args.corpus)
+    if not texts:
+        parser.error("corpus contains no readable resumes")
+    report = compare_analyzers(texts)
+    if args.causal_lm:
+        report['causal_lm'] = compare_causal_lm(texts, args.causal_lm)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'documents': len(texts), 'models': report}, file, indent=2)
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
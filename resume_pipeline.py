@@ -0,0 +1,101 @@
+import sys
+import json
+import logging
+import argparse
+from typing import Any, Dict, IO, Optional
+
+import extract_text
+from tracing import span, start_trace
+
+# Configure logging (stderr only: stdout carries the results)
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+
+def analyze_file(backend: Any, file_path: str, use_cache: bool = True, include_text: bool = False,
+                 trace: bool = False) -> Dict[str, Any]:
+    """Extract a PDF/DOCX resume and analyze it in-process.
+
+    backend is an AIResumeAnalyzer or JobRecommender. The extracted text stays inside
+    this process; it is only added to the result (as 'text') when include_text is set.
+    Raises ValueError when the file can't be extracted or holds no text.
+    """
+    if trace:
+        with start_trace() as recorded:
+            result = analyze_file(backend, file_path, use_cache, include_text)
+        return {**result, '_trace': recorded.export()}
+
+    with span('pipeline.analyze_file'):
+        extracted = extract_text.extract_text(file_path)
+        if not extracted['success']:
+            raise ValueError(f"Could not extract text: {extracted['error']}")
+        text = extracted['text']
+        if not text.strip():
+            raise ValueError("No text found in the document")
+        # Only the resume analyzer has a cache to bypass
+        if not use_cache and getattr(backend, 'cache', None):
+            result = backend.analyze_resume(text, use_cache=False)
+        else:
+            result = backend.analyze_resume(text)
+    if include_text:
+        result = {**result, 'text': text}
+    return result
+
+
+def serve_paths(backend: Any, reader: IO[str], writer: IO[str], include_text: bool = False,
+                trace: bool = False) -> None:
+    """Answer one file path per input line with one JSON result line, in order."""
+    for line in reader:
+        file_path = line.strip()
+        if not file_path:
+            continue
+        try:
+            response = {'path': file_path, 'ok': True,
+                        'result': analyze_file(backend, file_path, include_text=include_text, trace=trace)}
+        except Exception as e:
+            logger.error(f"Error analyzing {file_path}: {str(e)}")
+            response = {'path': file_path, 'ok': False, 'error': str(e)}
+        writer.write(json.dumps(response) + '\n')
+        writer.flush()
+
+
+def _load_backend(service: str) -> Any:
+    if service == 'jobs':
+        from ai_job_recommender import JobRecommender
+        return JobRecommender()
+    from ai_resume_analyzer import AIResumeAnalyzer
+    return AIResumeAnalyzer()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract and analyze resume files in one process")
+    parser.add_argument('paths', nargs='*', help="PDF/DOCX files to analyze")
+    parser.add_argument('--stdin', action='store_true',
+                        help="Read newline-framed file paths from stdin and write one JSON line per file")
+    parser.add_argument('--service', choices=('resume', 'jobs'), default='resume')
+    parser.add_argument('--include-text', action='store_true', help="Include the extracted text in results")
+    parser.add_argument('--trace', action='store_true', help="Include per-stage timings in '_trace'")
+    args = parser.parse_args(argv)
+    if not args.paths and not args.stdin:
+        parser.error("give file paths or --stdin")
+
+    # Models are loaded in this process; keep PDF extraction in it too rather than forking a pool
+    extract_text.PDF_WORKERS = 1
+    backend = _load_backend(args.service)
+    if args.stdin:
+        serve_paths(backend, sys.stdin, sys.stdout, args.include_text, args.trace)
+        return 0
+
+    status = 0
+    for file_path in args.paths:
+        try:
+            result = analyze_file(backend, file_path, include_text=args.include_text, trace=args.trace)
+        except Exception as e:
+            result = {'error': str(e)}
+            status = 1
+        print(json.dumps(result))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
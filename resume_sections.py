@@ -0,0 +1,117 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set
+
+from skill_matcher import KeywordMatcher
+
+# Keywords marking a section as education or experience related
+EDU_KEYWORDS = ['education', 'degree', 'bachelor', 'master', 'phd', 'diploma', 'certification']
+EXP_KEYWORDS = ['experience', 'work', 'employment', 'job', 'position']
+
+# Document-level keywords used by the improvement rules
+SECTION_HEADER_KEYWORDS = ['experience', 'skills', 'education']
+ACTION_VERBS = ['achieved', 'developed', 'led', 'managed', 'improved', 'increased', 'reduced', 'optimized']
+
+# Precompiled patterns shared by the extractors and improvement rules
+DEGREE_RE = re.compile(r'(Bachelor|Master|PhD|B\.?Tech|M\.?Tech|B\.?E|M\.?E|B\.?S|M\.?S)[^,]*')
+INSTITUTION_RE = re.compile(r'([A-Z][a-zA-Z\s&]+(?:University|College|Institute|School))')
+COMPANY_RE = re.compile(r'([A-Z][a-zA-Z\s&]+(?:Inc\.|Corp\.|LLC|Ltd\.|Company))')
+POSITION_RE = re.compile(r'(Senior|Junior|Lead|Manager|Director|Engineer|Developer|Designer|Architect|Consultant|Analyst|Scientist)[^,]*')
+DATE_RANGE_RE = re.compile(r'\d{4}[-–]\d{4}|\d{4}[-–]present')
+
+# Substring matchers (no word boundaries) mirroring the original `keyword in text` checks
+_SECTION_KEYWORD_MATCHER = KeywordMatcher(EDU_KEYWORDS + EXP_KEYWORDS, whole_words=False)
+_DOCUMENT_KEYWORD_MATCHER = KeywordMatcher(SECTION_HEADER_KEYWORDS + ACTION_VERBS, whole_words=False)
+
+
+class Section:
+    """One blank-line separated block of a resume with cached views and regex matches."""
+
+    def __init__(self, index: int, start: int, end: int, text: str, lower: str):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+        self.lower = lower
+        self.keywords: Set[str] = set()
+        self._matches: Dict[str, Optional[re.Match]] = {}
+
+    @property
+    def is_education(self) -> bool:
+        return any(keyword in self.keywords for keyword in EDU_KEYWORDS)
+
+    @property
+    def is_experience(self) -> bool:
+        return any(keyword in self.keywords for keyword in EXP_KEYWORDS)
+
+    def search(self, name: str, pattern: re.Pattern) -> Optional[re.Match]:
+        """Search the section once per pattern name and cache the match."""
+        if name not in self._matches:
+            self._matches[name] = pattern.search(self.text)
+        return self._matches[name]
+
+    @property
+    def degree(self) -> Optional[re.Match]:
+        return self.search('degree', DEGREE_RE)
+
+    @property
+    def institution(self) -> Optional[re.Match]:
+        return self.search('institution', INSTITUTION_RE)
+
+    @property
+    def company(self) -> Optional[re.Match]:
+        return self.search('company', COMPANY_RE)
+
+    @property
+    def position(self) -> Optional[re.Match]:
+        return self.search('position', POSITION_RE)
+
+
+class ResumeIndex:
+    """Per-document index of sections, a cached lower-cased view and document-level facts.
+
+    Built once per resume and shared by every extractor and improvement rule, so the
+    text is split, lower-cased and keyword-scanned a single time.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        # Lower-casing a few characters (e.g. 'İ') changes the length; offsets then differ
+        self._offsets_aligned = len(self.lower) == len(text)
+        self.sections = self._segment()
+        self._section_starts = [section.start for section in self.sections]
+
+        if self._offsets_aligned:
+            # One pass over the text assigns section keywords to the block they occur in
+            for start, _, keyword in _SECTION_KEYWORD_MATCHER.finditer(self.lower):
+                self.section_at(start).keywords.add(keyword)
+        else:
+            for section in self.sections:
+                section.keywords.update(keyword for _, _, keyword in _SECTION_KEYWORD_MATCHER.finditer(section.lower))
+
+        # Document-level facts for the improvement rules
+        self.keywords = {keyword for _, _, keyword in _DOCUMENT_KEYWORD_MATCHER.finditer(self.lower)}
+        self.has_section_headers = any(keyword in self.keywords for keyword in SECTION_HEADER_KEYWORDS)
+        self.has_action_verbs = any(keyword in self.keywords for keyword in ACTION_VERBS)
+        self.has_digits = any(char.isdigit() for char in text)
+        self.has_degree = any(section.degree is not None for section in self.sections)
+        self.has_date_ranges = DATE_RANGE_RE.search(text) is not None
+
+    def _segment(self) -> List[Section]:
+        """Split on blank lines exactly like text.split('\\n\\n'), keeping offsets."""
+        sections = []
+        start = 0
+        while True:
+            end = self.text.find('\n\n', start)
+            stop = len(self.text) if end == -1 else end
+            section_text = self.text[start:stop]
+            section_lower = self.lower[start:stop] if self._offsets_aligned else section_text.lower()
+            sections.append(Section(len(sections), start, stop, section_text, section_lower))
+            if end == -1:
+                return sections
+            start = end + 2
+
+    def section_at(self, offset: int) -> Section:
+        """Return the section containing a character offset."""
+        return self.sections[max(0, bisect_right(self._section_starts, offset) - 1)]
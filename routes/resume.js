@@ -3,9 +3,9 @@ const router = express.Router();
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
-const { spawn } = require('child_process');
 const auth = require('../middleware/auth');
 const User = require('../models/User');
+const PythonWorkerPool = require('../services/pythonWorkerPool');
 
 // Configure multer for file uploads
 const storage = multer.diskStorage({
@@ -36,64 +36,20 @@ const upload = multer({
   }
 });
 
-// Helper function to extract text from PDF
-async function extractTextFromPDF(filePath) {
-  return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python', ['extract_text.py', filePath]);
-    let result = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      result += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      console.error(`Python Error: ${data}`);
-      reject(new Error('Failed to extract text from PDF'));
-    });
-
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python process exited with code ${code}`));
-      } else {
-        try {
-          const jsonResult = JSON.parse(result);
-          resolve(jsonResult.text);
-        } catch (error) {
-          reject(new Error('Failed to parse Python output'));
-        }
-      }
-    });
-  });
-}
-
-// Helper function to analyze text with AI
-async function analyzeTextWithAI(text) {
-  return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python', ['ai_resume_analyzer.py', text]);
-    let result = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      result += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      console.error(`Python Error: ${data}`);
-      reject(new Error('Failed to analyze text with AI'));
-    });
+// Warm pool of resident resume analyzer workers; models load once per worker
+const analyzerPool = new PythonWorkerPool({
+  service: 'resume',
+  size: parseInt(process.env.RESUME_WORKERS, 10) || 1,
+  // Batching workers (INFERENCE_BATCHING=1, inherited by the Python process) take concurrent requests
+  concurrency: process.env.INFERENCE_BATCHING === '1' ? parseInt(process.env.WORKER_CONCURRENCY, 10) || 8 : 1,
+  // One process loads the models and forks the workers, which share the weights
+  forkServer: process.env.WORKER_FORK_SERVER === '1'
+});
+analyzerPool.start();
 
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python process exited with code ${code}`));
-      } else {
-        try {
-          const analysisResult = JSON.parse(result);
-          resolve(analysisResult);
-        } catch (error) {
-          reject(new Error('Failed to parse AI analysis result'));
-        }
-      }
-    });
-  });
+// Helper function to extract and analyze an uploaded file in one worker round trip
+async function analyzeFileWithAI(filePath, options = {}) {
+  return analyzerPool.analyzeFile(filePath, { ...options, include_text: true });
 }
 
 // Upload and analyze resume
@@ -103,11 +59,10 @@ router.post('/upload', auth, upload.single('resume'), async (req, res) => {
       return res.status(400).json({ message: 'No file uploaded' });
     }
 
-    // Extract text from the uploaded file
-    const extractedText = await extractTextFromPDF(req.file.path);
-
-    // Analyze text with AI
-    const analysisResult = await analyzeTextWithAI(extractedText);
+    // Extract and analyze the file in a resident worker; the text comes back once, with the result
+    // ?trace=1 returns per-stage timings alongside the analysis (not stored)
+    const trace = req.query.trace === '1';
+    const analysisResult = await analyzeFileWithAI(req.file.path, { trace });
 
     // Save analysis results to user's document
     const user = await User.findById(req.user.id);
@@ -116,7 +71,7 @@ router.post('/upload', auth, upload.single('resume'), async (req, res) => {
     }
 
     user.resumeAnalysis = {
-      text: extractedText,
+      text: analysisResult.text,
       entities: analysisResult.entities,
       education: analysisResult.education,
       experience: analysisResult.experience,
@@ -133,7 +88,8 @@ router.post('/upload', auth, upload.single('resume'), async (req, res) => {
 
     res.json({
       message: 'Resume analyzed successfully',
-      analysis: user.resumeAnalysis
+      analysis: user.resumeAnalysis,
+      ...(trace && { trace: analysisResult._trace })
     });
   } catch (error) {
     console.error('Error processing resume:', error);
@@ -0,0 +1,298 @@
+const { spawn } = require('child_process');
+const net = require('net');
+const readline = require('readline');
+const path = require('path');
+
+// Pool of resident Python model workers (see model_worker.py).
+// Each worker loads its models once and answers newline-framed JSON requests.
+// With forkServer set, one fork_server.py process loads the models and forks `size` workers
+// that share them copy-on-write; each is reached over its own Unix socket.
+// Processes that die before becoming ready are respawned with exponential backoff, and after
+// maxStartupFailures of them in a row the pool is unhealthy: requests fail fast until one starts.
+class PythonWorkerPool {
+  constructor({ service = 'resume', size = 1, python = 'python', requestTimeout = 120000, respawnDelay = 1000, maxRespawnDelay = 60000, maxStartupFailures = 5, concurrency = 1, forkServer = false } = {}) {
+    this.service = service;
+    this.size = size;
+    this.forkServer = forkServer;
+    this.zygote = null;
+    // Requests in flight per worker; >1 only helps workers running with INFERENCE_BATCHING=1
+    this.concurrency = concurrency;
+    this.python = python;
+    this.requestTimeout = requestTimeout;
+    this.respawnDelay = respawnDelay;
+    this.maxRespawnDelay = maxRespawnDelay;
+    this.maxStartupFailures = maxStartupFailures;
+    // Processes in a row that exited before any worker reported ready
+    this.startupFailures = 0;
+    this.healthy = true;
+    this.workers = [];
+    this.queue = [];
+    this.nextId = 1;
+    this.started = false;
+  }
+
+  start() {
+    if (this.started) return;
+    this.started = true;
+    if (this.forkServer) {
+      this._startForkServer();
+      return;
+    }
+    for (let i = 0; i < this.size; i++) {
+      this.workers.push(this._spawnWorker());
+    }
+  }
+
+  _spawnWorker() {
+    const proc = spawn(this.python, [path.join(__dirname, '..', 'model_worker.py'), '--service', this.service]);
+    const worker = { pid: proc.pid, input: proc.stdin, kill: () => proc.kill(), ready: false, wasReady: false, pending: new Map() };
+
+    proc.stderr.on('data', (data) => {
+      console.error(`[${this.service} worker ${proc.pid}] ${data}`);
+    });
+
+    this._readFrames(worker, proc.stdout);
+
+    proc.on('exit', (code) => {
+      console.error(`[${this.service} worker ${proc.pid}] exited with code ${code}`);
+      this._workerGone(worker, `Python worker exited with code ${code}`);
+      const index = this.workers.indexOf(worker);
+      if (index !== -1 && this.started) {
+        // Replace the crashed worker so the pool stays at full size
+        const delay = this._respawnDelayAfterExit(worker.wasReady);
+        setTimeout(() => {
+          if (this.started && this.workers[index] === worker) {
+            this.workers[index] = this._spawnWorker();
+          }
+        }, delay);
+      }
+    });
+
+    return worker;
+  }
+
+  // Start fork_server.py; it announces each (re)forked worker with a 'worker' frame
+  _startForkServer() {
+    const proc = spawn(this.python, [
+      path.join(__dirname, '..', 'fork_server.py'), '--service', this.service, '--workers', String(this.size)
+    ]);
+    this.zygote = proc;
+
+    proc.stderr.on('data', (data) => {
+      console.error(`[${this.service} fork server ${proc.pid}] ${data}`);
+    });
+
+    readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+      let frame;
+      try {
+        frame = JSON.parse(line);
+      } catch (error) {
+        console.error(`[${this.service} fork server ${proc.pid}] Unparseable output: ${line}`);
+        return;
+      }
+      if (frame.event === 'worker') {
+        this.workers[frame.slot] = this._connectWorker(frame);
+      } else if (frame.event === 'error') {
+        console.error(`[${this.service} fork server ${proc.pid}] Failed to start: ${frame.error}`);
+      }
+    });
+
+    proc.on('exit', (code) => {
+      console.error(`[${this.service} fork server ${proc.pid}] exited with code ${code}`);
+      // Its workers exit with it; a new fork server has to load the models again
+      const wasReady = this.workers.some((worker) => worker && worker.wasReady);
+      for (const worker of this.workers) {
+        if (worker) this._workerGone(worker, `Fork server exited with code ${code}`);
+      }
+      this.workers = [];
+      if (this.started && this.zygote === proc) {
+        const delay = this._respawnDelayAfterExit(wasReady);
+        setTimeout(() => {
+          if (this.started && this.zygote === proc) {
+            this._startForkServer();
+          }
+        }, delay);
+      }
+    });
+  }
+
+  _connectWorker({ pid, socket: socketPath }) {
+    const connection = net.createConnection(socketPath);
+    const worker = {
+      pid,
+      input: connection,
+      // The fork server reaps the killed worker and forks a replacement
+      kill: () => {
+        try {
+          process.kill(pid, 'SIGKILL');
+        } catch (error) {
+          // Already gone
+        }
+      },
+      ready: false,
+      wasReady: false,
+      pending: new Map()
+    };
+
+    this._readFrames(worker, connection);
+    connection.on('error', (error) => {
+      console.error(`[${this.service} worker ${pid}] ${error.message}`);
+    });
+    connection.on('close', () => {
+      this._workerGone(worker, `Python worker ${pid} disconnected`);
+    });
+
+    return worker;
+  }
+
+  _readFrames(worker, stream) {
+    readline.createInterface({ input: stream }).on('line', (line) => {
+      let frame;
+      try {
+        frame = JSON.parse(line);
+      } catch (error) {
+        console.error(`[${this.service} worker ${worker.pid}] Unparseable output: ${line}`);
+        return;
+      }
+
+      if (frame.event === 'ready') {
+        worker.ready = true;
+        worker.wasReady = true;
+        this.startupFailures = 0;
+        if (!this.healthy) {
+          console.error(`[${this.service} worker ${worker.pid}] Started; pool is healthy again`);
+          this.healthy = true;
+        }
+        this._dispatch();
+        return;
+      }
+      if (frame.event === 'error') {
+        console.error(`[${this.service} worker ${worker.pid}] Failed to start: ${frame.error}`);
+        return;
+      }
+
+      const pending = worker.pending.get(frame.id);
+      if (!pending) return;
+      clearTimeout(pending.timer);
+      worker.pending.delete(frame.id);
+      if (frame.ok) {
+        pending.resolve(frame.result);
+      } else if (frame.retryable && pending.attempts < 3) {
+        // Worker queues were full; try again once capacity frees up
+        pending.attempts += 1;
+        setTimeout(() => {
+          this.queue.push(pending);
+          this._dispatch();
+        }, 50 * pending.attempts);
+      } else {
+        pending.reject(new Error(frame.error));
+      }
+      this._dispatch();
+    });
+  }
+
+  // Delay before replacing a process that exited; wasReady is false when it died starting up
+  _respawnDelayAfterExit(wasReady) {
+    if (wasReady) {
+      this.startupFailures = 0;
+      return this.respawnDelay;
+    }
+    this.startupFailures += 1;
+    if (this.healthy && this.startupFailures >= this.maxStartupFailures) {
+      console.error(`[${this.service}] ${this.startupFailures} worker startups failed in a row; pool is unhealthy`);
+      this.healthy = false;
+      this._rejectQueued(`${this.service} workers are failing to start`);
+    }
+    return Math.min(this.respawnDelay * 2 ** (this.startupFailures - 1), this.maxRespawnDelay);
+  }
+
+  _rejectQueued(message) {
+    const queued = this.queue;
+    this.queue = [];
+    for (const job of queued) {
+      job.reject(new Error(message));
+    }
+  }
+
+  // Fail a dead worker's in-flight requests
+  _workerGone(worker, message) {
+    worker.ready = false;
+    for (const pending of worker.pending.values()) {
+      clearTimeout(pending.timer);
+      pending.reject(new Error(message));
+    }
+    worker.pending.clear();
+  }
+
+  _dispatch() {
+    while (this.queue.length > 0) {
+      // Least-loaded ready worker with a free slot
+      const worker = this.workers
+        .filter((w) => w && w.ready && w.pending.size < this.concurrency)
+        .sort((a, b) => a.pending.size - b.pending.size)[0];
+      if (!worker) return;
+
+      const job = this.queue.shift();
+      worker.pending.set(job.id, job);
+      job.timer = setTimeout(() => {
+        // A stuck worker is killed; the exit handler rejects the job and respawns
+        worker.kill();
+      }, this.requestTimeout);
+      worker.input.write(JSON.stringify(job.request) + '\n');
+    }
+  }
+
+  request(op, payload = {}) {
+    this.start();
+    return new Promise((resolve, reject) => {
+      if (!this.healthy) {
+        // Don't queue behind workers that keep failing to start
+        reject(new Error(`${this.service} workers are failing to start`));
+        return;
+      }
+      const id = this.nextId++;
+      this.queue.push({ id, request: { id, op, ...payload }, resolve, reject, attempts: 0 });
+      this._dispatch();
+    });
+  }
+
+  // options.trace asks the worker to return per-stage timings in result._trace
+  analyze(text, options = {}) {
+    return this.request('analyze', { text, ...options });
+  }
+
+  // Extract and analyze an uploaded file inside the worker; only the result comes back.
+  // options.include_text also returns the extracted text as result.text
+  analyzeFile(filePath, options = {}) {
+    return this.request('analyze_file', { path: path.resolve(filePath), ...options });
+  }
+
+  // Stage metrics of one worker; format 'prometheus' returns { text }
+  metrics(format = 'json') {
+    return this.request('metrics', { format });
+  }
+
+  health() {
+    return this.workers.filter(Boolean).map((w) => ({
+      pid: w.pid,
+      ready: w.ready,
+      inFlight: w.pending.size
+    }));
+  }
+
+  stop() {
+    this.started = false;
+    if (this.zygote) {
+      // The fork server terminates its workers
+      this.zygote.kill();
+      this.zygote = null;
+    } else {
+      for (const worker of this.workers) {
+        worker.kill();
+      }
+    }
+    this.workers = [];
+  }
+}
+
+module.exports = PythonWorkerPool;
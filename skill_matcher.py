@@ -0,0 +1,129 @@
+import os
+import json
+import hashlib
+import logging
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Default taxonomy shipped next to this module; override with SKILL_TAXONOMY_PATH
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every keyword occurrence in one pass over the text.
+
+    Keywords are matched case-sensitively, so callers pass lower-cased text for the
+    lower-cased keywords built here. With whole_words set, a match only counts when
+    the characters on either side of it are not letters, digits or underscores, so
+    'java' does not match inside 'javascript'.
+    """
+
+    def __init__(self, keywords: List[str], whole_words: bool = True):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._build()
+
+    def _build(self) -> None:
+        # Trie of all keywords
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._out[state].append(index)
+
+        # Failure links, breadth first; outputs of the failure state are inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, keyword) for every occurrence, ordered by end offset."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                keyword = self.keywords[index]
+                end = position + 1
+                start = end - len(keyword)
+                if self.whole_words and (
+                    (start > 0 and _is_word_char(text[start - 1]) and _is_word_char(keyword[0]))
+                    or (end < len(text) and _is_word_char(text[end]) and _is_word_char(keyword[-1]))
+                ):
+                    continue
+                yield start, end, keyword
+
+    def find_positions(self, text: str) -> Dict[str, List[int]]:
+        """Map each keyword found in text to the start offsets of all its occurrences."""
+        positions: Dict[str, List[int]] = {}
+        for start, _, keyword in self.finditer(text):
+            positions.setdefault(keyword, []).append(start)
+        return positions
+
+
+class SkillTaxonomy:
+    """Skill categories plus a compiled matcher over every skill they contain."""
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = {
+            category: [skill.lower() for skill in skills]
+            for category, skills in categories.items()
+        }
+        self.matcher = KeywordMatcher([skill for skills in self.categories.values() for skill in skills])
+        canonical = json.dumps(self.categories, sort_keys=True).encode('utf-8')
+        self.version = hashlib.sha256(canonical).hexdigest()[:12]
+
+    def find_skills(self, text_lower: str) -> List[Tuple[str, str, List[int]]]:
+        """Return (category, skill, start offsets) for every skill mentioned in the text.
+
+        Results follow taxonomy order, so output is stable regardless of where in the
+        text each skill first appears.
+        """
+        positions = self.matcher.find_positions(text_lower)
+        return [
+            (category, skill, positions[skill])
+            for category, skills in self.categories.items()
+            for skill in skills
+            if skill in positions
+        ]
+
+
+def load_taxonomy(path: Optional[str] = None) -> SkillTaxonomy:
+    """Load a skill taxonomy from a JSON file mapping category -> list of skills."""
+    path = path or os.getenv('SKILL_TAXONOMY_PATH') or DEFAULT_TAXONOMY_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            categories = json.load(file)
+        taxonomy = SkillTaxonomy(categories)
+        logger.info(f"Loaded skill taxonomy {taxonomy.version} from {path}")
+        return taxonomy
+    except Exception as e:
+        logger.error(f"Error loading skill taxonomy from {path}: {str(e)}")
+        raise
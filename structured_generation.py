@@ -0,0 +1,277 @@
+import copy
+import json
+import time
+import logging
+import weakref
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import torch
+from transformers import LogitsProcessor, LogitsProcessorList, StoppingCriteria, StoppingCriteriaList
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JSON_OPENERS = {'[': ']', '{': '}'}
+
+# Characters that may appear outside a JSON string: structure, whitespace, numbers and true/false/null
+_OUTSIDE_STRING_CHARS = set(' \t\n\r[]{},:"0123456789-+.eE') | set('truefalsn')
+
+
+class JsonScanner:
+    """Incrementally tracks where a JSON array/object opens and where it is balanced again.
+
+    Text is fed in chunks as it is generated. Brackets inside strings (including escaped
+    quotes) are ignored, so the scanner knows exactly when the top-level value closes.
+    """
+
+    def __init__(self, opener: str):
+        self.opener = opener
+        self.start = -1
+        self.end = -1
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.consumed = 0
+
+    @property
+    def closed(self) -> bool:
+        return self.end != -1
+
+    def feed(self, chunk: str) -> bool:
+        """Scan more text; returns True once the top-level value has closed."""
+        for char in chunk:
+            position = self.consumed
+            self.consumed += 1
+            if self.closed:
+                break
+            if self.start == -1:
+                if char == self.opener:
+                    self.start = position
+                    self.depth = 1
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in JSON_OPENERS:
+                self.depth += 1
+            elif char in ']}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = position + 1
+        return self.closed
+
+
+def extract_json(text: str, opener: str) -> Any:
+    """Parse the first balanced JSON value starting with opener in text.
+
+    Unlike slicing from the first opener to the last closer, trailing text that happens
+    to contain brackets doesn't corrupt the value. Raises ValueError if none is found.
+    """
+    scanner = JsonScanner(opener)
+    scanner.feed(text)
+    if scanner.start == -1:
+        raise ValueError(f"No JSON value starting with '{opener}' in output")
+    if not scanner.closed:
+        raise ValueError("JSON value was not closed before generation stopped")
+    return json.loads(text[scanner.start:scanner.end])
+
+
+class JsonStoppingCriteria(StoppingCriteria):
+    """Stops generation as soon as the JSON value in the generated tokens is balanced.
+
+    Each step decodes only the unread tokens together with the previously read ones
+    (so leading spaces and multi-byte characters come out as in a full decode) and
+    feeds the new text to the scanner. Only if that isn't an extension of the previous
+    decode is the whole output re-decoded and rescanned.
+    """
+
+    def __init__(self, tokenizer: Any, prompt_length: int, scanner: JsonScanner):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.scanner = scanner
+        # Scanner state before any generated text (e.g. with a primed opener), for rescans
+        self._initial = copy.copy(scanner)
+        self._prefix_offset = 0
+        self._read_offset = 0
+
+    def _decode(self, token_ids: torch.LongTensor) -> str:
+        return self.tokenizer.decode(token_ids, skip_special_tokens=True)
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        generated = input_ids[0, self.prompt_length:]
+        if len(generated) == self._read_offset:
+            return self.scanner.closed
+        prefix_text = self._decode(generated[self._prefix_offset:self._read_offset])
+        text = self._decode(generated[self._prefix_offset:])
+        if text.endswith('\ufffd'):
+            # Partial UTF-8 sequence; read it once the rest of the character is generated
+            return self.scanner.closed
+        if text.startswith(prefix_text):
+            self.scanner.feed(text[len(prefix_text):])
+        else:
+            # Decoding isn't always prefix-stable; rescan everything generated so far
+            self.scanner.__dict__.update(copy.copy(self._initial).__dict__)
+            self.scanner.feed(self._decode(generated))
+        self._prefix_offset = self._read_offset
+        self._read_offset = len(generated)
+        return self.scanner.closed
+
+
+def _token_is_valid(text: str, in_string: bool) -> bool:
+    """Whether a token's text keeps the output lexically valid JSON from the given state."""
+    escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif ord(char) < 0x20:
+                return False  # Raw control characters aren't allowed inside JSON strings
+        elif char == '"':
+            in_string = True
+        elif char not in _OUTSIDE_STRING_CHARS:
+            return False
+    return True
+
+
+class JsonCharsetLogitsProcessor(LogitsProcessor):
+    """Masks tokens that would put characters where JSON doesn't allow them.
+
+    Outside strings only structural characters, whitespace, numbers and literals are
+    allowed; inside strings anything but raw control characters. End-of-sequence is
+    blocked until the value closes. The per-token masks for both states are computed
+    once per tokenizer and reused.
+
+    The mask is lexical only: it follows the scanner's in-string state, not the JSON
+    grammar, so misplaced commas, colons or literals can still be generated. Such output
+    fails in extract_json and generate_json returns None.
+    """
+
+    # Keyed by the tokenizer itself, so a freed tokenizer's masks (and id) aren't reused
+    _mask_cache: 'weakref.WeakKeyDictionary[Any, Tuple[torch.Tensor, torch.Tensor]]' = weakref.WeakKeyDictionary()
+
+    def __init__(self, tokenizer: Any, scanner: JsonScanner, vocab_size: int):
+        self.scanner = scanner
+        self.eos_token_id = tokenizer.eos_token_id
+        if tokenizer not in self._mask_cache:
+            start = time.time()
+            texts = [tokenizer.decode([token_id]) for token_id in range(len(tokenizer))]
+            outside = torch.tensor([_token_is_valid(text, False) for text in texts], dtype=torch.bool)
+            inside = torch.tensor([_token_is_valid(text, True) for text in texts], dtype=torch.bool)
+            self._mask_cache[tokenizer] = (outside, inside)
+            logger.info(f"Built JSON token masks for {len(texts)} tokens in {time.time() - start:.1f}s")
+        outside, inside = self._mask_cache[tokenizer]
+        # The model's output layer may be padded beyond the tokenizer's vocabulary
+        self.masks = {
+            state: torch.cat([mask, torch.zeros(max(0, vocab_size - len(mask)), dtype=torch.bool)])[:vocab_size]
+            for state, mask in ((False, outside), (True, inside))
+        }
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        # The stopping criteria (run after every step) keeps the scanner current
+        allowed = self.masks[self.scanner.in_string].to(scores.device).clone()
+        if self.eos_token_id is not None and not self.scanner.closed and self.eos_token_id < len(allowed):
+            allowed[self.eos_token_id] = False
+        return scores.masked_fill(~allowed, float('-inf'))
+
+
+class PromptPrefix(NamedTuple):
+    """Token ids of a shared prompt prefix and the model's KV cache after reading them."""
+    input_ids: torch.LongTensor
+    past_key_values: Any
+
+
+def encode_prefix(model: Any, tokenizer: Any, text: str, max_tokens: int) -> PromptPrefix:
+    """Run the model over a prompt prefix once so several prompts can continue from it."""
+    inputs = tokenizer(text, return_tensors="pt", max_length=max_tokens, truncation=True)
+    input_ids = inputs.input_ids.to(model.device)
+    with torch.inference_mode():
+        outputs = model(input_ids=input_ids, use_cache=True)
+    return PromptPrefix(input_ids, outputs.past_key_values)
+
+
+def generate_json(model: Any, tokenizer: Any, prompt: str, opener: str,
+                  max_new_tokens: int = 256, max_input_tokens: int = 2048,
+                  constrained: bool = False, temperature: float = 0.7,
+                  prefix: Optional[PromptPrefix] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Generate a JSON array ('[') or object ('{') and parse it.
+
+    Generation is bounded by max_new_tokens and stops as soon as the value is balanced.
+    With constrained set, the prompt is primed with the opening bracket, decoding is
+    greedy and tokens that can't appear in lexically valid JSON are masked out.
+    Only newly generated tokens are parsed, so JSON examples in the prompt can't leak
+    into the result. Returns (value or None, stats).
+
+    With a prefix, prompt is appended to the prefix tokens and generation starts from
+    a copy of the prefix's KV cache, so only the prompt itself is processed.
+    """
+    if constrained:
+        prompt = prompt.rstrip() + '\n' + opener
+    if prefix is None:
+        inputs = tokenizer(prompt, return_tensors="pt", max_length=max_input_tokens, truncation=True)
+        input_ids = inputs.input_ids.to(model.device)
+        past_key_values = None
+    else:
+        # Tokenize the suffix on its own so the prefix tokens match the cached ones exactly
+        budget = max(1, max_input_tokens - prefix.input_ids.shape[1])
+        suffix = tokenizer(prompt, return_tensors="pt", add_special_tokens=False,
+                           max_length=budget, truncation=True)
+        input_ids = torch.cat([prefix.input_ids, suffix.input_ids.to(model.device)], dim=1)
+        # generate() extends the cache in place; each prompt needs its own copy
+        past_key_values = copy.deepcopy(prefix.past_key_values)
+    attention_mask = torch.ones_like(input_ids)
+    prompt_length = input_ids.shape[1]
+
+    scanner = JsonScanner(opener)
+    if constrained:
+        scanner.feed(opener)
+    stopping = JsonStoppingCriteria(tokenizer, prompt_length, scanner)
+    generation_kwargs = {
+        'max_new_tokens': max_new_tokens,
+        'num_return_sequences': 1,
+        'stopping_criteria': StoppingCriteriaList([stopping]),
+        'pad_token_id': tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    }
+    if past_key_values is not None:
+        generation_kwargs['past_key_values'] = past_key_values
+    if constrained:
+        vocab_size = model.get_output_embeddings().weight.shape[0]
+        generation_kwargs['logits_processor'] = LogitsProcessorList([
+            JsonCharsetLogitsProcessor(tokenizer, scanner, vocab_size)
+        ])
+        generation_kwargs['do_sample'] = False
+    else:
+        generation_kwargs['do_sample'] = True
+        generation_kwargs['temperature'] = temperature
+
+    start = time.perf_counter()
+    with torch.inference_mode():
+        outputs = model.generate(input_ids, attention_mask=attention_mask, **generation_kwargs)
+    seconds = time.perf_counter() - start
+
+    generated = tokenizer.decode(outputs[0, prompt_length:], skip_special_tokens=True)
+    text = opener + generated if constrained else generated
+    stats = {
+        'input_tokens': int(prompt_length),
+        'new_tokens': int(outputs.shape[1] - prompt_length),
+        'seconds': seconds,
+        'stopped_early': scanner.closed
+    }
+    try:
+        value = extract_json(text, opener)
+        stats['parsed'] = True
+    except ValueError as e:
+        logger.warning(f"Could not parse generated JSON: {str(e)}")
+        value = None
+        stats['parsed'] = False
+    return value, stats
@@ -0,0 +1,170 @@
+import logging
+from typing import Any, Iterable, List, Optional
+
+import numpy as np
+import torch
+from tokenizers import Tokenizer, decoders, models, normalizers, pre_tokenizers, processors, trainers
+from transformers import (
+    BertConfig,
+    BertForSequenceClassification,
+    BertForTokenClassification,
+    BertModel,
+    GPT2Config,
+    GPT2LMHeadModel,
+    PreTrainedTokenizerFast,
+    pipeline
+)
+
+from model_registry import ModelRegistry
+from skill_matcher import load_taxonomy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Checkpoint name the benchmark gives JobRecommender roles when running on stubs
+STUB_CAUSAL_LM = "stub/tiny-gpt2"
+
+NER_LABELS = ['O', 'B-MISC', 'I-MISC', 'B-PER', 'I-PER', 'B-ORG', 'I-ORG', 'B-LOC', 'I-LOC']
+NLI_LABELS = ['contradiction', 'neutral', 'entailment']
+
+# Tiny but structurally faithful: same tokenizers, windowing and generation code paths
+HIDDEN_SIZE = 64
+LAYERS = 2
+HEADS = 2
+
+
+def _training_corpus(extra: Optional[Iterable[str]] = None) -> List[str]:
+    corpus = [
+        "This example is has python experience.",
+        "This example is does not have python experience.",
+        "Resume Text: Experience Education Skills Projects Summary",
+        "Extract technical and soft skills from the resume text above. Provide a JSON array.",
+        '{"years_of_experience": 3, "industries": [], "roles": [], "achievements": []}',
+        '["skill1", "skill2"] [{"title": "string", "match_score": 80}]'
+    ]
+    for skills in load_taxonomy().categories.values():
+        corpus.extend(skills)
+    corpus.extend(extra or [])
+    return corpus
+
+
+def build_wordpiece_tokenizer(corpus: List[str], vocab_size: int = 3000) -> PreTrainedTokenizerFast:
+    """BERT-style WordPiece tokenizer trained in-process on corpus."""
+    special = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    tokenizer = Tokenizer(models.WordPiece(unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.BertNormalizer(lowercase=False)
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.decoder = decoders.WordPiece()
+    tokenizer.train_from_iterator(corpus, trainers.WordPieceTrainer(vocab_size=vocab_size, special_tokens=special))
+    cls_id, sep_id = tokenizer.token_to_id("[CLS]"), tokenizer.token_to_id("[SEP]")
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", cls_id), ("[SEP]", sep_id)]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="[UNK]", pad_token="[PAD]", cls_token="[CLS]", sep_token="[SEP]", mask_token="[MASK]",
+        model_max_length=512
+    )
+
+
+def build_bpe_tokenizer(corpus: List[str], vocab_size: int = 2000) -> PreTrainedTokenizerFast:
+    """GPT-2 style byte-level BPE tokenizer trained in-process on corpus."""
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    tokenizer.train_from_iterator(corpus, trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=["<|endoftext|>"],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    ))
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        eos_token="<|endoftext|>", bos_token="<|endoftext|>", unk_token="<|endoftext|>",
+        model_max_length=2048
+    )
+
+
+def _bert_config(vocab_size: int, labels: Optional[List[str]] = None) -> BertConfig:
+    config = BertConfig(
+        vocab_size=vocab_size,
+        hidden_size=HIDDEN_SIZE,
+        num_hidden_layers=LAYERS,
+        num_attention_heads=HEADS,
+        intermediate_size=HIDDEN_SIZE * 2,
+        max_position_embeddings=512
+    )
+    if labels:
+        config.num_labels = len(labels)
+        config.id2label = dict(enumerate(labels))
+        config.label2id = {label: i for i, label in enumerate(labels)}
+    return config
+
+
+class StubSentenceEncoder:
+    """Mean-pooled tiny BERT with the SentenceTransformer.encode interface JobMatcher uses."""
+
+    def __init__(self, tokenizer: PreTrainedTokenizerFast, seed: int = 0):
+        torch.manual_seed(seed)
+        self.tokenizer = tokenizer
+        self.model = BertModel(_bert_config(len(tokenizer))).eval()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return HIDDEN_SIZE
+
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=256, return_tensors="pt")
+            with torch.no_grad():
+                hidden = self.model(**inputs).last_hidden_state
+            mask = inputs['attention_mask'].unsqueeze(-1).float()
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            if normalize_embeddings:
+                pooled = torch.nn.functional.normalize(pooled, dim=-1)
+            embeddings.append(pooled)
+        return torch.cat(embeddings).numpy()
+
+
+def register_stub_analyzer_models(registry: ModelRegistry, corpus: Optional[Iterable[str]] = None,
+                                  seed: int = 0) -> None:
+    """Register randomly initialised tiny NER, NLI and sentence models under the analyzer's names.
+
+    Nothing is downloaded, so the real analysis code paths can be timed offline. Outputs
+    are meaningless; only their shape and cost structure match the real models.
+    """
+    tokenizer = build_wordpiece_tokenizer(_training_corpus(corpus))
+
+    def ner():
+        torch.manual_seed(seed)
+        model = BertForTokenClassification(_bert_config(len(tokenizer), NER_LABELS)).eval()
+        return pipeline("ner", model=model, tokenizer=tokenizer, device=-1)
+
+    def zero_shot():
+        torch.manual_seed(seed + 1)
+        model = BertForSequenceClassification(_bert_config(len(tokenizer), NLI_LABELS)).eval()
+        return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer, device=-1)
+
+    registry.register('ner', ner, replace=True)
+    registry.register('zero_shot', zero_shot, replace=True)
+    registry.register('sentence_transformer', lambda: StubSentenceEncoder(tokenizer, seed + 2), replace=True)
+
+
+def build_stub_causal_lm(corpus: Optional[Iterable[str]] = None, seed: int = 0) -> Any:
+    """(tokenizer, model) pair of a tiny random GPT-2 standing in for phi-2."""
+    tokenizer = build_bpe_tokenizer(_training_corpus(corpus))
+    torch.manual_seed(seed)
+    model = GPT2LMHeadModel(GPT2Config(
+        vocab_size=len(tokenizer),
+        n_positions=2048,
+        n_embd=HIDDEN_SIZE,
+        n_layer=LAYERS,
+        n_head=HEADS,
+        bos_token_id=tokenizer.eos_token_id,
+        eos_token_id=tokenizer.eos_token_id
+    )).eval()
+    return tokenizer, model
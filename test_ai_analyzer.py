@@ -0,0 +1,123 @@
+import threading
+import weakref
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('tokenizers')
+pytest.importorskip('dotenv')
+
+import ai_analyzer
+from stub_models import build_stub_causal_lm
+
+
+@pytest.fixture(scope='module')
+def stub_pair():
+    tokenizer, model = build_stub_causal_lm()
+    return model, tokenizer
+
+
+@pytest.fixture
+def loads(stub_pair, monkeypatch):
+    """Serve stub models from 'disk', recording each load; names starting with 'broken' fail.
+
+    Each entry is (model name, models resident while its weights loaded).
+    """
+    loaded = []
+
+    def load_tokenizer(model_name):
+        if model_name.startswith('broken'):
+            raise OSError(f"{model_name} not found")
+        return stub_pair[1]
+
+    def load_weights(model_name):
+        loaded.append((model_name, len(ai_analyzer._model_cache)))
+        return stub_pair[0]
+    monkeypatch.setattr(ai_analyzer, '_load_tokenizer', load_tokenizer)
+    monkeypatch.setattr(ai_analyzer, '_load_weights', load_weights)
+    monkeypatch.setattr(ai_analyzer, 'MODEL_CACHE_SIZE', 2)
+    ai_analyzer.clear_model_cache()
+    yield loaded
+    ai_analyzer.clear_model_cache()
+
+
+def names(loads):
+    return [name for name, _ in loads]
+
+
+def test_cache_hit_reuses_the_loaded_model(loads, stub_pair):
+    assert ai_analyzer.load_model('a') == stub_pair
+    assert ai_analyzer.load_model('a') == stub_pair
+    assert names(loads) == ['a']
+
+
+def test_least_recently_used_model_is_evicted(loads):
+    ai_analyzer.load_model('a')
+    ai_analyzer.load_model('b')
+    ai_analyzer.load_model('a')  # 'b' is now the least recently used
+    ai_analyzer.load_model('c')
+    assert list(ai_analyzer._model_cache) == ['a', 'c']
+
+    ai_analyzer.load_model('b')
+    assert names(loads) == ['a', 'b', 'c', 'b']
+    # The least recently used model is gone before the next weights load
+    assert max(resident for _, resident in loads) == 1
+    assert list(ai_analyzer._model_cache) == ['c', 'b']
+
+
+def test_failed_load_keeps_cached_models(loads):
+    ai_analyzer.load_model('a')
+    ai_analyzer.load_model('b')
+    with pytest.raises(OSError):
+        ai_analyzer.load_model('broken')
+    assert list(ai_analyzer._model_cache) == ['a', 'b']
+
+    ai_analyzer.load_model('a')
+    assert names(loads) == ['a', 'b']
+
+
+def test_clear_model_cache_forces_a_reload(loads):
+    ai_analyzer.load_model('a')
+    ai_analyzer.clear_model_cache()
+    ai_analyzer.load_model('a')
+    assert names(loads) == ['a', 'a']
+
+
+def test_evicted_model_is_freed(loads, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, 'MODEL_CACHE_SIZE', 1)
+    model = type('Model', (), {})()
+    monkeypatch.setattr(ai_analyzer, '_load_weights', lambda name: model if name == 'a' else object())
+    ai_analyzer.load_model('a')
+    evicted = weakref.ref(model)
+    del model
+    ai_analyzer.load_model('b')
+    assert evicted() is None
+
+
+def test_cache_hits_do_not_wait_for_a_load(loads, monkeypatch):
+    ai_analyzer.load_model('a')
+    started, release = threading.Event(), threading.Event()
+    weights = []
+
+    def slow_weights(model_name):
+        weights.append(model_name)
+        started.set()
+        assert release.wait(10)
+        return object()
+    monkeypatch.setattr(ai_analyzer, '_load_weights', slow_weights)
+
+    loaders = [threading.Thread(target=ai_analyzer.load_model, args=('slow',)) for _ in range(2)]
+    for loader in loaders:
+        loader.start()
+    assert started.wait(10)
+    hit = threading.Thread(target=ai_analyzer.load_model, args=('a',))
+    hit.start()
+    hit.join(5)
+    assert not hit.is_alive()
+    release.set()
+    for loader in loaders:
+        loader.join(10)
+    # The second caller waited for the first load instead of loading again
+    assert weights == ['slow']
+    assert list(ai_analyzer._model_cache) == ['a', 'slow']
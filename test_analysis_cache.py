@@ -0,0 +1,83 @@
+import pytest
+
+import analysis_cache
+from analysis_cache import AnalysisCache, cache_key, section_cache_key
+
+VERSIONS = {'analysis': '1', 'taxonomy': 'abc'}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic time.time() that advances one second per call; bump 'now' to jump."""
+    now = {'value': 1000.0}
+
+    def tick():
+        now['value'] += 1
+        return now['value']
+    monkeypatch.setattr(analysis_cache.time, 'time', tick)
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_key_ignores_whitespace_but_not_versions():
+    assert cache_key('Jane  Doe\r\nPython ', VERSIONS) == cache_key('Jane Doe\nPython', VERSIONS)
+    assert cache_key('Jane Doe', VERSIONS) != cache_key('Jane Doe', {**VERSIONS, 'taxonomy': 'def'})
+    # Inputs that split into different sections never share a key
+    assert cache_key('a\n  \nb', VERSIONS) == cache_key('a\n\t\nb', VERSIONS)
+    assert cache_key('a\n  \nb', VERSIONS) != cache_key('a\n\nb', VERSIONS)
+    assert cache_key('a\r\n\r\nb', VERSIONS) != cache_key('a\n\nb', VERSIONS)
+    assert cache_key('\n\na', VERSIONS) != cache_key('a', VERSIONS)
+    # Section results hold offsets into the raw text, so its key is not normalized
+    assert section_cache_key('a  b', VERSIONS) != section_cache_key('a b', VERSIONS)
+
+
+def test_get_put_round_trip(cache):
+    assert cache.get('resume', VERSIONS) is None
+    cache.put('resume', VERSIONS, {'skills': ['python']})
+    assert cache.get('resume', VERSIONS) == {'skills': ['python']}
+    assert cache.get('resume', {**VERSIONS, 'analysis': '2'}) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 1)
+
+
+def test_evicts_least_recently_used(cache, clock):
+    cache.put('first', VERSIONS, {'n': 1})
+    cache.put('second', VERSIONS, {'n': 2})
+    assert cache.get('first', VERSIONS) == {'n': 1}
+    cache.put('third', VERSIONS, {'n': 3})
+    assert cache.get('second', VERSIONS) is None
+    assert cache.get('first', VERSIONS) == {'n': 1}
+    assert cache.get('third', VERSIONS) == {'n': 3}
+
+
+def test_expired_entries_miss(tmp_path, clock):
+    cache = AnalysisCache(str(tmp_path / 'cache.sqlite3'), max_age_seconds=5)
+    cache.put('resume', VERSIONS, {'n': 1})
+    clock['value'] += 10
+    assert cache.get('resume', VERSIONS) is None
+    cache.close()
+
+
+def test_sections_and_purge(cache):
+    keys = [section_cache_key(text, VERSIONS) for text in ('skills', 'experience')]
+    cache.put_sections(VERSIONS, {keys[0]: {'spans': [1]}})
+    assert cache.get_sections(keys) == {keys[0]: {'spans': [1]}}
+    assert (cache.section_hits, cache.section_misses) == (1, 1)
+
+    cache.put('resume', VERSIONS, {'n': 1})
+    assert cache.purge_versions({**VERSIONS, 'analysis': '2'}) == 1
+    assert cache.get('resume', VERSIONS) is None
+    assert cache.get_sections(keys) == {}
+
+
+def test_in_memory_cache():
+    cache = AnalysisCache(':memory:')
+    cache.put('resume', VERSIONS, {'n': 1})
+    assert cache.get('resume', VERSIONS) == {'n': 1}
+    cache.close()
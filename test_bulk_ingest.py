@@ -0,0 +1,90 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import bulk_ingest
+from bulk_ingest import iter_inputs, load_checkpoint, run
+
+
+def touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'')
+    return path
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """Run jobs on threads with a stub analysis; returns the list of processed ids."""
+    processed = []
+
+    def process(job):
+        processed.append(job['id'])
+        ok = not job['id'].startswith('bad')
+        record = {'id': job['id'], 'path': job['path'], 'ok': ok, 'seconds': 0.01}
+        record.update({'result': {'skills': []}} if ok else {'error': 'unreadable'})
+        return record
+    monkeypatch.setattr(bulk_ingest, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(bulk_ingest, '_init_worker', lambda stages, threads: None)
+    monkeypatch.setattr(bulk_ingest, '_process', process)
+    return processed
+
+
+def test_iter_inputs_directory_and_glob(tmp_path):
+    touch(tmp_path / 'b.docx')
+    touch(tmp_path / 'nested' / 'a.PDF')
+    touch(tmp_path / 'notes.txt')
+
+    ids = sorted(job['id'] for job in iter_inputs(str(tmp_path)))
+    assert ids == ['b.docx', 'nested/a.PDF']
+    jobs = list(iter_inputs(str(tmp_path / '**' / '*')))
+    assert sorted(job['path'] for job in jobs) == [str(tmp_path / 'b.docx'), str(tmp_path / 'nested' / 'a.PDF')]
+    assert all(job['id'] == job['path'] for job in jobs)
+
+
+def test_iter_inputs_manifest_skips_bad_lines(tmp_path):
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text('{"id": "r1", "path": "one.pdf"}\n\n'
+                        '{"path": "two.docx"}\n'
+                        'not json\n'
+                        '{"id": "r3"}\n', encoding='utf-8')
+
+    assert list(iter_inputs(str(manifest))) == [{'id': 'r1', 'path': 'one.pdf'},
+                                                {'id': 'two.docx', 'path': 'two.docx'}]
+
+
+def test_load_checkpoint_keeps_only_successes(tmp_path):
+    output = tmp_path / 'out.jsonl'
+    assert load_checkpoint(None) == set()
+    assert load_checkpoint(str(output)) == set()
+
+    output.write_text('{"id": "a", "ok": true}\n{"id": "b", "ok": false}\n{"id": "c", "ok": tr',
+                      encoding='utf-8')
+    assert load_checkpoint(str(output)) == {'a'}
+
+
+def test_run_streams_records_and_summary(tmp_path, fake_pool):
+    touch(tmp_path / 'in' / 'a.pdf')
+    touch(tmp_path / 'in' / 'bad.docx')
+    output = tmp_path / 'out.jsonl'
+
+    summary = run(str(tmp_path / 'in'), str(output), workers=2, torch_threads=1)
+    assert summary['processed'] == 2 and summary['failed'] == 1 and summary['skipped'] == 0
+    assert {record['id']: record['ok'] for record in read_records(output)} == {'a.pdf': True, 'bad.docx': False}
+
+
+def test_run_resumes_after_a_torn_record(tmp_path, fake_pool):
+    for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+        touch(tmp_path / 'in' / name)
+    output = tmp_path / 'out.jsonl'
+    output.write_text('{"id": "a.pdf", "ok": true, "seconds": 0.1}\n{"id": "b.pdf", "o', encoding='utf-8')
+
+    summary = run(str(tmp_path / 'in'), str(output), workers=1, torch_threads=1)
+    assert summary['skipped'] == 1 and sorted(fake_pool) == ['b.pdf', 'c.pdf']
+    # Every line parses again, so a second resume sees all three as done
+    assert sorted(record['id'] for record in read_records(output)) == ['a.pdf', 'b.pdf', 'c.pdf']
+    assert load_checkpoint(str(output)) == {'a.pdf', 'b.pdf', 'c.pdf'}
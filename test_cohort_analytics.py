@@ -0,0 +1,110 @@
+import pytest
+
+from cohort_analytics import CohortAnalytics, parse_record
+from skill_matcher import SkillTaxonomy
+
+TAXONOMY = SkillTaxonomy({'databases': ['PostgreSQL', 'MongoDB'], 'languages': ['Python', 'Go']})
+ROLES = {
+    'backend': {'title': 'Backend Engineer', 'required_skills': ['Python', 'Databases', 'Docker']},
+    'data': {'title': 'Data Scientist', 'required_skills': ['Python', 'Machine Learning']}
+}
+
+
+@pytest.fixture
+def analytics():
+    analytics = CohortAnalytics(ROLES, TAXONOMY)
+    analytics.add('s1', {'Python': 0.9, 'Go': 0.4}, ['Backend Engineer'], cohort='a')
+    analytics.add('s2', {'python': 0.8, 'docker': 0.7, 'mongodb': 0.6}, ['backend'], cohort='a')
+    analytics.add('s3', {'go': 0.5, 'postgresql': 0.9}, ['data', 'Astronaut'], cohort='b')
+    return analytics
+
+
+def test_coverage_counts_categories_met_by_any_skill(analytics):
+    assert analytics.coverage() == {
+        's1': {'backend': pytest.approx(1 / 3)},
+        's2': {'backend': pytest.approx(1.0)},
+        's3': {'data': pytest.approx(0.0)}
+    }
+    assert analytics.coverage(cohort='b', role='backend') == {'s3': {'backend': pytest.approx(1 / 3)}}
+    assert analytics.student_gaps('s1') == {'backend': ['databases', 'docker']}
+    with pytest.raises(ValueError):
+        analytics.coverage(role='astronaut')
+
+
+def test_report_ranks_missing_requirements(analytics):
+    report = analytics.report(cohort='a')
+    backend = report['roles']['backend']
+    assert (report['students'], backend['students']) == (2, 2)
+    assert backend['mean_coverage'] == pytest.approx(2 / 3)
+    assert backend['ready_share'] == 0.5
+    assert backend['requirements_met'] == {'python': 1.0, 'databases': 0.5, 'docker': 0.5}
+    assert [gap['requirement'] for gap in backend['top_missing']] == ['databases', 'docker']
+    databases = backend['top_missing'][0]
+    assert databases['skills'] == ['postgresql', 'mongodb']
+    assert databases['most_common_skill'] == 'mongodb'
+    assert 'data' not in report['roles']
+    assert report['top_skills']['python'] == 2
+
+
+def test_readding_a_student_replaces_the_old_analysis(analytics):
+    analytics.report()  # Cache the met matrix before the new row arrives
+    analytics.add('s1', {'python': 1.0, 'postgresql': 0.5, 'docker': 0.5}, ['backend'], cohort='a')
+    assert len(analytics) == 3
+    assert analytics.coverage(cohort='a') == {
+        's1': {'backend': pytest.approx(1.0)},
+        's2': {'backend': pytest.approx(1.0)}
+    }
+    assert analytics.report()['unknown_roles'] == {'Astronaut': 1}
+
+
+def test_set_roles_resolves_targets_again(analytics):
+    analytics.set_roles({
+        'data': ROLES['data'],
+        'platform': {'title': 'Platform Engineer', 'required_skills': ['Docker']},
+        'backend': ROLES['backend']
+    })
+    assert analytics.coverage() == {
+        's1': {'backend': pytest.approx(1 / 3)},
+        's2': {'backend': pytest.approx(1.0)},
+        's3': {'data': pytest.approx(0.0)}
+    }
+
+    analytics.set_roles({'platform': {'title': 'Platform Engineer', 'required_skills': ['Docker']}})
+    assert analytics.coverage() == {}
+    report = analytics.report()
+    assert report['roles'] == {} and report['students_without_target_role'] == 3
+    assert report['unknown_roles'] == {'Backend Engineer': 1, 'backend': 1, 'data': 1, 'Astronaut': 1}
+
+
+def test_min_proficiency_and_students_without_roles():
+    analytics = CohortAnalytics(ROLES, TAXONOMY, min_proficiency=0.5)
+    analytics.add('s1', {'python': 0.4, 'docker': 0.9}, ['backend'])
+    analytics.add('s2', {'python': 0.9})
+    assert analytics.coverage() == {'s1': {'backend': pytest.approx(1 / 3)}}
+    assert analytics.report()['students_without_target_role'] == 1
+
+
+def test_parse_record_shapes():
+    ingest = {'id': 'a.pdf', 'ok': True, 'result': {
+        'skills': [{'name': 'Python', 'proficiency': 0.7}],
+        'job_recommendations': [{'title': 'Data Scientist'}]
+    }}
+    assert parse_record(ingest) == {'id': 'a.pdf', 'skills': {'python': 0.7},
+                                    'roles': ['Data Scientist'], 'cohort': None}
+    user = {'_id': {'$oid': 'u1'}, 'cohort': '2024',
+            'resumeAnalysis': {'skills': {'technical': ['Go'], 'soft': ['Teamwork'], 'missing': ['Rust']}},
+            'jobPreferences': {'roles': ['backend']}}
+    assert parse_record(user) == {'id': 'u1', 'skills': {'go': 1.0, 'teamwork': 1.0},
+                                  'roles': ['backend'], 'cohort': '2024'}
+    assert parse_record({'id': 'x', 'ok': False, 'error': 'boom'}) is None
+
+
+def test_empty_engine_and_unknown_cohort(analytics):
+    empty = CohortAnalytics(ROLES, TAXONOMY).report()
+    assert empty['students'] == 0
+    assert all(role['students'] == 0 for role in empty['roles'].values())
+    assert CohortAnalytics(ROLES, TAXONOMY).coverage() == {}
+
+    report = analytics.report(cohort='nobody')
+    assert report['students'] == 0 and report['top_skills'] == {}
+    assert analytics.coverage(cohort='nobody') == {}
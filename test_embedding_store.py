@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from embedding_store import INDEX_FILE, VECTORS_FILE, EmbeddingStore, text_key
+
+
+class CountingEncoder:
+    """Stand-in sentence encoder that records which texts it was asked to embed."""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        vectors = np.array([[len(text) + i for i in range(self.dim)] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path / 'store'), dim=4)
+
+
+def test_add_get_and_reopen(store):
+    vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+    store.add(['a', 'b', 'c'], vectors)
+    store.add(['b'], np.ones((1, 4)))
+    assert len(store) == 3 and store.dead_rows == 1
+    np.testing.assert_array_equal(store.get('b'), np.ones(4))
+    np.testing.assert_array_equal(store.matrix(['c', 'a']), vectors[[2, 0]])
+    assert store.get('missing') is None
+
+    reader = EmbeddingStore(store.directory, readonly=True)
+    np.testing.assert_array_equal(reader.matrix(['a', 'b', 'c']), store.matrix(['a', 'b', 'c']))
+    with pytest.raises(PermissionError):
+        reader.add(['d'], np.zeros((1, 4)))
+
+
+def test_compact_drops_dead_rows_and_readers_follow(store):
+    store.add(['a', 'b', 'c'], np.arange(12, dtype=np.float32).reshape(3, 4))
+    reader = EmbeddingStore(store.directory, readonly=True)
+    before = store.matrix(['a', 'c'])
+    assert store.delete(['b', 'missing']) == 1
+
+    assert store.compact() == 1
+    assert store.generation == 1 and store.dead_rows == 0
+    np.testing.assert_array_equal(store.matrix(['a', 'c']), before)
+    assert store.compact() == 0
+
+    # The reader keeps its old mapping until it refreshes
+    assert 'b' in reader
+    assert reader.refresh()
+    assert 'b' not in reader and reader.generation == 1
+    np.testing.assert_array_equal(reader.matrix(['a', 'c']), before)
+
+
+def test_reader_picks_up_appends(store):
+    reader = EmbeddingStore(store.directory, readonly=True)
+    assert not reader.refresh()
+    store.add(['a'], np.ones((1, 4)))
+    assert reader.refresh()
+    np.testing.assert_array_equal(reader.get('a'), np.ones(4))
+
+
+def test_torn_append_is_discarded(store):
+    store.add(['a'], np.ones((1, 4)))
+    with open(store._path(INDEX_FILE), 'a', encoding='utf-8') as log:
+        log.write('{"id": "b", "ro')
+    with open(store._path(VECTORS_FILE), 'ab') as file:
+        file.write(b'\0' * 8)
+    reopened = EmbeddingStore(store.directory)
+    assert reopened.ids() == ['a']
+    reopened.add(['b'], np.full((1, 4), 2.0))
+    np.testing.assert_array_equal(reopened.get('b'), np.full(4, 2.0))
+
+
+def test_embed_only_encodes_new_texts(store):
+    encoder = CountingEncoder(4)
+    first = store.embed(['python', 'sql', 'python'], encoder)
+    assert encoder.encoded == ['python', 'sql']
+    second = store.embed(['sql', 'rust'], encoder)
+    assert encoder.encoded == ['python', 'sql', 'rust']
+    np.testing.assert_allclose(second[0], first[1])
+    assert text_key('rust') in store
+
+
+def test_float16_store(tmp_path):
+    store = EmbeddingStore(str(tmp_path / 'half'), dim=2, dtype='float16')
+    store.add(['a'], np.array([[0.5, 0.25]]))
+    assert store.vectors.dtype == np.float16
+    assert store.get('a').dtype == np.float32
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path / 'half'), dim=3)
+
+
+def test_reader_follows_a_compaction_that_deleted_its_files(store):
+    store.add(['a', 'b'], np.arange(8, dtype=np.float32).reshape(2, 4))
+    reader = EmbeddingStore(store.directory, readonly=True)
+    reader.get('a')
+    store.add(['c'], np.full((1, 4), 3.0))
+    assert reader.refresh()  # Drops the mapping; the next access maps the file again
+    store.delete(['a'])
+    store.compact()
+
+    assert reader.get('a') is None
+    assert reader.generation == 1
+    np.testing.assert_array_equal(reader.matrix(['b', 'c']), store.matrix(['b', 'c']))
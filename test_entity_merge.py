@@ -0,0 +1,52 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('sentence_transformers')
+
+from ai_resume_analyzer import AIResumeAnalyzer
+
+ID2LABEL = {0: 'O', 1: 'B-PER', 2: 'I-PER', 3: 'B-ORG'}
+TEXT = 'Ada Lovelace worked at IBM'
+
+
+def _window(offsets, labels, scores):
+    special = [1] + [0] * (len(offsets) - 2) + [1]
+    return offsets, special, (torch.tensor(scores), torch.tensor(labels))
+
+
+def test_overlapping_windows_merge_into_whole_entities():
+    # Window 0 ends on 'at' (tagged B-ORG at its edge); window 1 sees it in the middle as O
+    first = _window(
+        [(0, 0), (0, 3), (4, 8), (8, 12), (13, 19), (20, 22), (0, 0)],
+        [0, 1, 2, 1, 0, 3, 0],
+        [1.0, 0.9, 0.8, 0.7, 0.99, 0.6, 1.0]
+    )
+    second = _window(
+        [(0, 0), (13, 19), (20, 22), (23, 26), (0, 0)],
+        [0, 0, 0, 3, 0],
+        [1.0, 0.99, 0.95, 0.5, 1.0]
+    )
+    offsets, special, predictions = zip(first, second)
+    entities = AIResumeAnalyzer._merge_entity_tokens(TEXT, list(offsets), list(special),
+                                                     list(predictions), ID2LABEL)
+
+    assert [(e['type'], e['text'], e['start'], e['end']) for e in entities] == [
+        ('PER', 'Ada Lovelace', 0, 12),
+        ('ORG', 'IBM', 23, 26)
+    ]
+    # A B- subword continuing the same word ('lace') extends the entity
+    assert entities[0]['score'] == pytest.approx((0.9 + 0.8 + 0.7) / 3)
+    assert entities[1]['score'] == pytest.approx(0.5)
+
+
+def test_adjacent_entities_of_one_type_stay_separate():
+    window = _window(
+        [(0, 0), (0, 3), (4, 12), (13, 19), (0, 0)],
+        [0, 1, 1, 0, 0],
+        [1.0, 0.9, 0.8, 0.9, 1.0]
+    )
+    offsets, special, predictions = zip(window)
+    entities = AIResumeAnalyzer._merge_entity_tokens(TEXT, list(offsets), list(special),
+                                                     list(predictions), ID2LABEL)
+    assert [e['text'] for e in entities] == ['Ada', 'Lovelace']
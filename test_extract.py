@@ -1,14 +1,10 @@
 import sys
 import json
-from docx import Document
+import extract_text
 
 def extract_from_docx(file_path):
     try:
-        doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return {"text": text.strip()}
+        return {"text": extract_text.extract_from_docx(file_path).strip()}
     except Exception as e:
         return {"error": str(e)}
 
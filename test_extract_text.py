@@ -0,0 +1,116 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import extract_text
+from benchmark import write_pdf
+
+PAGES = 10
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = str(tmp_path / 'resume.pdf')
+    write_pdf('\n'.join(f"Page {page} line" for page in range(PAGES)), path, lines_per_page=1)
+    return path
+
+
+@pytest.fixture
+def page_pool():
+    yield
+    extract_text.shutdown_page_pool()
+
+
+def test_large_pdfs_share_one_pool(pdf_path, page_pool):
+    for _ in range(2):
+        pages = list(extract_text.iter_pdf_pages(pdf_path, workers=2))
+        assert [index for index, _, _ in pages] == list(range(PAGES))
+        assert pages[3][1].strip() == 'Page 3 line'
+    pool = extract_text._page_pool
+    assert pool is not None
+
+    # Closing early leaves the shared pool running for the next document
+    reader = extract_text.iter_pdf_pages(pdf_path, workers=2)
+    next(reader)
+    reader.close()
+    assert extract_text._page_pool is pool
+    assert len(list(extract_text.iter_pdf_pages(pdf_path, workers=2))) == PAGES
+
+
+def test_caller_executor_is_used(pdf_path, page_pool):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        text = [text for _, text, _ in extract_text.iter_pdf_pages(pdf_path, executor=executor)]
+    assert len(text) == PAGES and text[-1].strip() == f"Page {PAGES - 1} line"
+    assert extract_text._page_pool is None
+
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+def _paragraph(*runs):
+    return '<w:p>' + ''.join(f'<w:r><w:t>{text}</w:t></w:r>' for text in runs) + '</w:p>'
+
+
+def _part(root, body):
+    return f'<?xml version="1.0" encoding="UTF-8"?><w:{root} {W} {MC}>{body}</w:{root}>'
+
+
+def _write_docx(path, document, parts=()):
+    rels = ('<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" Type="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships/officeDocument"/></Relationships>')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('_rels/.rels', rels)
+        archive.writestr('word/document.xml', _part('document', f'<w:body>{document}</w:body>'))
+        for name, root, body in parts:
+            archive.writestr(name, _part(root, body))
+
+
+def test_docx_reads_headers_tables_and_text_boxes_in_order(tmp_path):
+    text_box = ('<w:p><w:r><mc:AlternateContent>'
+                '<mc:Choice Requires="wps"><w:drawing><w:txbxContent>'
+                + _paragraph('Contact: jane@example.com') +
+                '</w:txbxContent></w:drawing></mc:Choice>'
+                '<mc:Fallback><w:pict><w:txbxContent>'
+                + _paragraph('Contact: jane@example.com') +
+                '</w:txbxContent></w:pict></mc:Fallback>'
+                '</mc:AlternateContent></w:r><w:r><w:t>Anchor</w:t></w:r></w:p>')
+    table = ('<w:tbl>'
+             '<w:tr><w:tc>' + _paragraph('Python') + '</w:tc><w:tc>' + _paragraph('5 years') + '</w:tc></w:tr>'
+             '<w:tr><w:tc>' + _paragraph('SQL') + _paragraph('Postgres') + '</w:tc><w:tc>' + _paragraph('3 years')
+             + '</w:tc></w:tr></w:tbl>')
+    document = (_paragraph('Summary') + text_box + _paragraph('Skills') + table
+                + '<w:p><w:del><w:r><w:delText>Removed</w:delText></w:r></w:del>'
+                '<w:r><w:t xml:space="preserve">Kept </w:t></w:r><w:r><w:tab/><w:t>text</w:t></w:r></w:p>')
+    path = str(tmp_path / 'resume.docx')
+    _write_docx(path, document, [
+        ('word/header2.xml', 'hdr', _paragraph('Jane Doe')),  # First-page header, same text
+        ('word/header1.xml', 'hdr', _paragraph('Jane ', 'Doe')),
+        ('word/footer1.xml', 'ftr', _paragraph('Page footer')),
+        ('word/footer2.xml', 'ftr', _paragraph('Page footer')),
+    ])
+
+    assert extract_text.extract_from_docx(path).split('\n') == [
+        'Jane Doe',
+        'Summary',
+        'Contact: jane@example.com',
+        'Anchor',
+        'Skills',
+        'Python\t5 years',
+        'SQL Postgres\t3 years',
+        'Kept \ttext',
+        'Page footer',
+    ]
+
+
+def test_docx_fixture_from_benchmark(tmp_path):
+    pytest.importorskip('docx')
+    from benchmark import write_docx
+
+    path = str(tmp_path / 'resume.docx')
+    write_docx('Jane Doe\nSummary\nSkills\nPython, Docker', path)
+    result = extract_text.extract_text(path)
+    assert result['success']
+    assert result['text'].split('\n') == ['Jane Doe', 'Summary', 'Skills', 'Python\tDocker']
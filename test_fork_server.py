@@ -0,0 +1,76 @@
+import os
+import time
+import signal
+
+import pytest
+
+import fork_server
+from fork_server import ForkServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """ForkServer whose workers just sleep, so forking needs no models."""
+    monkeypatch.setattr(ForkServer, '_run_worker', lambda self, slot, listener: time.sleep(60))
+    server = ForkServer('resume', workers=2, socket_dir=str(tmp_path))
+    yield server
+    server.stop(timeout=1.0)
+
+
+def _reap_until(server, condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "worker was not reaped in time"
+        server._reap()
+        server._respawn_due()
+        time.sleep(0.01)
+
+
+def _is_reaped(pid):
+    try:
+        os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        return True
+    return False
+
+
+def test_dead_worker_is_respawned_into_its_slot(server):
+    pids = {server.spawn(slot): slot for slot in range(2)}
+    old = next(pid for pid, slot in pids.items() if slot == 0)
+    server.forked_at[0] -= fork_server.MIN_WORKER_UPTIME_SECONDS  # Not a startup crash
+    os.kill(old, signal.SIGKILL)
+
+    _reap_until(server, lambda: old not in server.children and len(server.children) == 2)
+    assert sorted(server.children.values()) == [0, 1]
+    assert server.respawns == 1
+    assert os.path.exists(server.socket_path(0))
+
+
+def test_startup_crashes_respawn_later_without_blocking(server, monkeypatch):
+    monkeypatch.setattr(fork_server, 'MIN_WORKER_UPTIME_SECONDS', 0.5)
+    server.spawn(0)
+    for _ in range(2):
+        pid = next(iter(server.children))
+        os.kill(pid, signal.SIGKILL)
+        started = time.time()
+        _reap_until(server, lambda: pid not in server.children)
+        assert time.time() - started < 0.5
+    # The second quick exit is held back instead of sleeping in _reap
+    assert server.children == {} and 0 in server.respawn_at
+    _reap_until(server, lambda: len(server.children) == 1)
+    assert server.respawn_at == {} and server.respawns == 2
+
+
+def test_stop_reaps_every_worker(server):
+    pids = [server.spawn(slot) for slot in range(2)]
+    server.stop(timeout=2.0)
+    assert server.children == {} and not server.running
+    assert all(_is_reaped(pid) for pid in pids)
+
+
+def test_stop_tolerates_already_reaped_children(server):
+    pid = server.spawn(0)
+    os.kill(pid, signal.SIGKILL)
+    os.waitpid(pid, 0)
+    server.stop(timeout=1.0)  # The stale pid must not raise ChildProcessError
+    assert server.children == {}
@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+
+import pytest
+
+from inference_scheduler import InferenceScheduler, QueueFullError
+from model_worker import ModelWorker
+
+
+class BlockingModel:
+    """Batch function that holds every forward pass until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.batches = []
+
+    def __call__(self, items):
+        self.started.set()
+        self.release.wait(10)
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+class ScheduledBackend:
+    """Backend whose analysis is one scheduled forward pass, like the analyzer's stages."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def analyze_resume(self, text, use_cache=True, trace=False):
+        return {'result': self.scheduler.run('model', [len(text)])}
+
+
+@pytest.fixture
+def model():
+    return BlockingModel()
+
+
+@pytest.fixture
+def scheduler(model):
+    scheduler = InferenceScheduler({'model': model}, max_batch_size=1, max_wait_ms=0, max_queue=2)
+    yield scheduler
+    model.release.set()
+    scheduler.close()
+
+
+def _fill(scheduler, model):
+    """Occupy the model with one item and queue two more behind it; returns the threads."""
+    threads = [threading.Thread(target=scheduler.run, args=('model', [1]))]
+    threads[0].start()
+    assert model.started.wait(10)
+    threads.append(threading.Thread(target=scheduler.run, args=('model', [2, 3])))
+    threads[1].start()
+    while scheduler.batchers['model'].depth < 2:
+        time.sleep(0.001)
+    return threads
+
+
+def test_full_queue_rejects_and_recovers(scheduler, model):
+    threads = _fill(scheduler, model)
+    with pytest.raises(QueueFullError):
+        scheduler.run('model', [4])
+    assert scheduler.metrics()['model']['rejected'] == 1
+
+    model.release.set()
+    for thread in threads:
+        thread.join(10)
+    assert scheduler.run('model', [4]) == [8]
+
+
+def test_oversized_request_is_chunked(scheduler, model):
+    model.release.set()
+    assert scheduler.run('model', list(range(5))) == [0, 2, 4, 6, 8]
+    assert sum(len(batch) for batch in model.batches) == 5
+
+
+def test_worker_reports_full_queue_as_retryable(scheduler, model):
+    worker = ModelWorker('resume', backend=ScheduledBackend(scheduler))
+    threads = _fill(scheduler, model)
+    response = worker.handle({'id': 7, 'op': 'analyze', 'text': 'resume'})
+    assert response['ok'] is False and response['retryable'] is True
+    assert worker.health()['errors'] == 1
+
+    model.release.set()
+    for thread in threads:
+        thread.join(10)
+    assert worker.handle({'id': 8, 'op': 'analyze', 'text': 'resume'})['result'] == {'result': [12]}
+
+
+def test_concurrent_worker_stops_reading_at_shutdown(scheduler, model):
+    worker = ModelWorker('resume', backend=ScheduledBackend(scheduler))
+    worker.concurrency = 4
+    model.release.set()
+    read = []
+
+    def reader():
+        for line in ('{"id": 1, "text": "resume"}\n', '{"id": 2, "op": "shutdown"}\n',
+                     '{"id": 3, "text": "never read"}\n'):
+            read.append(line)
+            yield line
+
+    class Writer:
+        def __init__(self):
+            self.frames = []
+
+        def write(self, frame):
+            self.frames.append(frame)
+
+        def flush(self):
+            pass
+
+    writer = Writer()
+    worker.serve_stream(reader(), writer)
+    assert len(read) == 2 and not worker.running
+    assert sorted(json.loads(frame)['id'] for frame in writer.frames) == [1, 2]
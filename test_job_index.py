@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from job_index import JobIndex
+
+
+def _jobs(count):
+    locations = ['Remote', 'Berlin', 'Austin']
+    return [
+        {'id': f'job-{i}', 'title': f'Job {i}', 'location': locations[i % 3],
+         'salary_min': 50000 + 1000 * i, 'salary_max': 60000 + 1000 * i}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(60, 16)).astype(np.float32)
+
+
+@pytest.fixture
+def index(vectors):
+    return JobIndex.build(_jobs(len(vectors)), vectors, n_lists=6, n_probe=2)
+
+
+def _exact(vectors, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f'job-{i}' for i in np.argsort(-(normalized @ query))[:k]]
+
+
+def test_full_probe_matches_exact_search(index, vectors):
+    query = vectors[7] + 0.1
+    query = query / np.linalg.norm(query)
+    results = index.search(query, k=5, n_probe=6)
+    assert [result['id'] for result in results] == _exact(vectors, query, 5)
+    assert results[0]['job']['title'] == 'Job 7'
+
+
+def test_filters_widen_the_probe(index, vectors):
+    results = index.search(vectors[0], k=10, location='berlin', salary_band=(70000, 80000))
+    # Berlin jobs are i % 3 == 1; salary ranges overlapping the band are i in 10..30
+    expected = {f'job-{i}' for i in range(10, 31) if i % 3 == 1}
+    assert {result['id'] for result in results} == expected
+    assert index.search(vectors[0], location='nowhere') == []
+
+
+def test_add_replaces_and_delete_tombstones(index, vectors):
+    assert index.delete('job-3')
+    assert not index.delete('job-3')
+    assert 'job-3' not in [r['id'] for r in index.search(vectors[3], k=5, n_probe=6)]
+
+    index.add([{'id': 'job-4', 'title': 'Moved'}], vectors[5:6])
+    assert len(index) == 59
+    top = index.search(vectors[5], k=2, n_probe=6)
+    assert {r['id'] for r in top} == {'job-4', 'job-5'}
+    assert index.jobs[index.id_to_row['job-4']]['title'] == 'Moved'
+
+
+def test_duplicate_ids_in_one_batch_keep_the_last(index, vectors):
+    index.add([{'id': 'new', 'title': 'first'}, {'id': 'new', 'title': 'second'}], vectors[:2])
+    assert len(index) == 61
+    results = index.search(vectors[0], k=61, n_probe=6)
+    assert [r['job']['title'] for r in results if r['id'] == 'new'] == ['second']
+
+
+def test_save_and_load_round_trip(index, vectors, tmp_path):
+    index.delete('job-1')
+    index.save(str(tmp_path))
+    loaded = JobIndex.load(str(tmp_path))
+    assert len(loaded) == len(index)
+    assert 'job-1' not in loaded.id_to_row
+    query = vectors[10]
+    assert loaded.search(query, k=5) == index.search(query, k=5)
+
+    # The memory-mapped vectors are copied on the first add
+    loaded.add([{'id': 'extra'}], vectors[:1])
+    assert loaded.search(vectors[0], k=1, n_probe=6)[0]['id'] in {'job-0', 'extra'}
+
+
+def test_compact_reclaims_deleted_rows(index, vectors, tmp_path):
+    index.delete('job-2')
+    index.add([{'id': 'job-4', 'title': 'Moved'}], vectors[5:6])
+    query = vectors[9]
+    before = [(r['id'], r['score']) for r in index.search(query, k=10, n_probe=6)]
+
+    assert index.compact() == 2
+    assert index.compact() == 0
+    assert len(index.ids) == len(index.jobs) == len(index.vectors) == len(index) == 59
+    assert sum(len(rows) for rows in index.list_rows) == 59
+    assert [(r['id'], r['score']) for r in index.search(query, k=10, n_probe=6)] == before
+    assert index.jobs[index.id_to_row['job-4']]['title'] == 'Moved'
+
+    # Adds after compaction land in fresh rows, and the smaller index round-trips
+    index.add([{'id': 'extra'}], vectors[:1])
+    assert index.id_to_row['extra'] == 59
+    index.save(str(tmp_path))
+    assert JobIndex.load(str(tmp_path)).search(query, k=5) == index.search(query, k=5)
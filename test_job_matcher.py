@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from job_matcher import JobMatcher
+
+JOBS = [
+    {'id': 'backend', 'title': 'Backend Engineer', 'required_skills': ['python', 'sql']},
+    {'id': 'frontend', 'title': 'Frontend Engineer', 'required_skills': ['javascript', 'css']}
+]
+
+
+class CountingEncoder:
+    """Deterministic stand-in encoder that records every text it embeds."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        vectors = np.array([[text.count(char) + 0.1 for char in 'aeiostnrl'] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_phrase_cache_is_bounded_lru():
+    encoder = CountingEncoder()
+    matcher = JobMatcher(encoder, JOBS, phrase_cache_size=2)
+    encoder.encoded.clear()
+
+    matcher.encode_phrases(['python', 'sql', 'python'])
+    assert encoder.encoded == ['python', 'sql']
+    matcher.encode_phrases(['python', 'Senior Engineer; Team Lead'])
+    assert list(matcher._phrase_cache) == ['python', 'Senior Engineer; Team Lead']
+    matcher.encode_phrases(['sql'])
+    assert encoder.encoded == ['python', 'sql', 'Senior Engineer; Team Lead', 'sql']
+    assert len(matcher._phrase_cache) == 2
+
+
+def test_contributions_sum_to_score():
+    matcher = JobMatcher(CountingEncoder(), JOBS)
+    matches = matcher.match([('python', 1.0), ('sql', 0.5)], top_k=2)
+    assert len(matches) == 2 and matches[0]['score'] >= matches[1]['score']
+    for match in matches:
+        assert sum(contribution for _, contribution in match['contributions']) == pytest.approx(match['score'], abs=1e-5)
@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('tokenizers')
+
+import ai_job_recommender
+from ai_job_recommender import MAX_CONTEXT_TOKENS, JobRecommender
+from model_registry import ModelRegistry
+from stub_models import STUB_CAUSAL_LM, build_stub_causal_lm
+
+
+@pytest.fixture(scope='module')
+def stub_pair():
+    return build_stub_causal_lm()
+
+
+@pytest.fixture
+def recommender(stub_pair):
+    registry = ModelRegistry()
+    registry.register(f"causal_lm:{STUB_CAUSAL_LM}:float32", lambda: stub_pair)
+    role_models = {role: STUB_CAUSAL_LM for role in ('skills', 'experience', 'recommendations')}
+    return JobRecommender(role_models=role_models, registry=registry, quantization='none',
+                          prefix_caching=False)
+
+
+def test_long_resume_keeps_the_task_instructions(recommender, monkeypatch):
+    prompts = {}
+
+    def capture(model, tokenizer, prompt, opener, **kwargs):
+        prompts[opener] = (prompt, kwargs['max_input_tokens'], tokenizer)
+        return None, {'input_tokens': 0, 'new_tokens': 0, 'seconds': 0.0,
+                      'stopped_early': False, 'parsed': False}
+    monkeypatch.setattr(ai_job_recommender, 'generate_json', capture)
+
+    resume = "Python developer with SQL and Docker experience. " * 2000
+    recommender.analyze_skills(resume)
+    recommender.analyze_experience(resume)
+
+    for opener, instruction in (('[', 'Extract technical and soft skills'),
+                                ('{', 'Extract work experience details')):
+        prompt, max_input_tokens, tokenizer = prompts[opener]
+        assert instruction in prompt
+        # The resume alone was cut to fit the context, ahead of the instructions
+        resume_part = prompt[:prompt.index(instruction)]
+        assert len(tokenizer(resume_part).input_ids) <= recommender._resume_prefix_tokens() + 8
+        assert max_input_tokens < MAX_CONTEXT_TOKENS
+
+
+def test_roles_sharing_a_checkpoint_load_it_once(stub_pair, monkeypatch):
+    loads = []
+
+    def load_checkpoint(self, model_name):
+        loads.append(model_name)
+        return stub_pair
+    monkeypatch.setattr(JobRecommender, '_load_checkpoint', load_checkpoint)
+
+    registry = ModelRegistry()
+    role_models = {'skills': 'org/shared', 'experience': 'org/shared', 'recommendations': 'org/other'}
+    recommender = JobRecommender(role_models=role_models, registry=registry, quantization='none')
+    assert sorted(loads) == ['org/other', 'org/shared']
+    assert recommender._role_pair('skills') is recommender._role_pair('experience')
+
+    # Another recommender on the same registry reuses the loaded copies
+    JobRecommender(role_models=role_models, registry=registry, quantization='none')
+    assert len(loads) == 2
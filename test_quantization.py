@@ -0,0 +1,29 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from quantization import load_quantized, quantized_cache_path
+
+
+def _float_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(8, 16), torch.nn.ReLU(), torch.nn.Linear(16, 4))
+
+
+def test_cached_weights_load_into_a_fresh_skeleton(tmp_path):
+    first = load_quantized('org/tiny', _float_model, cache_dir=str(tmp_path))
+    path = quantized_cache_path('org/tiny', str(tmp_path))
+    assert 'torch-' in path and 'transformers-' in path
+    # Only tensors are stored, so the file loads without unpickling arbitrary objects
+    assert isinstance(torch.load(path, weights_only=True), dict)
+
+    def untrained():
+        torch.manual_seed(1)
+        return _float_model()
+
+    def must_not_load():
+        raise AssertionError("cache hit should not load pretrained weights")
+
+    second = load_quantized('org/tiny', must_not_load, cache_dir=str(tmp_path), build_float=untrained)
+    inputs = torch.randn(3, 8)
+    assert torch.equal(first(inputs), second(inputs))
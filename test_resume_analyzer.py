@@ -0,0 +1,150 @@
+import sqlite3
+import weakref
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('sentence_transformers')
+pytest.importorskip('tokenizers')
+
+from ai_resume_analyzer import NLI_HYPOTHESIS_TEMPLATE, AIResumeAnalyzer
+from analysis_cache import AnalysisCache
+from inference_scheduler import QueueFullError
+from model_registry import ModelRegistry
+from stub_models import register_stub_analyzer_models
+
+RESUME = """John Smith
+
+Experience
+Software Engineer, Acme Corp 2019 - 2023
+Developed python services and led a team of 4.
+
+Skills
+Python, Docker, SQL
+"""
+
+
+@pytest.fixture(params=[False, True], ids=['document', 'incremental'])
+def analyzer(request):
+    registry = ModelRegistry()
+    register_stub_analyzer_models(registry)
+    analyzer = AIResumeAnalyzer(registry=registry, cache=AnalysisCache(':memory:'),
+                                quantization='none', incremental=request.param)
+    yield analyzer
+    analyzer.cache.close()
+
+
+def test_full_queue_is_raised_not_cached(analyzer, monkeypatch):
+    def queue_full(model, items, batch_fn, batch_size):
+        raise QueueFullError(f"{model} queue is full")
+    monkeypatch.setattr(analyzer, '_run_batched', queue_full)
+
+    with pytest.raises(QueueFullError):
+        analyzer.analyze_resume(RESUME)
+    assert analyzer.cache.stats()['entries'] == 0
+
+
+def test_degraded_analysis_is_returned_but_not_cached(analyzer, monkeypatch):
+    def broken(text):
+        raise RuntimeError("indicator lookup failed")
+    monkeypatch.setattr(analyzer, '_find_proficiency_indicators', broken)
+
+    result = analyzer.analyze_resume(RESUME)
+    assert 'error' not in result and result['skills'] == []
+    assert analyzer.cache.stats()['entries'] == 0
+
+    monkeypatch.undo()
+    analyzer.analyze_resume(RESUME)
+    assert analyzer.cache.stats()['entries'] == 1
+
+
+def test_model_failure_degrades_only_model_stages(analyzer, monkeypatch):
+    def broken(claims):
+        raise RuntimeError("NLI forward pass failed")
+    monkeypatch.setattr(analyzer, '_score_skill_claims', broken)
+
+    result = analyzer.analyze_resume(RESUME)
+    assert 'error' not in result and result['skills'] == []
+    assert result['experience'] and result['resume_improvements']
+    assert analyzer.cache.stats()['entries'] == 0
+
+
+def test_cache_failures_only_log(analyzer, monkeypatch):
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+    for method in ('get', 'put', 'get_sections', 'put_sections'):
+        monkeypatch.setattr(analyzer.cache, method, locked)
+
+    result = analyzer.analyze_resume(RESUME)
+    assert 'error' not in result
+    assert result['experience']
+
+
+def test_job_matcher_does_not_pin_the_encoder(analyzer):
+    skills = [{'name': 'python', 'proficiency': 0.9, 'confidence': 0.9}]
+    analyzer.generate_job_recommendations(skills, 'Software Engineer')
+    encoder = weakref.ref(analyzer.registry.get('sentence_transformer'))
+
+    assert analyzer.registry.unload('sentence_transformer')
+    assert encoder() is None
+    # A phrase the matcher has not cached yet forces a fresh encode.
+    skills = [{'name': 'kubernetes', 'proficiency': 0.9, 'confidence': 0.9}]
+    analyzer.generate_job_recommendations(skills, 'Site Reliability Engineer')
+    assert analyzer.registry.is_loaded('sentence_transformer')
+
+
+def test_batched_skill_scores_match_the_zero_shot_pipeline(monkeypatch):
+    monkeypatch.setenv('ANALYSIS_CACHE', '0')
+    registry = ModelRegistry()
+    register_stub_analyzer_models(registry)
+    analyzer = AIResumeAnalyzer(registry=registry, quantization='none')
+    text = RESUME.lower()
+    keywords = ['python', 'docker', 'sql']
+
+    expected = []
+    for keyword in keywords:
+        labels = [f"has {keyword} experience", f"does not have {keyword} experience"]
+        result = analyzer.zero_shot(text, candidate_labels=labels, hypothesis_template=NLI_HYPOTHESIS_TEMPLATE)
+        expected.append(result['scores'][result['labels'].index(labels[0])])
+    assert analyzer._verify_skills(text, keywords) == pytest.approx(expected, abs=1e-5)
+
+
+def test_edited_resume_reanalyzes_only_changed_sections(monkeypatch):
+    registry = ModelRegistry()
+    register_stub_analyzer_models(registry)
+    analyzer = AIResumeAnalyzer(registry=registry, cache=AnalysisCache(':memory:'),
+                                quantization='none', incremental=True)
+    analyzer.analyze_resume(RESUME)
+
+    ner_texts, nli_premises = [], []
+    extract_many = analyzer.extract_entity_spans_many
+    score_claims = analyzer._score_skill_claims
+
+    def record_ner(texts):
+        ner_texts.extend(texts)
+        return extract_many(texts)
+
+    def record_nli(claims):
+        nli_premises.extend(premise for premise, _ in claims)
+        return score_claims(claims)
+    monkeypatch.setattr(analyzer, 'extract_entity_spans_many', record_ner)
+    monkeypatch.setattr(analyzer, '_score_skill_claims', record_nli)
+
+    edited_section = "Skills\nPython, Docker, SQL, Kubernetes\n"
+    edited = RESUME.replace("Skills\nPython, Docker, SQL\n", edited_section)
+    result = analyzer.analyze_resume(edited)
+    assert ner_texts == [edited_section]
+    assert nli_premises and set(nli_premises) == {edited_section.lower()}
+
+    cold = AIResumeAnalyzer(registry=registry, cache=AnalysisCache(':memory:'),
+                            quantization='none', incremental=True)
+    expected = cold.analyze_resume(edited)
+    assert result['entities'] == expected['entities']
+    assert result['experience'] == expected['experience']
+    assert result['skills'] and [(skill['name'], skill['proficiency']) for skill in result['skills']] == \
+        [(skill['name'], skill['proficiency']) for skill in expected['skills']]
+    assert [skill['confidence'] for skill in result['skills']] == \
+        pytest.approx([skill['confidence'] for skill in expected['skills']], abs=1e-5)
+    analyzer.cache.close()
+    cold.cache.close()
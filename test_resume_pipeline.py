@@ -0,0 +1,57 @@
+import io
+import json
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('docx')
+
+from benchmark import write_docx
+from resume_pipeline import analyze_file, serve_paths
+from tracing import span
+
+RESUME = "Jane Doe\n\nExperience\nPython developer at Acme Corp."
+
+
+class EchoBackend:
+    """Stand-in analyzer that reports the text it was given and how it was called."""
+
+    def __init__(self):
+        self.cache = object()
+        self.calls = []
+
+    def analyze_resume(self, text, use_cache=True):
+        self.calls.append(use_cache)
+        with span('analyzer.echo'):
+            return {'words': len(text.split())}
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / 'resume.docx'
+    write_docx(RESUME, str(path))
+    return str(path)
+
+
+def test_analyze_file_extracts_in_process(resume):
+    backend = EchoBackend()
+    assert analyze_file(backend, resume) == {'words': 8}
+    result = analyze_file(backend, resume, use_cache=False, include_text=True)
+    assert result['text'].split() == RESUME.split()
+    assert backend.calls == [True, False]
+
+
+def test_serve_paths_answers_each_line_in_order(resume, tmp_path):
+    reader = io.StringIO(f"{resume}\n\n{tmp_path / 'missing.pdf'}\n{resume}\n")
+    writer = io.StringIO()
+    serve_paths(EchoBackend(), reader, writer, trace=True)
+
+    responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+    assert [(response['path'], response['ok']) for response in responses] == [
+        (resume, True), (str(tmp_path / 'missing.pdf'), False), (resume, True)
+    ]
+    assert responses[0]['result']['words'] == 8
+    assert {stage['name'] for stage in responses[0]['result']['_trace']['spans']} >= {
+        'pipeline.analyze_file', 'analyzer.echo'
+    }
+    assert responses[1]['error'] and 'result' not in responses[1]
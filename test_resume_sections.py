@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+from resume_sections import ACTION_VERBS, EDU_KEYWORDS, EXP_KEYWORDS, SECTION_HEADER_KEYWORDS, ResumeIndex
+
+TEXTS = [
+    "Jane Doe\n\nEducation\nBachelor of Science, State University\n\nExperience\nDeveloper, Acme Corp. 2019-2023",
+    "Qualifications\nCertified in first aid\n\nInternships\nSummer at Acme Corp.",
+    "İstanbul office\n\nNetwork engineer (master of networks)\n\n\nEMPLOYMENT\nLead Engineer, Foo LLC",
+    "\n\nPhD, Institute of Technology\n\nJOB HISTORY\nİİ Consultant\n\n",
+    "Skills² Python\n\nno keywords here",
+    "",
+]
+
+
+def baseline_sections(text):
+    """The extractors' original section classification: split, lower-case, substring test."""
+    return [
+        (section,
+         any(keyword in section.lower() for keyword in EDU_KEYWORDS),
+         any(keyword in section.lower() for keyword in EXP_KEYWORDS))
+        for section in text.split('\n\n')
+    ]
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_sections_match_the_original_split_and_keywords(text):
+    index = ResumeIndex(text)
+    assert [(section.text, section.is_education, section.is_experience) for section in index.sections] == \
+        baseline_sections(text)
+    for section in index.sections:
+        assert text[section.start:section.end] == section.text
+        assert section.lower == section.text.lower()
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_document_facts_match_the_original_checks(text):
+    index = ResumeIndex(text)
+    lower = text.lower()
+    assert index.has_section_headers == any(keyword in lower for keyword in SECTION_HEADER_KEYWORDS)
+    assert index.has_action_verbs == any(keyword in lower for keyword in ACTION_VERBS)
+    assert index.has_digits == any(char.isdigit() for char in text)
+    assert index.has_degree == bool(re.search(r'(Bachelor|Master|PhD|B\.?Tech|M\.?Tech|B\.?E|M\.?E|B\.?S|M\.?S)', text))
+    assert index.has_date_ranges == bool(re.search(r'\d{4}[-–]\d{4}|\d{4}[-–]present', text))
+
+
+def test_header_lines_alone_do_not_classify_a_section():
+    qualifications, internships = ResumeIndex(TEXTS[1]).sections
+    assert not qualifications.is_education and not internships.is_experience
+
+
+def test_section_at_and_unaligned_lower_case():
+    index = ResumeIndex(TEXTS[2])
+    assert len(index.lower) != len(index.text)  # 'İ' lower-cases to two characters
+    assert index.section_at(0).index == 0
+    assert index.section_at(index.sections[2].start).text.startswith('\nEMPLOYMENT')
+    assert index.sections[1].is_experience and index.sections[1].is_education
@@ -0,0 +1,51 @@
+import re
+
+from skill_matcher import KeywordMatcher, SkillTaxonomy
+
+
+def test_whole_words_only():
+    matcher = KeywordMatcher(['java', 'javascript', 'go'])
+    text = 'javascript and java, not golang or mongo; go'
+    assert matcher.find_positions(text) == {
+        'javascript': [0],
+        'java': [text.index('java,')],
+        'go': [len(text) - 2]
+    }
+
+
+def test_keywords_with_symbols():
+    matcher = KeywordMatcher(['c++', 'c#', 'node.js', 'c'])
+    text = 'c++, c# and node.js (c)'
+    found = {(keyword, start) for start, _, keyword in matcher.finditer(text)}
+    # Like a \b regex, 'c' still matches before the non-word '+' and '#'
+    assert found == {('c++', 0), ('c', 0), ('c#', 5), ('c', 5), ('node.js', 12), ('c', 21)}
+
+
+def test_overlapping_keywords_reported_in_end_order():
+    matcher = KeywordMatcher(['machine learning', 'learning', 'deep learning'], whole_words=False)
+    matches = list(matcher.finditer('deep learning and machine learning'))
+    assert matches == [
+        (0, 13, 'deep learning'),
+        (5, 13, 'learning'),
+        (18, 34, 'machine learning'),
+        (26, 34, 'learning')
+    ]
+
+
+def test_matches_regex_reference():
+    keywords = ['sql', 'nosql', 'postgresql', 'r', 'rust', 'ai', 'aws']
+    text = 'nosql vs sql vs postgresql; r and rust at aws, paid ai'
+    matcher = KeywordMatcher(keywords)
+    for keyword in keywords:
+        expected = [m.start() for m in re.finditer(r'\b' + re.escape(keyword) + r'\b', text)]
+        assert matcher.find_positions(text).get(keyword, []) == expected
+
+
+def test_taxonomy_follows_category_order():
+    taxonomy = SkillTaxonomy({'languages': ['Python', 'Go'], 'cloud': ['AWS']})
+    assert taxonomy.find_skills('aws with go and python') == [
+        ('languages', 'python', [16]),
+        ('languages', 'go', [9]),
+        ('cloud', 'aws', [0])
+    ]
+    assert taxonomy.version == SkillTaxonomy({'languages': ['python', 'go'], 'cloud': ['aws']}).version
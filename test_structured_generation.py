@@ -0,0 +1,70 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('transformers')
+
+from structured_generation import JsonScanner, JsonStoppingCriteria, extract_json
+
+
+class ByteTokenizer:
+    """Tokenizer stand-in whose tokens are byte strings, so characters can split across tokens."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.decoded_tokens = 0
+
+    def decode(self, token_ids, skip_special_tokens=True):
+        token_ids = [int(token_id) for token_id in token_ids]
+        self.decoded_tokens += len(token_ids)
+        return b''.join(self.pieces[token_id] for token_id in token_ids).decode('utf-8', errors='replace')
+
+
+def test_scanner_ignores_brackets_in_strings():
+    scanner = JsonScanner('[')
+    text = 'Sure: ["a]", "b\\"]", {"c": [1]}] and [more]'
+    for start in range(0, len(text), 3):
+        scanner.feed(text[start:start + 3])
+    assert (scanner.start, scanner.end) == (6, text.index(' and'))
+
+
+def test_extract_json_takes_first_balanced_value():
+    assert extract_json('Here: {"skills": ["go", "c]"]} (see {other})', '{') == {'skills': ['go', 'c]']}
+    with pytest.raises(ValueError):
+        extract_json('no value here', '[')
+    with pytest.raises(ValueError):
+        extract_json('[{"cut": "off"', '[')
+
+
+def _generate(tokenizer, tokens, scanner, prompt_length=1):
+    stopping = JsonStoppingCriteria(tokenizer, prompt_length, scanner)
+    input_ids = [0] * prompt_length
+    for token in tokens:
+        input_ids.append(token)
+        if stopping(torch.tensor([input_ids]), None):
+            break
+    return len(input_ids) - prompt_length
+
+
+def test_stopping_criteria_stops_when_balanced():
+    # '[{"a": "é"}, 1] tail]' with 'é' split across two byte tokens
+    pieces = [b'', b'[', b'{"a', b'": "', b'\xc3', b'\xa9', b'"}', b', ', b'1', b']', b' tail]']
+    scanner = JsonScanner('[')
+    generated = _generate(ByteTokenizer(pieces), range(1, len(pieces)), scanner)
+    assert generated == 9
+    assert scanner.closed and scanner.end == len('[{"a": "é"}, 1]')
+
+
+def test_stopping_criteria_keeps_primed_opener():
+    pieces = [b'', b'"x]"', b', 2', b']']
+    scanner = JsonScanner('[')
+    scanner.feed('[')
+    assert _generate(ByteTokenizer(pieces), [1, 2, 3], scanner) == 3
+    assert scanner.closed
+
+
+def test_stopping_criteria_decodes_incrementally():
+    pieces = [b'', b'[', b'1', b', ']
+    tokenizer = ByteTokenizer(pieces)
+    _generate(tokenizer, [1] + [2, 3] * 500, JsonScanner('['))
+    # Each step decodes the unread token plus the previous one, twice
+    assert tokenizer.decoded_tokens < 5 * 1001
@@ -0,0 +1,115 @@
+import pytest
+
+import tracing
+from tracing import LATENCY_BUCKETS, StageMetrics, span, start_trace
+
+RESUME = """Jane Doe
+
+Experience
+Software Engineer, Acme Corp 2019 - 2023
+Developed python services.
+
+Skills
+Python, Docker
+"""
+
+
+@pytest.fixture
+def stage_metrics(monkeypatch):
+    """Fresh, enabled process metrics."""
+    metrics = StageMetrics()
+    metrics.enabled = True
+    monkeypatch.setattr(tracing, 'metrics', metrics)
+    return metrics
+
+
+def test_span_is_a_noop_when_nothing_records(monkeypatch):
+    monkeypatch.setattr(tracing.metrics, 'enabled', False)
+    assert span('stage') is tracing._NOOP_SPAN
+    with span('stage', tokens=3) as stage:
+        stage.set(tokens=4)
+
+
+def test_nested_spans_record_parents_and_errors():
+    with start_trace() as trace:
+        with span('outer', tokens=2) as outer:
+            with span('inner'):
+                pass
+            with pytest.raises(KeyError):
+                with span('failing'):
+                    raise KeyError('missing')
+            outer.set(batch_size=4)
+        with span('sibling'):
+            pass
+
+    spans = {record['name']: record for record in trace.export()['spans']}
+    assert [record['name'] for record in trace.export()['spans']] == ['outer', 'inner', 'failing', 'sibling']
+    assert spans['outer']['parent'] is None and spans['sibling']['parent'] is None
+    assert spans['inner']['parent'] == spans['failing']['parent'] == spans['outer']['id']
+    assert spans['failing']['error'] == 'KeyError' and 'error' not in spans['outer']
+    assert spans['outer']['tokens'] == 2 and spans['outer']['batch_size'] == 4
+    assert spans['outer']['wall_ms'] >= spans['inner']['wall_ms'] >= 0
+
+    # Spans outside the trace aren't recorded in it
+    with span('after'):
+        pass
+    assert len(trace.spans) == 4
+
+
+def test_snapshot_buckets_are_cumulative(stage_metrics):
+    for wall in (0.001, 0.02, 0.02, 100.0):
+        stage_metrics.observe('model', wall, wall / 2, {'tokens': 10})
+    stage_metrics.observe('model', 0.2, 0.1, {'error': 'RuntimeError', 'tokens': 'n/a'})
+
+    stage = stage_metrics.snapshot()['model']
+    assert (stage['count'], stage['errors'], stage['tokens']) == (5, 1, 40)
+    assert stage['wall_seconds'] == pytest.approx(100.241)
+    buckets = stage['buckets']
+    assert list(buckets) == [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']
+    assert (buckets['0.005'], buckets['0.025'], buckets['0.25'], buckets['60.0'], buckets['+Inf']) == (1, 3, 4, 4, 5)
+    assert list(buckets.values()) == sorted(buckets.values())
+
+
+def test_prometheus_exposition(stage_metrics):
+    with span('analyzer.skills', batch_size=8):
+        pass
+    text = stage_metrics.prometheus(prefix='test')
+
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    assert '# TYPE test_stage_seconds histogram' in lines
+    assert 'test_stage_seconds_bucket{stage="analyzer.skills",le="+Inf"} 1' in lines
+    assert 'test_stage_seconds_count{stage="analyzer.skills"} 1' in lines
+    assert '# TYPE test_stage_batch_size_total counter' in lines
+    assert 'test_stage_batch_size_total{stage="analyzer.skills"} 8' in lines
+    assert 'test_stage_errors_total{stage="analyzer.skills"} 0' in lines
+    for line in lines:
+        if not line.startswith('#'):
+            float(line.rsplit(' ', 1)[1])  # Every sample ends in a number
+
+
+def test_analyze_resume_returns_its_trace():
+    pytest.importorskip('torch')
+    pytest.importorskip('transformers')
+    pytest.importorskip('sentence_transformers')
+    from ai_resume_analyzer import AIResumeAnalyzer
+    from analysis_cache import AnalysisCache
+    from model_registry import ModelRegistry
+    from stub_models import register_stub_analyzer_models
+
+    registry = ModelRegistry()
+    register_stub_analyzer_models(registry)
+    analyzer = AIResumeAnalyzer(registry=registry, cache=AnalysisCache(':memory:'), quantization='none')
+
+    result = analyzer.analyze_resume(RESUME, trace=True)
+    assert 'error' not in result and result['experience']
+    spans = result['_trace']['spans']
+    by_id = {record['id']: record for record in spans}
+    names = {record['name'] for record in spans}
+    assert {'analyzer.sections', 'analyzer.entities', 'analyzer.skills', 'analyzer.improvements'} <= names
+    root = [record for record in spans if record['parent'] is None]
+    assert len(root) == 1
+    # Every stage hangs off the single root span
+    assert all(by_id[record['parent']] for record in spans if record['parent'] is not None)
+    assert '_trace' not in analyzer.analyze_resume(RESUME)
+    analyzer.cache.close()
@@ -0,0 +1,252 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Wall-time histogram buckets in seconds (upper bounds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Span attributes that are summed into counters per stage
+COUNTED_ATTRIBUTES = ('tokens', 'new_tokens', 'batch_size')
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None where /proc isn't available."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memory_breakdown() -> Dict[str, int]:
+    """RSS split into proportional, shared and private bytes (Linux only, else empty).
+
+    Forked workers sharing model weights copy-on-write show them as shared; pss
+    charges each shared page to its processes in equal parts.
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    breakdown: Dict[str, int] = {}
+    try:
+        with open('/proc/self/smaps_rollup') as file:
+            for line in file:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    key = fields[name]
+                    breakdown[key] = breakdown.get(key, 0) + int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return breakdown
+
+
+class Trace:
+    """Spans recorded for one request, in the order they started."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _new_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def export(self) -> Dict[str, Any]:
+        """JSON-ready trace: total wall time and each span with its parent's id."""
+        return {
+            'total_ms': (time.perf_counter() - self.started) * 1000,
+            'spans': sorted(self.spans, key=lambda span: span['start_ms'])
+        }
+
+
+class StageMetrics:
+    """Process-wide aggregates of every span: counts, wall/CPU time and token counters.
+
+    Disabled by default; when neither metrics nor a trace are active, span() costs one
+    context-variable lookup.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, name: str, wall: float, cpu: float, attrs: Dict[str, Any]) -> None:
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = {
+                    'count': 0, 'errors': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                    'buckets': [0] * len(LATENCY_BUCKETS),
+                    **{attribute: 0 for attribute in COUNTED_ATTRIBUTES}
+                }
+            stage['count'] += 1
+            stage['wall_seconds'] += wall
+            stage['cpu_seconds'] += cpu
+            if 'error' in attrs:
+                stage['errors'] += 1
+            for attribute in COUNTED_ATTRIBUTES:
+                value = attrs.get(attribute)
+                if isinstance(value, (int, float)):
+                    stage[attribute] += value
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if wall <= bound:
+                    stage['buckets'][i] += 1
+                    break
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage aggregates with cumulative histogram buckets, as plain JSON."""
+        with self._lock:
+            stages = {name: {**stage, 'buckets': list(stage['buckets'])} for name, stage in self._stages.items()}
+        for stage in stages.values():
+            cumulative, running = {}, 0
+            for bound, count in zip(LATENCY_BUCKETS, stage['buckets']):
+                running += count
+                cumulative[str(bound)] = running
+            cumulative['+Inf'] = stage['count']
+            stage['buckets'] = cumulative
+        return stages
+
+    def prometheus(self, prefix: str = 'resume') -> str:
+        """Prometheus text exposition format of snapshot()."""
+        stages = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time per pipeline stage or model call.",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        for name, stage in stages.items():
+            for bound, count in stage['buckets'].items():
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage["wall_seconds"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+        counters = [('cpu_seconds', 'CPU time of the calling thread'), ('errors', 'Spans that raised')]
+        counters += [(attribute, f"Sum of the {attribute} span attribute") for attribute in COUNTED_ATTRIBUTES]
+        for key, description in counters:
+            metric = f"{prefix}_stage_{key}_total"
+            lines.append(f"# HELP {metric} {description}.")
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{stage="{name}"}} {stage[key]}' for name, stage in stages.items())
+        rss = current_rss_bytes()
+        if rss is not None:
+            lines.append(f"# TYPE {prefix}_process_resident_memory_bytes gauge")
+            lines.append(f"{prefix}_process_resident_memory_bytes {rss}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = StageMetrics()
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Span:
+    """Times one stage or model call for the active trace and/or the process metrics.
+
+    Records wall time, CPU time of the calling thread, RSS change (traces only) and any
+    attributes given up front or later through set(), e.g. tokens or batch_size.
+    """
+
+    __slots__ = ('name', 'trace', 'attrs', 'id', '_token', '_start', '_cpu_start', '_rss_start')
+
+    def __init__(self, name: str, trace: Optional[Trace], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> 'Span':
+        if self.trace is not None:
+            self.id = self.trace._new_id()
+            self._rss_start = current_rss_bytes()
+        self._token = _current_span.set(self)
+        self._cpu_start = time.thread_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        wall = time.perf_counter() - self._start
+        cpu = time.thread_time() - self._cpu_start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        if self.trace is not None:
+            parent = _current_span.get()
+            rss = current_rss_bytes()
+            self.trace.spans.append({
+                'name': self.name,
+                'id': self.id,
+                'parent': parent.id if parent is not None and parent.trace is self.trace else None,
+                'start_ms': (self._start - self.trace.started) * 1000,
+                'wall_ms': wall * 1000,
+                'cpu_ms': cpu * 1000,
+                'rss_delta_bytes': rss - self._rss_start if rss is not None and self._rss_start is not None else None,
+                **self.attrs
+            })
+        if metrics.enabled:
+            metrics.observe(self.name, wall, cpu, self.attrs)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned by span() when nothing is recording."""
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attrs) -> Any:
+    """Context manager timing a stage, e.g. ``with span('analyzer.skills') as s: ...; s.set(tokens=n)``.
+
+    Nested spans record their parent. Work handed to other threads (such as batched
+    forward passes on the scheduler thread) is recorded in the metrics but not in the
+    submitting request's trace.
+    """
+    trace = _current_trace.get()
+    if trace is None and not metrics.enabled:
+        return _NOOP_SPAN
+    return Span(name, trace, attrs)
+
+
+@contextmanager
+def start_trace() -> Iterator[Trace]:
+    """Record every span opened in this context (thread or task) into a new Trace."""
+    trace = Trace()
+    token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(token)
+
+
+def enable_metrics(enabled: bool = True) -> None:
+    """Turn process-wide stage metrics on or off."""
+    metrics.enabled = enabled